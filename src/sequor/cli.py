@@ -1,8 +1,12 @@
 # run_flow.py
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import contextvars
+import fnmatch
 import logging
 import os
 from pathlib import Path
 import sys
+from typing import List
 import yaml
 from sequor.common import telemetry
 from sequor.common.common import Common
@@ -10,10 +14,7 @@ from sequor.core.context import Context
 from sequor.core.environment import Environment
 from sequor.core.execution_stack_entry import ExecutionStackEntry
 from sequor.core.instance import Instance
-from sequor.core.job import Job
 from sequor.core.user_error import UserError
-from sequor.operations.run_flow import RunFlowOp
-from sequor.project.project import Project
 
 import typer
 # import typer.core
@@ -96,6 +97,83 @@ def init(
         raise typer.Exit(code=1)
    
 
+def resolve_project_dir(project_dir_cli: str) -> Path:
+    if project_dir_cli:
+        project_dir = Path(project_dir_cli)
+        if not project_dir.exists():
+            raise UserError(f"Project directory passed as CLI --project-dir argument does not exist: {project_dir_cli}")
+    else:
+        current_dir = os.getcwd()
+        project_dir = Path(current_dir)
+    return project_dir
+
+def resolve_env_name(env_name_cli: str, project_dir: Path) -> str:
+    # --env, then env.yaml of the project, then SEQUOR_ENV; None if no environment is set
+    env_os_var = os.environ.get("SEQUOR_ENV")
+    env_project_file = project_dir / "env.yaml"
+    env_name = None
+    if env_name_cli:
+        env_name = env_name_cli
+    elif env_project_file.exists():
+        with env_project_file.open("r") as f:
+            env_project_data = yaml.safe_load(f)
+            if "env" not in env_project_data:
+                raise UserError(f"'env' key not found in project environment file: {env_project_file}")
+            env_name = env_project_data["env"]
+    elif env_os_var:
+        env_name = env_os_var
+    return env_name
+
+def resolve_env_names(env_names_cli: str, home_dir: Path) -> List[str]:
+    # names and glob patterns matched against envs/<name>.yaml of the home dir
+    available_env_names = sorted(env_file.stem for env_file in (home_dir / "envs").glob("*.yaml"))
+    env_names = []
+    for pattern in [pattern.strip() for pattern in env_names_cli.split(",") if pattern.strip()]:
+        if any(c in pattern for c in "*?["):
+            matched = fnmatch.filter(available_env_names, pattern)
+            if not matched:
+                raise UserError(f"No environment matches \"{pattern}\"")
+        else:
+            matched = [pattern]
+        env_names.extend(env_name for env_name in matched if env_name not in env_names)
+    if not env_names:
+        raise UserError("--envs does not specify any environment")
+    return env_names
+
+def run_for_envs(instance: Instance, project, op, env_names: List[str], parallel: int, job_options: dict, op_options: dict):
+    # One process for many environments: the project (parsed files, compiled flows, engines) is shared,
+    # every environment has its own Environment, Job and Context, its own project state and its own log stream.
+    from sequor.common.log_context import current_env_name, enable_env_log_streams
+    from sequor.core.job import Job
+
+    logger = logging.getLogger("sequor.cli")
+    if parallel < 1:
+        raise UserError(f"--parallel must be a positive integer: {parallel}")
+    enable_env_log_streams(instance.log_dir)
+
+    def run_env(env_name):
+        current_env_name.set(env_name) # the function runs in its own copy of the contextvars
+        env = Environment(env_name, instance.get_home_dir())
+        env.load()
+        env.isolated_state = True
+        return Job(env, project, op, job_options).run(op_options)["status"]
+
+    statuses = {}
+    with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="sequor-env") as executor:
+        futures = {executor.submit(contextvars.copy_context().run, run_env, env_name): env_name for env_name in env_names}
+        for future in as_completed(futures):
+            env_name = futures[future]
+            try:
+                statuses[env_name] = future.result()
+            except Exception as e:
+                # e.g. environment file cannot be loaded
+                logger.error(f"Error in environment \"{env_name}\": {e}")
+                statuses[env_name] = "failed"
+    failed_env_names = [env_name for env_name in env_names if statuses[env_name] != "succeeded"]
+    logger.info(f"Finished {len(env_names)} environments: {len(env_names) - len(failed_env_names)} succeeded, {len(failed_env_names)} failed")
+    if failed_env_names:
+        raise UserError("Failed environments: " + ", ".join(failed_env_names))
+
 @app.command()
 def run(
     flow_name: str = typer.Argument(..., help="Flow to run (e.g. 'myflow' or 'salesforce/account_sync')"),
@@ -103,6 +181,8 @@ def run(
     home_dir_cli: str = typer.Option(None, "--home-dir", help="Path to Sequor home directory"),
     project_dir_cli: str = typer.Option(None, "--project-dir", "-p", help="Path to Sequor project"),
     env_name_cli: str = typer.Option(None, "--env", help="Environment name"),
+    env_names_cli: str = typer.Option(None, "--envs", help="Run the flow for several environments in one process: comma-separated names and/or glob patterns (e.g. 'acme,globex' or 'customer_*')"),
+    parallel: int = typer.Option(1, "--parallel", help="Number of environments run at the same time (with --envs)"),
 
     # Job-level options
     disable_flow_stacktrace: bool = typer.Option(False, "--disable-flow-stacktrace", help="Show the execution path through the flow operations", is_flag=True),
@@ -116,62 +196,41 @@ def run(
     debug_request_preview_pretty: bool = typer.Option(False, "--debug-httprequest-preview-pretty", help="Run only HTTP request part and show pretty trace", is_flag=True),
     debug_response_parser_preview: bool = typer.Option(False, "--debug-httprequest-response-parser-preview", help="Show parser result without applying it", is_flag=True),
 ):
+    # imported here and not at module level to keep startup of other commands (version, --help) fast
+    from sequor.core.job import Job
+    from sequor.operations.run_flow import RunFlowOp
+    from sequor.project.project import Project
+
     logger = logging.getLogger("sequor.cli")
+    project = None
     try:
         instance = Instance(home_dir_cli)
         # logger.info("Starting Sequor CLI")
-        telemetry_logger = telemetry.getLogger("sequor.cli")
-        telemetry_logger.event("cli_start", command="run")
-        
-        # Setting project dir
-        if project_dir_cli:
-            project_dir = Path(project_dir_cli)
-            if not project_dir.exists():
-                raise UserError(f"Project directory passed as CLI --project-dir argument does not exist: {project_dir_cli}")            
-        else:
-            current_dir = os.getcwd()
-            project_dir = Path(current_dir)
-
-        # Setting env dir
-        env_os_var = os.environ.get("SEQUOR_ENV")
-        env_project_file = project_dir / "env.yaml"
-        # default_env_dir = Path.home() / "sequor_env"
-        if env_name_cli:
-            env_name = env_name_cli
-            # env_dir = Path(os.path.expanduser(env_dir_cli))
-            # if not env_dir.exists():
-            #     raise UserError(f"Environment directory passed as CLI --env-dir argument does not exist: {env_dir_cli}")
-        elif env_project_file.exists():
-            with env_project_file.open("r") as f:
-                env_project_data = yaml.safe_load(f)
-                if "env" not in env_project_data:
-                    raise UserError(f"'env' key not found in project environment file: {env_project_file}")
-                env_name = env_project_data["env"]
-                # env_dir = Path(os.path.expanduser(project_env_data["env_dir"]))
-                # if not env_dir.exists():
-                #     raise UserError(f"Environment directory referenced in project environment file sequor_env.yaml does not exist: {env_dir}")
-        elif env_os_var:
-            env_name = env_os_var
-            # env_dir = Path(os.path.expanduser(env_os_var))
-            # if not env_dir.exists():
-            #     raise UserError(f"Environment directory passed as SEQUOR_ENV environment variable does not exist: {env_os_var}")
-        # elif default_env_dir.exists():
-        #     env_dir = default_env_dir
-        # else:
-        #     raise UserError(f"Environment directory not found. Please specify it using --env-dir argument, SEQUOR_ENV environment variable, or in project sequor_env.ymal.")
-
-        # Initialize an environment
-        if env_name is not None:
-            env = Environment(env_name, instance.get_home_dir())
-            env.load()
+
+        project_dir = resolve_project_dir(project_dir_cli)
+        if env_names_cli is not None:
+            if env_name_cli is not None:
+                raise UserError("--env and --envs cannot be used together")
+            env_names = resolve_env_names(env_names_cli, instance.get_home_dir())
+            env = None
         else:
-            env = Environment.create_empty(instance.get_home_dir())
+            env_name = resolve_env_name(env_name_cli, project_dir)
+
+            # Initialize an environment
+            if env_name is not None:
+                env = Environment(env_name, instance.get_home_dir())
+                env.load()
+            else:
+                env = Environment.create_empty()
 
         # # Register all operations at program startup
         # register_all_operations()
 
         # Initialize a project
         project = Project(project_dir, instance.get_home_dir())
+        # sent after the project is loaded: the project can turn telemetry off
+        telemetry_logger = telemetry.getLogger("sequor.cli")
+        telemetry_logger.event("cli_start", command="run")
 
         op_options = {
             "debug_foreach_record": debug_foreach_record,
@@ -193,8 +252,107 @@ def run(
                 "parameters": {}
             }
             op = RunFlowOp(project, run_flow_op_def)
-        job = Job(env, project, op, {"disable_flow_stacktrace": disable_flow_stacktrace, "show_stacktrace": show_stacktrace})
-        job.run(op_options)
+        job_options = {"disable_flow_stacktrace": disable_flow_stacktrace, "show_stacktrace": show_stacktrace}
+        if env is not None:
+            job = Job(env, project, op, job_options)
+            job.run(op_options)
+        else:
+            run_for_envs(instance, project, op, env_names, parallel, job_options, op_options)
+    except Exception as e:
+        if show_stacktrace:
+            job_stacktrace = Common.get_exception_traceback()
+            logger.error("Python stacktrace:\n" + job_stacktrace)
+        logger.error(str(e))
+        raise typer.Exit(code=1)
+    finally:
+        # engines (connection pools) are shared by the jobs of the project
+        if project is not None:
+            project.close()
+
+@app.command()
+def dag(
+    flow_names: List[str] = typer.Argument(None, help="Flows to run together with the flows they depend on ('depends_on' in flow files). All flows of the project if omitted"),
+    home_dir_cli: str = typer.Option(None, "--home-dir", help="Path to Sequor home directory"),
+    project_dir_cli: str = typer.Option(None, "--project-dir", "-p", help="Path to Sequor project"),
+    env_name_cli: str = typer.Option(None, "--env", help="Environment name"),
+    workers: int = typer.Option(4, "--workers", help="Maximum number of flows running at the same time"),
+    rerun_failed: bool = typer.Option(False, "--rerun-failed", help="Rerun the previous DAG run: flows that succeeded are not run again", is_flag=True),
+    disable_flow_stacktrace: bool = typer.Option(False, "--disable-flow-stacktrace", help="Show the execution path through the flow operations", is_flag=True),
+    show_stacktrace: bool = typer.Option(False, "--stacktrace", help="Show the Python exception stack trace", is_flag=True),
+):
+    """Run flows in the order of their dependencies, independent flows concurrently"""
+    from sequor.core.flow_dag import FlowDAG
+    from sequor.core.job import Job
+    from sequor.project.project import Project
+
+    logger = logging.getLogger("sequor.cli")
+    project = None
+    try:
+        instance = Instance(home_dir_cli)
+        project_dir = resolve_project_dir(project_dir_cli)
+        env_name = resolve_env_name(env_name_cli, project_dir)
+        if workers < 1:
+            raise UserError(f"--workers must be a positive integer: {workers}")
+        if env_name is not None:
+            env = Environment(env_name, instance.get_home_dir())
+            env.load()
+        else:
+            env = Environment.create_empty()
+        project = Project(project_dir, instance.get_home_dir())
+        telemetry_logger = telemetry.getLogger("sequor.cli")
+        telemetry_logger.event("cli_start", command="dag")
+
+        flow_dag = FlowDAG(project, flow_names or project.list_flows())
+        job_options = {"disable_flow_stacktrace": disable_flow_stacktrace, "show_stacktrace": show_stacktrace}
+        def run_flow(flow_name):
+            return Job.for_flow(env, project, flow_name, job_options).run({})["status"]
+        statuses = flow_dag.run(run_flow, workers, rerun_failed)
+
+        failed_flows = [flow_name for flow_name, status in statuses.items() if status != "succeeded"]
+        logger.info(f"DAG finished: {len(statuses) - len(failed_flows)} of {len(statuses)} flows succeeded")
+        if failed_flows:
+            raise UserError("Flows did not succeed (rerun them with --rerun-failed): " + ", ".join(f"{flow_name} ({statuses[flow_name]})" for flow_name in failed_flows))
+    except Exception as e:
+        if show_stacktrace:
+            job_stacktrace = Common.get_exception_traceback()
+            logger.error("Python stacktrace:\n" + job_stacktrace)
+        logger.error(str(e))
+        raise typer.Exit(code=1)
+    finally:
+        if project is not None:
+            project.close()
+
+@app.command()
+def serve(
+    home_dir_cli: str = typer.Option(None, "--home-dir", help="Path to Sequor home directory"),
+    project_dir_cli: str = typer.Option(None, "--project-dir", "-p", help="Path to Sequor project"),
+    env_name_cli: str = typer.Option(None, "--env", help="Default environment for run requests and schedules without 'env'"),
+    host: str = typer.Option("127.0.0.1", "--host", help="Address of the HTTP endpoint (local only by default)"),
+    port: int = typer.Option(8765, "--port", help="Port of the HTTP endpoint"),
+    max_jobs: int = typer.Option(4, "--max-jobs", help="Maximum number of jobs running at the same time"),
+    max_queued: int = typer.Option(100, "--max-queued", help="Maximum number of jobs waiting for a free slot"),
+    disable_flow_stacktrace: bool = typer.Option(False, "--disable-flow-stacktrace", help="Show the execution path through the flow operations", is_flag=True),
+    show_stacktrace: bool = typer.Option(False, "--stacktrace", help="Show the Python exception stack trace", is_flag=True),
+):
+    """Run flows on the cron schedules of project.yaml and on requests to a local HTTP endpoint (POST /run, GET /jobs/<id>)"""
+    from sequor.core.daemon import Daemon
+    from sequor.project.project import Project
+
+    logger = logging.getLogger("sequor.cli")
+    try:
+        instance = Instance(home_dir_cli)
+        project_dir = resolve_project_dir(project_dir_cli)
+        env_name = resolve_env_name(env_name_cli, project_dir)
+        if max_jobs < 1:
+            raise UserError(f"--max-jobs must be a positive integer: {max_jobs}")
+        project = Project(project_dir, instance.get_home_dir())
+        telemetry_logger = telemetry.getLogger("sequor.cli")
+        telemetry_logger.event("cli_start", command="serve")
+        daemon = Daemon(project, instance.get_home_dir(), env_name, max_jobs, max_queued,
+                        {"disable_flow_stacktrace": disable_flow_stacktrace, "show_stacktrace": show_stacktrace})
+        daemon.serve(host, port)
+    except KeyboardInterrupt:
+        logger.info("Stopped")
     except Exception as e:
         if show_stacktrace:
             job_stacktrace = Common.get_exception_traceback()
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+from typing import List, Set
+
+from sequor.core.user_error import UserError
+
+_ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# (name, min, max) of the 5 fields
+_FIELDS = [("minute", 0, 59), ("hour", 0, 23), ("day of month", 1, 31), ("month", 1, 12), ("day of week", 0, 7)]
+
+
+class CronSchedule:
+    """Standard 5-field cron expression: minute hour day-of-month month day-of-week.
+
+    Supports *, lists (1,15), ranges (1-5), steps (*/10, 0-30/5) and @hourly/@daily/@weekly/@monthly/@yearly.
+    Day of week is 0-7 (0 and 7 are Sunday). As in cron, when both day of month and day of week are restricted
+    a day matches if either of them matches.
+    """
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = _ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise UserError(f"Invalid cron expression \"{expression}\": expected 5 fields (minute hour day-of-month month day-of-week)")
+        parsed: List[Set[int]] = []
+        for field, (field_name, min_value, max_value) in zip(fields, _FIELDS):
+            parsed.append(self._parse_field(expression, field, field_name, min_value, max_value))
+        self.minutes, self.hours, self.days, self.months, self.weekdays = parsed
+        if 7 in self.weekdays:
+            self.weekdays.add(0)
+        self.days_restricted = fields[2] != "*"
+        self.weekdays_restricted = fields[4] != "*"
+
+    @staticmethod
+    def _parse_field(expression: str, field: str, field_name: str, min_value: int, max_value: int) -> Set[int]:
+        values = set()
+        for part in field.split(","):
+            range_part, _, step_part = part.partition("/")
+            try:
+                step = int(step_part) if step_part else 1
+                if range_part == "*":
+                    start, end = min_value, max_value
+                elif "-" in range_part:
+                    start, end = (int(v) for v in range_part.split("-", 1))
+                else:
+                    start = int(range_part)
+                    end = max_value if step_part else start
+            except ValueError:
+                raise UserError(f"Invalid {field_name} field \"{field}\" in cron expression \"{expression}\"")
+            if step < 1 or start < min_value or end > max_value or start > end:
+                raise UserError(f"Invalid {field_name} field \"{field}\" in cron expression \"{expression}\": values must be in {min_value}-{max_value}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        if dt.month not in self.months:
+            return False
+        day_match = dt.day in self.days
+        weekday_match = (dt.weekday() + 1) % 7 in self.weekdays # cron: 0 = Sunday, python: 0 = Monday
+        if self.days_restricted and self.weekdays_restricted:
+            return day_match or weekday_match
+        return day_match and weekday_match
+
+    def matches(self, dt: datetime) -> bool:
+        return dt.minute in self.minutes and dt.hour in self.hours and self._day_matches(dt)
+
+    def next_after(self, dt: datetime) -> datetime:
+        """First matching minute strictly after dt"""
+        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # 4 years cover every combination of month day and week day (e.g. "0 0 29 2 1")
+        limit = candidate + timedelta(days=366 * 4)
+        while candidate < limit:
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise UserError(f"Cron expression \"{self.expression}\" never matches")
@@ -1,3 +1,5 @@
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 from typing import Any, Dict, List
 from sqlalchemy import Connection
 from sequor.core.context import Context
@@ -6,6 +8,7 @@ from sequor.source.model import Model
 from sequor.source.row import Row
 from sequor.source.table_address import TableAddress
 from sequor.source.column import Column
+from sequor.source.columnar import column_batch_to_tuples, is_dataframe, value_to_str
 
 class TableAddressToConnectionMap:
     def __init__(self, table_addr: TableAddress, conn: Connection):
@@ -15,8 +18,10 @@ class TableAddressToConnectionMap:
 
 class DataLoader:
     """Class for loading data from data definition"""
-    def __init__(self, proj):
+    batch_size = 1000 # rows per executemany
+    def __init__(self, proj, env: 'Environment' = None):
         self.proj = proj
+        self.env = env # project variables are committed to the state of this environment
         # self.source_name = source_name
         # self.table_addrs = table_addrs
         self._conn_pool: List[TableAddressToConnectionMap] = []
@@ -74,6 +79,39 @@ class DataLoader:
             if mapping.conn is not None:
                 mapping.conn.close_table_for_insert()
                 mapping.conn.close()
+        # loaded data is committed -> commit project variables (e.g. pagination cursors) that describe this progress
+        self.proj.flush_variables(self.env)
+
+    @contextmanager
+    def row_transaction(self):
+        """Data loaded in the block is kept only if the block succeeds (for_each rows with on_error: continue).
+
+        Data loaded before the block is committed first, so a failed block rolls back just its own rows.
+        Savepoints would avoid the commit per block, but DuckDB does not support them.
+        """
+        for mapping in self._conn_pool:
+            mapping.conn.commit()
+        pool_size = len(self._conn_pool)
+        try:
+            yield
+        except BaseException:
+            for mapping in self._conn_pool[:pool_size]:
+                mapping.conn.rollback()
+            # tables created in the block are gone after the rollback: the next block opens (and creates) them again
+            for mapping in self._conn_pool[pool_size:]:
+                mapping.conn.rollback()
+                mapping.conn.close()
+            del self._conn_pool[pool_size:]
+            raise
+
+    def load_file(self, context: Context, table_addr: TableAddress, file_path: str, file_format: str, compression: str = None,
+                  delimiter: str = ",", header: bool = True, records_path: str = None) -> None:
+        """Bulk load a downloaded file into the table (natively where the source supports it)"""
+        write_mode = table_addr.write_mode
+        if write_mode is None:
+            write_mode = "create"
+        conn = self.get_connection(context, table_addr, write_mode)
+        conn.bulk_load_file(file_path, file_format, compression, delimiter, header, records_path)
 
     def run(self, context: Context, tables: List[TableAddress]) -> None:  # List[Dict[str, Any]]
         # if isinstance(tables_def, dict): # data for tables defined in response.tables section of http_request op
@@ -100,17 +138,40 @@ class DataLoader:
             conn = self.get_connection(context, table_addr, write_mode)
             # insert data
             table_data = table_addr.data
-            if not isinstance(table_data, list):
-                raise UserError(f"'data' for table '{table_addr.table_name}' must be a list. Type '{type(table_data).__name__}' provided: {str(table_data)}")
-            for record_def in table_data:
-                record = Row()
-                for column_schema in conn.model.columns:
-                    column_name = column_schema.name
-                    if not isinstance(record_def, dict):
-                        raise UserError(f"Element of 'data' array for table '{table_addr.table_name}' must be a dictionary.  Type '{type(record_def).__name__}' provided: {str(record_def)}")
-                    column_value = record_def.get(column_name)
-                    column_value_str = str(column_value) if column_value is not None else None # need to convert to string because it can be any type returned by the source
-                    column = Column(column_name, column_value_str)
-                    record.add_column(column)
-                conn.insert_row(record)
+            if is_dataframe(table_data):
+                conn.insert_dataframe(table_data, self.batch_size)
+            elif isinstance(table_data, dict):
+                self._insert_columns(conn, table_addr, table_data)
+            elif isinstance(table_data, (list, tuple, Iterator)):
+                self._insert_records(conn, table_addr, table_data)
+            else:
+                raise UserError(f"'data' for table '{table_addr.table_name}' must be a list or an iterator of records, a dictionary of column lists, a pyarrow Table or a pandas DataFrame. Type '{type(table_data).__name__}' provided: {str(table_data)}")
+
+    def _insert_records(self, conn: Connection, table_addr: TableAddress, records: Iterable[Any]):
+        # records are consumed in batches: generators are never materialized as a whole
+        column_names = [column_schema.name for column_schema in conn.model.columns]
+        batch = []
+        for record_def in records:
+            if not isinstance(record_def, dict):
+                raise UserError(f"Element of 'data' array for table '{table_addr.table_name}' must be a dictionary.  Type '{type(record_def).__name__}' provided: {str(record_def)}")
+            batch.append(tuple([value_to_str(record_def.get(column_name)) for column_name in column_names]))
+            if len(batch) >= self.batch_size:
+                conn.insert_rows(batch)
+                batch = []
+        conn.insert_rows(batch)
 
+    def _insert_columns(self, conn: Connection, table_addr: TableAddress, columns: Dict[str, Any]):
+        # columnar data: {column: [values]}, all lists of the same length
+        row_count = None
+        for column_name, column_values in columns.items():
+            if not isinstance(column_values, (list, tuple)):
+                raise UserError(f"Column '{column_name}' in 'data' for table '{table_addr.table_name}' must be a list. Type '{type(column_values).__name__}' provided")
+            if row_count is not None and len(column_values) != row_count:
+                raise UserError(f"Columns in 'data' for table '{table_addr.table_name}' must have the same number of values: '{column_name}' has {len(column_values)}, expected {row_count}")
+            row_count = len(column_values)
+        if row_count is None:
+            return
+        column_names = [column_schema.name for column_schema in conn.model.columns]
+        for start in range(0, row_count, self.batch_size):
+            batch_columns = {column_name: column_values[start:start + self.batch_size] for column_name, column_values in columns.items()}
+            conn.insert_rows(column_batch_to_tuples(batch_columns, column_names))
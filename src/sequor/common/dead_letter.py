@@ -0,0 +1,118 @@
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Union
+
+from sequor.common.data_loader import DataLoader
+from sequor.core.context import Context
+from sequor.core.op import Op
+from sequor.core.user_error import UserError
+from sequor.source.row import Row
+from sequor.source.table_address import TableAddress
+
+# Columns of a dead-letter table
+DEAD_LETTER_MODEL_DEF = {
+    "columns": [
+        {"name": "input_row", "type": "text"},
+        {"name": "status", "type": "text"},
+        {"name": "response_snippet", "type": "text"},
+        {"name": "error_message", "type": "text"},
+    ]
+}
+RESPONSE_SNIPPET_LENGTH = 1000
+
+
+class DeadLetterWriter:
+    """Writes failed rows to a dead-letter table in batches through a DataLoader of its own"""
+    batch_size = 100
+
+    def __init__(self, context: Context, table_addr: TableAddress):
+        self.context = context
+        self.table_addr = table_addr
+        self.data_loader = DataLoader(context.project, context.env)
+        self._batch: List[Dict[str, Any]] = []
+
+    def add(self, input_row: Any, error: Exception):
+        if isinstance(input_row, Row):
+            input_row = input_row.to_dict()
+        response_text = getattr(error, "response_text", None)
+        status_code = getattr(error, "status_code", None)
+        self._batch.append({
+            "input_row": json.dumps(input_row, default=str),
+            "status": str(status_code) if status_code is not None else None,
+            "response_snippet": response_text[:RESPONSE_SNIPPET_LENGTH] if response_text is not None else None,
+            "error_message": str(error),
+        })
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._batch:
+            return
+        table_addr = self.table_addr.clone()
+        table_addr.data = self._batch
+        self._batch = []
+        self.data_loader.run(self.context, [table_addr])
+        # the table is created by the first batch, the next batches are appended to it
+        self.table_addr.write_mode = "append"
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.data_loader.close()
+
+
+class RowErrorPolicy:
+    """on_error: continue -> failed rows are counted against max_errors, logged and written to the optional dead-letter table.
+
+    Without on_error (or with on_error: fail) there is no policy and the first failed row fails the op.
+    """
+    def __init__(self, max_errors: Union[int, None], dead_letter_writer: Union[DeadLetterWriter, None]):
+        self.max_errors = max_errors
+        self.dead_letter_writer = dead_letter_writer
+        self.error_count = 0
+        self._lock = threading.Lock() # rows can fail in worker threads (parallel for_each)
+
+    @classmethod
+    def from_def(cls, context: Context, op_def: Dict[str, Any], location_desc: str = None) -> Union['RowErrorPolicy', None]:
+        on_error = Op.get_parameter(context, op_def, 'on_error', is_required=False, render=3, location_desc=location_desc)
+        if on_error is None or on_error == "fail":
+            return None
+        if on_error != "continue":
+            raise UserError(f"'on_error' must be 'fail' or 'continue': {on_error}")
+        max_errors = Op.get_parameter(context, op_def, 'max_errors', is_required=False, render=3, location_desc=location_desc)
+        if max_errors is not None:
+            try:
+                max_errors = int(max_errors)
+            except (TypeError, ValueError):
+                raise UserError(f"'max_errors' must be a non-negative integer: {max_errors}")
+            if max_errors < 0:
+                raise UserError(f"'max_errors' must be a non-negative integer: {max_errors}")
+        dead_letter_def = Op.get_parameter(context, op_def, 'dead_letter', is_required=False, render=3, location_desc=location_desc)
+        dead_letter_writer = None
+        if dead_letter_def is not None:
+            dead_letter_table_addr = TableAddress(
+                Op.get_parameter(context, dead_letter_def, 'source', is_required=True, render=3, location_desc="dead_letter"),
+                Op.get_parameter(context, dead_letter_def, 'database', is_required=False, render=3),
+                Op.get_parameter(context, dead_letter_def, 'namespace', is_required=False, render=3),
+                Op.get_parameter(context, dead_letter_def, 'table', is_required=True, render=3, location_desc="dead_letter"),
+                DEAD_LETTER_MODEL_DEF,
+                None,
+                Op.get_parameter(context, dead_letter_def, 'write_mode', is_required=False, render=3) or "create")
+            dead_letter_writer = DeadLetterWriter(context, dead_letter_table_addr)
+        return cls(max_errors, dead_letter_writer)
+
+    def handle(self, input_row: Any, error: Exception):
+        logger = logging.getLogger("sequor.dead_letter")
+        with self._lock:
+            self.error_count += 1
+            if self.max_errors is not None and self.error_count > self.max_errors:
+                raise UserError(f"Number of failed rows exceeded max_errors ({self.max_errors}). Last error: {error}") from error
+            logger.warning(f"Row failed, continuing (on_error: continue): {error}")
+            if self.dead_letter_writer is not None:
+                self.dead_letter_writer.add(input_row, error)
+
+    def close(self):
+        if self.dead_letter_writer is not None:
+            self.dead_letter_writer.close()
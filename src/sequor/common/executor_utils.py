@@ -1,16 +1,20 @@
 import ast
 import builtins
+from functools import lru_cache
 import logging
-from typing import Any, Callable, List, NamedTuple
+import sys
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, NamedTuple
 from sequor.core.context import Context
 from jinja2 import Template, StrictUndefined
 
 from sequor.core.execution_stack_entry import ExecutionStackEntry
 from sequor.core.user_error import UserError
+from sequor.source.query_cache import estimate_rows_size
 from sequor.source.table_address import TableAddress
 
 # if you add anything here, you must also add it to Op.eval_parameter: context, ... standard functions ..., ... extra_params ...
-user_function_params_def = ["context", "is_var_defined", "var", "table", "query", "query_scalar", "response"]
+user_function_params_def = ["context", "is_var_defined", "var", "table", "query", "query_scalar", "lookup", "iter_query", "iter_table", "response"]
 
 
 
@@ -34,7 +38,7 @@ def set_variable(context: Context, name: str, value: Any, scope: str):
     if scope == "local":
         context.set_variable(name, value)
     elif scope == "project":
-        context.project.set_variable(name, value)
+        context.project.set_variable(name, value, context.env)
     else:
         raise UserError(f"Setting variable \"{name}\" in invalid scope: {scope}")
 
@@ -44,13 +48,10 @@ class UserSourcesAPI:
         self.user_context = user_context
     
     def query(self, source_name: str, query: str, database_name: str = None, namespace_name: str = None):
-        source = self.context.project.get_source(self.context, source_name)
-        result = []
-        with source.connect() as conn:
-            conn.open_query(query)
-            while row := conn.next_row():
-                result.append(row)
-        return result
+        return self.user_context.query(source_name, query)
+
+    def iter_query(self, source_name: str, query: str, database_name: str = None, namespace_name: str = None, batch_size: int = 1000):
+        return self.user_context.iter_query(source_name, query, batch_size)
     
 class UserContext:
     def __init__(self, context: Context):
@@ -70,9 +71,8 @@ class UserContext:
             raise UserError(f"Variable '{name}' is not defined")
         return value
     
-    def table(self, source_name: str, table_name: str, database_name: str = None, spacename_name: str = None):
-        source = self.context.project.get_source(self.context, source_name)
-        table_addr = TableAddress(source_name, database_name, spacename_name, table_name)
+    @staticmethod
+    def _read_table(source, table_addr: TableAddress):
         result = []
         with source.connect() as conn:
             conn.open_table_for_read(table_addr)
@@ -83,9 +83,9 @@ class UserContext:
                 result.append(row)
                 row = conn.next_row()
         return result
-    
-    def query(self, source_name: str, query: str):
-        source = self.context.project.get_source(self.context, source_name)
+
+    @staticmethod
+    def _read_query(source, query: str):
         result = []
         with source.connect() as conn:
             conn.open_query(query)
@@ -96,6 +96,73 @@ class UserContext:
                 result.append(row)
                 row = conn.next_row()
         return result
+
+    def table(self, source_name: str, table_name: str, database_name: str = None, spacename_name: str = None):
+        source = self.context.project.get_source(self.context, source_name)
+        table_addr = TableAddress(source_name, database_name, spacename_name, table_name)
+        query_cache = source.get_query_cache()
+        if query_cache is None:
+            return self._read_table(source, table_addr)
+        def load():
+            rows = self._read_table(source, table_addr)
+            return rows, estimate_rows_size(rows)
+        # a new list: callers may add or remove rows, the cached rows themselves are shared
+        return list(query_cache.get_or_load(("table", database_name, spacename_name, table_name), load))
+    
+    def query(self, source_name: str, query: str):
+        source = self.context.project.get_source(self.context, source_name)
+        query_cache = source.get_query_cache()
+        if query_cache is None:
+            return self._read_query(source, query)
+        def load():
+            rows = self._read_query(source, query)
+            return rows, estimate_rows_size(rows)
+        return list(query_cache.get_or_load(("query", query), load))
+
+    def iter_table(self, source_name: str, table_name: str, database_name: str = None, namespace_name: str = None, batch_size: int = 1000):
+        """Rows of a table one by one, fetched in batches of batch_size: memory use does not grow with the table size.
+
+        The connection is released when the rows are exhausted or the iterator is closed (close() or garbage collection).
+        """
+        source = self.context.project.get_source(self.context, source_name)
+        table_addr = TableAddress(source_name, database_name, namespace_name, table_name)
+        with source.connect() as conn:
+            conn.open_table_for_read(table_addr, fetch_size=batch_size)
+            row = conn.next_row()
+            while row is not None:
+                yield row
+                row = conn.next_row()
+
+    def iter_query(self, source_name: str, query: str, batch_size: int = 1000):
+        """Rows of a query one by one, fetched in batches of batch_size (see iter_table())"""
+        source = self.context.project.get_source(self.context, source_name)
+        with source.connect() as conn:
+            conn.open_query(query, fetch_size=batch_size)
+            row = conn.next_row()
+            while row is not None:
+                yield row
+                row = conn.next_row()
+
+    def lookup(self, source_name: str, table_name: str, key_column: str, database_name: str = None, namespace_name: str = None):
+        """Rows of a table indexed by key_column: lookup(...)[key] or lookup(...).get(key) returns the row.
+
+        The index is built on the first call and reused for the rest of the job (see the query_cache source property for ttl and size).
+        """
+        source = self.context.project.get_source(self.context, source_name)
+        table_addr = TableAddress(source_name, database_name, namespace_name, table_name)
+        def load():
+            rows = self._read_table(source, table_addr)
+            index = {}
+            for row in rows:
+                key = row[key_column]
+                if key in index:
+                    raise UserError(f"lookup error: duplicate value of key column '{key_column}' in table '{table_name}': {key}")
+                index[key] = row
+            return MappingProxyType(index), estimate_rows_size(rows) + sys.getsizeof(index)
+        query_cache = source.get_query_cache(required=True)
+        if query_cache is None:
+            return load()[0]
+        return query_cache.get_or_load(("lookup", database_name, namespace_name, table_name, key_column), load)
     
     def query_scalar(self, source_name: str, query: str):
         source = self.context.project.get_source(self.context, source_name)
@@ -114,28 +181,52 @@ class UserContext:
     
 
 
-def build_jinja_user_context(context: Context):
+def build_jinja_user_context(context: Context, referenced_vars: Dict[str, Any] = None):
     def var(name):
         value = context.get_variable_value(name)
         if value is None:
             raise UserError(f"Variable '{name}' is not defined")
+        if referenced_vars is not None:
+            referenced_vars[name] = value
         return value
     return {
         "var": var
     }
 
 # Recursively render all values in parsed YAML
-def render_jinja(context, any_def, null_literal: bool = False):
-    jinja_context = build_jinja_user_context(context)
+# referenced_vars (optional) collects the variables used by the templates with their values
+def render_jinja(context, any_def, null_literal: bool = False, referenced_vars: Dict[str, Any] = None):
+    jinja_context = build_jinja_user_context(context, referenced_vars)
     try:
         any_def_rendered = _render_jinja_helper(any_def, jinja_context, null_literal)
     except Exception as e:
         raise UserError(f"Error rendering Jinja template \"{str(e)}\" in definition: {str(any_def)}")
     return any_def_rendered
 
+JINJA_MARKERS = ("{{", "{%", "{#")
+
+def has_jinja_markers(any_def) -> bool:
+    """True if any string in any_def is a Jinja template (i.e. rendering can change it)"""
+    if isinstance(any_def, str):
+        return any(marker in any_def for marker in JINJA_MARKERS)
+    elif isinstance(any_def, dict):
+        return any(has_jinja_markers(v) for v in any_def.values())
+    elif isinstance(any_def, list):
+        return any(has_jinja_markers(v) for v in any_def)
+    return False
+
+# compiling a template costs much more than rendering it: templates are compiled once per distinct string
+@lru_cache(maxsize=1024)
+def _get_jinja_template(template_str: str) -> Template:
+    return Template(template_str, undefined=StrictUndefined)
+
 # Utility function to render a string with Jinja
 def _render_jinja_str(template_str, jinja_context, null_literal: bool):
-    str_rendered = Template(template_str, undefined=StrictUndefined).render(jinja_context)
+    if "\r" not in template_str and not any(marker in template_str for marker in JINJA_MARKERS):
+        # plain text renders to itself except for the trailing newline that Jinja strips
+        str_rendered = template_str[:-1] if template_str.endswith("\n") else template_str
+    else:
+        str_rendered = _get_jinja_template(template_str).render(jinja_context)
     if null_literal and str_rendered == "__NULL__": # compare case sensitive to align with YAML which is case sensitive
         str_rendered = None
     return str_rendered
@@ -199,6 +290,9 @@ def user_function_error_message(e: Exception, key_name: str, line_in_code: int,
     error_msg = f"{prefix} in {key_name} ({position_in_code}line {absolute_line_in_yaml} in YAML): {type(e).__name__}: {str(e)}"
     return error_msg
 
+# the same code (e.g. data_expression of a table evaluated for every response) is compiled once;
+# user functions keep no state so the compiled function can be shared
+@lru_cache(maxsize=1024)
 def load_user_function(function_code: str, key_name: str, line_in_yaml: int): # function_params_def: str = "context", 
     # must match parameters passed in Op.eval_parameter of op.py
     function_name: str = "evaluate"
@@ -0,0 +1,50 @@
+import json
+from typing import Any, Union
+
+# Fastest available JSON library: orjson, then msgspec, then the standard library.
+# All backends produce and accept the same JSON; only speed differs.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+msgspec = None
+if orjson is None:
+    try:
+        import msgspec.json
+    except ImportError:
+        msgspec = None
+
+if orjson is not None:
+    BACKEND = "orjson"
+elif msgspec is not None:
+    BACKEND = "msgspec"
+else:
+    BACKEND = "json"
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode obj as UTF-8 JSON"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass # e.g. integers wider than 64 bits: the standard library handles them
+    elif msgspec is not None:
+        try:
+            return msgspec.json.encode(obj)
+        except (TypeError, OverflowError, msgspec.EncodeError):
+            pass
+    return json.dumps(obj).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON; raises ValueError for invalid input with every backend"""
+    if orjson is not None:
+        return orjson.loads(data) # orjson.JSONDecodeError is a ValueError
+    if msgspec is not None:
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            # msgspec errors are not ValueErrors: callers catch ValueError
+            raise ValueError(str(e)) from e
+    return json.loads(data)
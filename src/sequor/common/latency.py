@@ -0,0 +1,26 @@
+from collections import deque
+import threading
+from typing import Union
+
+
+class LatencyTracker:
+    """Latencies (seconds) of the most recent max_samples requests"""
+    def __init__(self, max_samples: int = 1000):
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def count(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, percent: float) -> Union[float, None]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        # nearest-rank percentile
+        rank = max(1, -(-len(samples) * percent // 100))
+        return samples[int(rank) - 1]
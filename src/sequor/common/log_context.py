@@ -0,0 +1,59 @@
+import contextvars
+import logging
+from pathlib import Path
+from typing import Dict, Union
+
+# Environment of the job running in the current thread (sequor run --envs runs several environments in one process).
+# Worker threads must be started with contextvars.copy_context().run to inherit it.
+current_env_name: contextvars.ContextVar[Union[str, None]] = contextvars.ContextVar("sequor_env_name", default=None)
+
+
+class EnvLogFilter(logging.Filter):
+    """Adds the environment of the current job to records as %(env_prefix)s"""
+    def filter(self, record: logging.LogRecord) -> bool:
+        env_name = current_env_name.get()
+        record.env_prefix = f" [{env_name}]" if env_name is not None else ""
+        return True
+
+
+class EnvFileHandler(logging.Handler):
+    """Writes the records of every environment to its own file: <log_dir>/envs/<env>.log"""
+    def __init__(self, log_dir: Path, formatter: logging.Formatter):
+        super().__init__()
+        self.log_dir = log_dir / "envs"
+        self.setFormatter(formatter)
+        self._handlers: Dict[str, logging.FileHandler] = {}
+
+    def emit(self, record: logging.LogRecord):
+        env_name = current_env_name.get()
+        if env_name is None:
+            return
+        handler = self._handlers.get(env_name)
+        if handler is None:
+            self.acquire()
+            try:
+                handler = self._handlers.get(env_name)
+                if handler is None:
+                    self.log_dir.mkdir(parents=True, exist_ok=True)
+                    handler = logging.FileHandler(self.log_dir / f"{env_name}.log")
+                    handler.setFormatter(self.formatter)
+                    self._handlers[env_name] = handler
+            finally:
+                self.release()
+        handler.handle(record)
+
+    def close(self):
+        for handler in self._handlers.values():
+            handler.close()
+        super().close()
+
+
+def enable_env_log_streams(log_dir: Path):
+    # console and sequor.log lines are prefixed with the environment; each environment also gets its own log file
+    formatter = logging.Formatter("%(asctime)s %(levelname)s [%(name)s]%(env_prefix)s: %(message)s")
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers:
+        handler.addFilter(EnvLogFilter())
+        handler.setFormatter(formatter)
+    env_handler = EnvFileHandler(log_dir, logging.Formatter("%(asctime)s %(levelname)s [%(name)s]: %(message)s"))
+    root_logger.addHandler(env_handler)
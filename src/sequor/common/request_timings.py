@@ -0,0 +1,102 @@
+from contextlib import contextmanager
+import threading
+import time
+from typing import Any, Dict, List
+import urllib.parse
+
+from sequor.common.latency import LatencyTracker
+
+# render: request rendering; auth: token fetch/refresh; ttfb: until response headers (connection setup included);
+# download: reading the body; retry_wait: backoff between attempts; json_parse: response.json();
+# expressions: data, parser, variables and while of the response section; db_load: loading response data into tables
+PHASES = ["render", "auth", "ttfb", "download", "retry_wait", "json_parse", "expressions", "db_load"]
+
+
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.latency_tracker = LatencyTracker()
+
+
+class RequestTimings:
+    """Time spent in each phase of an http_request run and request latencies per endpoint.
+
+    Nested phases are exclusive: time spent in json_parse called from an expression is not counted to expressions.
+    Percentiles are computed over the most recent requests of an endpoint (see LatencyTracker).
+    """
+    # endpoints beyond this number (e.g. ids in the url path) are counted together
+    max_endpoints = 100
+    other_endpoint = "(other)"
+
+    def __init__(self):
+        self.phase_seconds: Dict[str, float] = {name: 0.0 for name in PHASES}
+        self._endpoints: Dict[str, EndpointStats] = {}
+        self._lock = threading.Lock() # requests can finish in hedge threads
+        self._active_phases: List[list] = [] # [name, start] of nested phases of the op thread
+
+    @staticmethod
+    def endpoint_key(method: str, url: str) -> str:
+        # the query string is left out: it usually differs for every request
+        parts = urllib.parse.urlsplit(str(url))
+        return f"{str(method).upper()} {parts.scheme}://{parts.netloc}{parts.path}"
+
+    def add(self, phase: str, seconds: float):
+        with self._lock:
+            self.phase_seconds[phase] += seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        now = time.monotonic()
+        if self._active_phases:
+            parent = self._active_phases[-1]
+            self.add(parent[0], now - parent[1])
+        entry = [name, now]
+        self._active_phases.append(entry)
+        try:
+            yield
+        finally:
+            now = time.monotonic()
+            self._active_phases.pop()
+            self.add(name, now - entry[1])
+            if self._active_phases:
+                self._active_phases[-1][1] = now
+
+    def add_request(self, endpoint: str, seconds: float, failed: bool = False):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                if len(self._endpoints) >= self.max_endpoints:
+                    endpoint = self.other_endpoint
+                    stats = self._endpoints.get(endpoint)
+                if stats is None:
+                    stats = EndpointStats()
+                    self._endpoints[endpoint] = stats
+            stats.count += 1
+            if failed:
+                stats.errors += 1
+        stats.latency_tracker.add(seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = dict(self._endpoints)
+            phase_seconds = dict(self.phase_seconds)
+        endpoints_dict = {}
+        for endpoint, stats in endpoints.items():
+            endpoints_dict[endpoint] = {
+                "count": stats.count,
+                "errors": stats.errors,
+                "p50": stats.latency_tracker.percentile(50),
+                "p95": stats.latency_tracker.percentile(95),
+                "p99": stats.latency_tracker.percentile(99),
+            }
+        return {"phases": phase_seconds, "endpoints": endpoints_dict}
+
+    def summary_lines(self) -> List[str]:
+        timings = self.to_dict()
+        lines = ["Timings: " + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in timings["phases"].items())]
+        for endpoint, stats in timings["endpoints"].items():
+            errors_str = f" ({stats['errors']} failed)" if stats["errors"] else ""
+            lines.append(f"{endpoint}: {stats['count']} requests{errors_str}, "
+                         f"p50 {stats['p50']:.3f}s, p95 {stats['p95']:.3f}s, p99 {stats['p99']:.3f}s")
+        return lines
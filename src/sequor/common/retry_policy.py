@@ -0,0 +1,102 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import random
+from typing import Any, Dict, List, Union
+
+import requests
+
+from sequor.core.user_error import UserError
+
+DEFAULT_STATUS_CODES = [429, 500, 502, 503, 504]
+DEFAULT_EXCEPTIONS = ["ConnectionError", "Timeout", "ChunkedEncodingError"]
+
+
+class RetryPolicy:
+    """Retries of a single HTTP request: exponential backoff with full jitter, Retry-After honoured up to retry_after_max.
+
+    retry: true or
+    retry:
+      max_attempts: 3
+      status_codes: [429, 500, 502, 503, 504]
+      exceptions: [ConnectionError, Timeout, ChunkedEncodingError]  # names from requests.exceptions
+      backoff: {base: 0.5, max: 30}
+      retry_after_max: 60
+    """
+    def __init__(self, max_attempts: int, status_codes: List[int], exceptions: tuple,
+                 backoff_base: float, backoff_max: float, retry_after_max: float):
+        self.max_attempts = max_attempts
+        self.status_codes = set(status_codes)
+        self.exceptions = exceptions
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+
+    @staticmethod
+    def _parse_number(value: Any, name: str, number_type=float, allow_zero: bool = False):
+        try:
+            number = number_type(value)
+        except (TypeError, ValueError):
+            raise UserError(f"'retry.{name}' must be a positive number: {value}")
+        if number < 0 or (number == 0 and not allow_zero):
+            raise UserError(f"'retry.{name}' must be a positive number: {value}")
+        return number
+
+    @classmethod
+    def from_def(cls, retry_def: Any) -> Union['RetryPolicy', None]:
+        if retry_def is None or retry_def is False:
+            return None
+        if retry_def is True:
+            retry_def = {}
+        if not isinstance(retry_def, dict):
+            raise UserError(f"'retry' must be true or an object: {retry_def}")
+        max_attempts = cls._parse_number(retry_def.get('max_attempts', 3), "max_attempts", int)
+        status_codes = retry_def.get('status_codes', DEFAULT_STATUS_CODES)
+        if not isinstance(status_codes, list):
+            raise UserError(f"'retry.status_codes' must be a list of integers: {status_codes}")
+        status_codes = [cls._parse_number(code, "status_codes", int) for code in status_codes]
+        exception_names = retry_def.get('exceptions', DEFAULT_EXCEPTIONS)
+        if not isinstance(exception_names, list):
+            raise UserError(f"'retry.exceptions' must be a list of exception names: {exception_names}")
+        exceptions = []
+        for exception_name in exception_names:
+            exception_class = getattr(requests.exceptions, str(exception_name), None)
+            if not (isinstance(exception_class, type) and issubclass(exception_class, BaseException)):
+                raise UserError(f"Unknown exception in 'retry.exceptions' (expected a name from requests.exceptions): {exception_name}")
+            exceptions.append(exception_class)
+        backoff_def = retry_def.get('backoff') or {}
+        backoff_base = cls._parse_number(backoff_def.get('base', 0.5), "backoff.base", allow_zero=True)
+        backoff_max = cls._parse_number(backoff_def.get('max', 30), "backoff.max", allow_zero=True)
+        retry_after_max = cls._parse_number(retry_def.get('retry_after_max', 60), "retry_after_max", allow_zero=True)
+        return cls(max_attempts, status_codes, tuple(exceptions), backoff_base, backoff_max, retry_after_max)
+
+    def should_retry_response(self, response: requests.Response, attempt: int) -> bool:
+        return attempt < self.max_attempts and response.status_code in self.status_codes
+
+    def should_retry_exception(self, e: Exception, attempt: int) -> bool:
+        return attempt < self.max_attempts and isinstance(e, self.exceptions)
+
+    def get_delay(self, attempt: int, response: requests.Response = None) -> float:
+        """Seconds to wait before the next attempt (attempt is the number of the attempt that failed)"""
+        if response is not None:
+            retry_after = self._parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                return min(retry_after, self.retry_after_max)
+        # full jitter: uniform between 0 and the exponential backoff
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    @staticmethod
+    def _parse_retry_after(value: Union[str, None]) -> Union[float, None]:
+        # Retry-After is either seconds or an HTTP date
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
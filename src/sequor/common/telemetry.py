@@ -1,17 +1,32 @@
+import atexit
 import logging
 import os
+import queue
+import threading
+import time
 import uuid
-import posthog
 from typing import Dict
 
 # # Set your PostHog project API key and host (or use env vars)
 # POSTHOG_API_KEY = os.getenv("SEQUOR_TELEMETRY_KEY", "<your-posthog-key>")
 # POSTHOG_HOST = os.getenv("SEQUOR_TELEMETRY_HOST", "https://app.posthog.com")
 
+# Events are put into a bounded in-memory queue and sent by a daemon thread: the caller never waits for the network.
+# At exit queued events get at most FLUSH_TIMEOUT seconds, the rest is dropped.
+QUEUE_SIZE = 100
+FLUSH_TIMEOUT = 1.0
+SEND_TIMEOUT = 3
+SENDER_THREAD_NAME = "sequor-telemetry"
+
 # Global state
 _logger_registry: Dict[str, "TelemetryLogger"] = {}
 _user_id = None
+_user_id_file = None
 _enabled = True
+_posthog_config = None
+_queue: "queue.Queue" = queue.Queue(maxsize=QUEUE_SIZE)
+_sender = None
+_sender_lock = threading.Lock()
 
 class TelemetryLogger:
     def __init__(self, name: str):
@@ -21,21 +36,74 @@ class TelemetryLogger:
         self._send(name, props)
 
     def _send(self, event_type: str, props: dict):
-        logger = logging.getLogger("sequor.telemetry")
-        if _enabled:
-            try:
-                data = {
-                    "component": self.name,
-                    "event_type": event_type,
-                    **(props or {}),
-                }
-                logger.info(f"Before: {event_type}")
-                posthog.capture(_user_id, event_type, data)
-                logger.info(f"After: {event_type}")
-            except Exception:
-                logger.info(f"Event sending failed: {event_type}")
-                # pass
+        if not _enabled:
+            return
+        data = {
+            "component": self.name,
+            "event_type": event_type,
+            **(props or {}),
+        }
+        try:
+            _queue.put_nowait((event_type, data))
+        except queue.Full:
+            return # dropped: telemetry must not slow down runs
+        _ensure_sender()
+
+def _is_disabled_by_env() -> bool:
+    # SEQUOR_TELEMETRY_DISABLED=1 or the cross-tool DO_NOT_TRACK=1 convention
+    for var_name in ("SEQUOR_TELEMETRY_DISABLED", "DO_NOT_TRACK"):
+        value = os.environ.get(var_name)
+        if value is not None and value.strip().lower() not in ("", "0", "false", "no"):
+            return True
+    return False
+
+def _ensure_sender():
+    global _sender
+    if _sender is not None:
+        return
+    with _sender_lock:
+        if _sender is None:
+            _sender = threading.Thread(target=_send_loop, name=SENDER_THREAD_NAME, daemon=True)
+            _sender.start()
+            atexit.register(flush)
+
+def _send_loop():
+    global _user_id
+    logger = logging.getLogger("sequor.telemetry")
+    client = None
+    while True:
+        event_type, data = _queue.get()
+        try:
+            if not _enabled:
+                continue
+            if client is None:
+                # posthog is imported here: importing it takes a noticeable part of CLI startup
+                from posthog import Posthog
+                api_key, host = _posthog_config
+                client = Posthog(api_key, host=host, sync_mode=True, timeout=SEND_TIMEOUT)
+                # posthog logs network failures at ERROR: for us they are not errors of the run
+                # (set after the client is created: its constructor resets the level)
+                logging.getLogger("posthog").setLevel(logging.CRITICAL)
+                # same for the connection retry warnings of urllib3, but only those logged by this thread
+                logging.getLogger("urllib3.connectionpool").addFilter(lambda record: record.threadName != SENDER_THREAD_NAME)
+                _user_id = _load_or_create_user_id(_user_id_file)
+            client.capture(event_type, distinct_id=_user_id, properties=data)
+        except Exception:
+            logger.debug(f"Event sending failed: {event_type}")
+        finally:
+            _queue.task_done()
+
+def flush(timeout: float = FLUSH_TIMEOUT):
+    # wait until queued events are sent, but never longer than timeout
+    if _sender is None:
         return
+    deadline = time.monotonic() + timeout
+    with _queue.all_tasks_done:
+        while _queue.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            _queue.all_tasks_done.wait(remaining)
 
 def _load_or_create_user_id(path: str):
     if os.path.exists(path):
@@ -45,14 +113,20 @@ def _load_or_create_user_id(path: str):
         f.write(uid)
     return uid
 
-def basicConfig(api_key: str, host: str, user_id_file: StopIteration, enabled: bool = True):
-    global _user_id, _enabled
-    posthog.project_api_key = api_key
-    posthog.host = host
-    _enabled = enabled
-    _user_id = _load_or_create_user_id(user_id_file)
+def basicConfig(api_key: str, host: str, user_id_file: str, enabled: bool = True):
+    global _user_id_file, _enabled, _posthog_config
+    _enabled = enabled and not _is_disabled_by_env()
+    if not _enabled:
+        return
+    _posthog_config = (api_key, host)
+    _user_id_file = user_id_file # read by the sender thread
+
+def disable():
+    # e.g. by "telemetry: false" in project.yaml; events already queued are dropped by the sender
+    global _enabled
+    _enabled = False
 
 def getLogger(name: str) -> TelemetryLogger:
     if name not in _logger_registry:
         _logger_registry[name] = TelemetryLogger(name)
-    return _logger_registry[name]
\ No newline at end of file
+    return _logger_registry[name]
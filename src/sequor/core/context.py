@@ -32,7 +32,8 @@ class Context:
 
     def clone(self):
         new_context = Context(self.env, self.project, self.job)
-        new_context.variables = self.variables
+        # local variables set in the clone stay in its own scope and do not leak into this context
+        new_context.variables = self.variables.child()
         new_context.cur_execution_stack_entry = self.cur_execution_stack_entry
         new_context.flow_type_name = self.flow_type_name
         new_context.flow_name = self.flow_name
@@ -50,7 +51,7 @@ class Context:
     def get_variable_value(self, name: str):
         value = self.variables.get(name)
         if value is None:
-            value = self.project.get_variable_value(name)
+            value = self.project.get_variable_value(name, self.env)
         if value is None:
             value = self.env.get_variable_value(name)
         return value
@@ -64,11 +65,11 @@ class Context:
         self.flow_step_index_name = index_name
 
     
-    def add_to_log_op_finished(self, logger: logging.Logger, message: str):
+    def add_to_log_op_finished(self, logger: logging.Logger, message: str, details: dict = None):
         start_time = self.cur_execution_stack_entry.start_time
         end_time = datetime.now()
         duration = end_time - start_time
-        self.flow_log.append(FlowLogEntry(message, start_time, end_time))
+        self.flow_log.append(FlowLogEntry(message, start_time, end_time, details))
         logger.info(f"{message} {duration}")
 
     
@@ -0,0 +1,238 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import os
+import threading
+import uuid
+from typing import Any, Dict, List, Tuple, Union
+
+from sequor.common.cron import CronSchedule
+from sequor.core.environment import Environment
+from sequor.core.job import Job
+from sequor.core.user_error import UserError
+from sequor.project.project import Project
+
+logger = logging.getLogger("sequor.daemon")
+
+
+class DaemonBusyError(UserError):
+    """Raised when a job cannot be queued because max_jobs + max_queued jobs are already active"""
+
+
+def _yaml_file_in_dir(dir_path, name: str) -> Union[str, None]:
+    # names of run requests become file paths: "../x" or an absolute path must not reach files outside dir_path
+    dir_abs = os.path.abspath(dir_path)
+    file_abs = os.path.abspath(os.path.join(dir_abs, f"{name}.yaml"))
+    if os.path.commonpath([dir_abs, file_abs]) != dir_abs or not os.path.isfile(file_abs):
+        return None
+    return file_abs
+
+
+class Daemon:
+    """Long-running process that keeps a project warm and runs its flows.
+
+    The project (parsed files, compiled flows, reflected models, SQL engines, OAuth tokens) and the environments
+    stay in memory between jobs. Flows are started by the cron schedules of project.yaml and by run requests to the
+    HTTP endpoint; at most max_jobs jobs run at the same time and at most max_queued wait for a free slot.
+    """
+    # finished jobs kept for GET /jobs/<id>
+    max_finished_jobs = 1000
+
+    def __init__(self, project: Project, home_dir, default_env_name: Union[str, None], max_jobs: int, max_queued: int, job_options: Dict[str, Any]):
+        self.project = project
+        self.home_dir = home_dir
+        self.default_env_name = default_env_name
+        self.max_jobs = max_jobs
+        self.max_queued = max_queued
+        self.job_options = job_options
+
+        self.schedules: List[Tuple[CronSchedule, str, Union[str, None]]] = []
+        for schedule_def in project.schedules_def:
+            flow_name = schedule_def.get('flow')
+            cron = schedule_def.get('cron')
+            if flow_name is None or cron is None:
+                raise UserError(f"Schedule must specify 'flow' and 'cron': {dict(schedule_def)}")
+            self.schedules.append((CronSchedule(str(cron)), flow_name, schedule_def.get('env', default_env_name)))
+
+        self._executor = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="sequor-job")
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._active_count = 0 # queued + running
+        self._jobs_lock = threading.Lock()
+        self._envs: Dict[str, Tuple[int, Environment]] = {}
+        self._envs_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def get_env(self, env_name: Union[str, None]) -> Environment:
+        if env_name is None:
+            return Environment.create_empty()
+        env_file = _yaml_file_in_dir(self.home_dir / "envs", env_name) if isinstance(env_name, str) else None
+        if env_file is None:
+            raise UserError(f"Environment \"{env_name}\" not found")
+        # reloaded only when the environment file changes
+        env_stamp = os.stat(env_file).st_mtime_ns
+        with self._envs_lock:
+            cached = self._envs.get(env_name)
+            if cached is not None and cached[0] == env_stamp:
+                return cached[1]
+            env = Environment(env_name, self.home_dir)
+            env.load()
+            self._envs[env_name] = (env_stamp, env)
+            return env
+
+    def submit(self, flow_name: str, env_name: Union[str, None], trigger: str) -> Dict[str, Any]:
+        with self._jobs_lock:
+            if self._active_count >= self.max_jobs + self.max_queued:
+                raise DaemonBusyError(f"Too many jobs: {self._active_count} jobs are running or queued")
+            job_record = {
+                "id": uuid.uuid4().hex,
+                "flow": flow_name,
+                "env": env_name,
+                "trigger": trigger,
+                "status": "queued",
+                "submitted_at": datetime.now().isoformat(),
+                "started_at": None,
+                "finished_at": None,
+                "error": None,
+            }
+            self._jobs[job_record["id"]] = job_record
+            self._active_count += 1
+            self._trim_jobs()
+            submitted_record = dict(job_record)
+        self._executor.submit(self._run_job, job_record)
+        return submitted_record
+
+    def _trim_jobs(self):
+        finished_ids = [job_id for job_id, record in self._jobs.items() if record["status"] in ("succeeded", "failed")]
+        for job_id in finished_ids[:max(0, len(finished_ids) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def _run_job(self, job_record: Dict[str, Any]):
+        # the record is read by get_job() and list_jobs() in request threads: it is changed under _jobs_lock
+        with self._jobs_lock:
+            job_record["status"] = "running"
+            job_record["started_at"] = datetime.now().isoformat()
+        logger.info(f"Job {job_record['id']} started: flow \"{job_record['flow']}\" ({job_record['trigger']})")
+        status, error = "failed", None
+        try:
+            env = self.get_env(job_record["env"])
+            job = Job.for_flow(env, self.project, job_record["flow"], self.job_options)
+            job_result = job.run({})
+            status, error = job_result["status"], job_result["error"]
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Job {job_record['id']} failed: {e}")
+        finally:
+            with self._jobs_lock:
+                job_record["status"] = status
+                job_record["error"] = error
+                job_record["finished_at"] = datetime.now().isoformat()
+                self._active_count -= 1
+        logger.info(f"Job {job_record['id']} {status}: flow \"{job_record['flow']}\"")
+
+    def get_job(self, job_id: str) -> Union[Dict[str, Any], None]:
+        with self._jobs_lock:
+            job_record = self._jobs.get(job_id)
+            return dict(job_record) if job_record is not None else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._jobs_lock:
+            return [dict(job_record) for job_record in self._jobs.values()]
+
+    def _is_active(self, flow_name: str, env_name: Union[str, None]) -> bool:
+        with self._jobs_lock:
+            return any(record["flow"] == flow_name and record["env"] == env_name and record["status"] in ("queued", "running")
+                       for record in self._jobs.values())
+
+    def run_scheduler(self):
+        if not self.schedules:
+            return
+        next_runs = [schedule.next_after(datetime.now()) for schedule, _, _ in self.schedules]
+        while not self._stop_event.is_set():
+            now = datetime.now()
+            for i, (schedule, flow_name, env_name) in enumerate(self.schedules):
+                if next_runs[i] <= now:
+                    next_runs[i] = schedule.next_after(now)
+                    # a run that is still in progress is not overlapped: its next tick is skipped
+                    if self._is_active(flow_name, env_name):
+                        logger.warning(f"Skipping scheduled run of flow \"{flow_name}\": previous run is still in progress")
+                        continue
+                    try:
+                        self.submit(flow_name, env_name, f"cron \"{schedule.expression}\"")
+                    except UserError as e:
+                        logger.warning(f"Skipping scheduled run of flow \"{flow_name}\": {e}")
+            wait_seconds = (min(next_runs) - datetime.now()).total_seconds()
+            self._stop_event.wait(max(0.5, min(wait_seconds, 60)))
+
+    def serve(self, host: str, port: int):
+        scheduler_thread = threading.Thread(target=self.run_scheduler, name="sequor-scheduler", daemon=True)
+        scheduler_thread.start()
+        server = ThreadingHTTPServer((host, port), _make_request_handler(self))
+        logger.info(f"Serving project \"{self.project.project_name}\" on http://{host}:{port} ({len(self.schedules)} schedules, max {self.max_jobs} concurrent jobs)")
+        try:
+            server.serve_forever()
+        finally:
+            self._stop_event.set()
+            server.server_close()
+            self._executor.shutdown(wait=True)
+            self.project.close()
+
+
+def _make_request_handler(daemon: Daemon):
+    class RequestHandler(BaseHTTPRequestHandler):
+        # POST /run {"flow": "...", "env": "..."} -> 202 job record
+        # GET /jobs, GET /jobs/<id>, GET /health
+        def _send_json(self, status: int, body: Any):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/jobs":
+                self._send_json(200, daemon.list_jobs())
+            elif self.path.startswith("/jobs/"):
+                job_record = daemon.get_job(self.path[len("/jobs/"):])
+                if job_record is None:
+                    self._send_json(404, {"error": "job not found"})
+                else:
+                    self._send_json(200, job_record)
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/run":
+                self._send_json(404, {"error": "not found"})
+                return
+            try:
+                content_length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(content_length) or b"{}")
+                if not isinstance(request, dict):
+                    raise UserError("Request body must be a JSON object")
+                flow_name = request.get("flow")
+                if not flow_name or not isinstance(flow_name, str):
+                    raise UserError("'flow' is required and must be a string")
+                if _yaml_file_in_dir(daemon.project.flows_dir, flow_name) is None:
+                    raise UserError(f"Flow \"{flow_name}\" not found")
+                env_name = request.get("env", daemon.default_env_name)
+                if env_name is not None and (not isinstance(env_name, str) or _yaml_file_in_dir(daemon.home_dir / "envs", env_name) is None):
+                    raise UserError(f"Environment \"{env_name}\" not found")
+                job_record = daemon.submit(flow_name, env_name, "http")
+            except DaemonBusyError as e:
+                self._send_json(429, {"error": str(e)})
+                return
+            except (UserError, ValueError) as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            self._send_json(202, job_record)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return RequestHandler
@@ -14,6 +14,8 @@ class Environment:
     def __init__(self, env_name: str, home_dir):  # instance: Instance,
         self.env_name = env_name
         self.home_dir = home_dir
+        # True when several environments run in one process (sequor run --envs): project state is kept per environment
+        self.isolated_state = False
         # self.instance = instance
 
 
@@ -24,6 +26,7 @@ class Environment:
         env.env_name = None
         # env.instance = instance
         env.env_vars = {}
+        env.isolated_state = False
         return env 
 
     def load(self):
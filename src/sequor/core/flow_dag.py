@@ -0,0 +1,98 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+import json
+import logging
+import os
+from typing import Callable, Dict, List, Union
+
+from sequor.core.user_error import UserError
+from sequor.project.project import Project
+
+logger = logging.getLogger("sequor.dag")
+
+
+class FlowDAG:
+    """Dependency graph of flows built from the "depends_on" declarations of flow files.
+
+    Flows whose dependencies have succeeded run concurrently (up to the number of workers). When a flow fails
+    the flows that depend on it are skipped, independent flows keep running. The status of every flow is saved
+    in the project state so that a rerun can start from the failed flows.
+    """
+    def __init__(self, project: Project, target_flows: List[str]):
+        self.project = project
+        self.target_flows = sorted(target_flows)
+        self.dependencies: Dict[str, List[str]] = {}
+        for flow_name in self.target_flows:
+            self._add_flow(flow_name, [])
+
+    def _add_flow(self, flow_name: str, path: List[str]):
+        if flow_name in path:
+            cycle = path[path.index(flow_name):] + [flow_name]
+            raise UserError(f"Circular flow dependency: {' -> '.join(cycle)}")
+        if flow_name in self.dependencies:
+            return
+        dependencies = self.project.get_flow_dependencies(flow_name)
+        for dependency in dependencies:
+            self._add_flow(dependency, path + [flow_name])
+        self.dependencies[flow_name] = dependencies
+
+    def get_state_file(self) -> str:
+        return os.path.join(self.project.project_state_dir, "dag_state.json")
+
+    def load_state(self) -> Dict[str, str]:
+        try:
+            with open(self.get_state_file(), 'r') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            raise UserError("There is no previous DAG run to rerun")
+        if state.get("targets") != self.target_flows:
+            raise UserError(f"The previous DAG run had different target flows: {', '.join(state.get('targets') or [])}")
+        return state.get("flows", {})
+
+    def save_state(self, statuses: Dict[str, str]):
+        state_file = self.get_state_file()
+        os.makedirs(os.path.dirname(state_file), exist_ok=True)
+        state = {"targets": self.target_flows, "finished_at": datetime.now().isoformat(), "flows": statuses}
+        temp_file = state_file + ".tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(temp_file, state_file)
+
+    def run(self, run_flow: Callable[[str], str], workers: int, rerun_failed: bool = False) -> Dict[str, str]:
+        """Run the graph; run_flow(flow_name) returns "succeeded" or "failed". Returns the status of every flow."""
+        statuses: Dict[str, Union[str, None]] = {flow_name: None for flow_name in self.dependencies}
+        if rerun_failed:
+            # flows that succeeded in the previous run are not run again
+            for flow_name, status in self.load_state().items():
+                if status == "succeeded" and flow_name in statuses:
+                    statuses[flow_name] = "succeeded"
+        logger.info(f"Running {sum(1 for status in statuses.values() if status is None)} of {len(statuses)} flows with {workers} workers")
+
+        running = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sequor-dag") as executor:
+            while True:
+                for flow_name, status in statuses.items():
+                    if status is not None:
+                        continue
+                    dependency_statuses = [statuses[dependency] for dependency in self.dependencies[flow_name]]
+                    if any(dependency_status in ("failed", "skipped") for dependency_status in dependency_statuses):
+                        statuses[flow_name] = "skipped"
+                        logger.warning(f"Skipping flow \"{flow_name}\": a flow it depends on did not succeed")
+                    elif all(dependency_status == "succeeded" for dependency_status in dependency_statuses):
+                        statuses[flow_name] = "running"
+                        running[executor.submit(run_flow, flow_name)] = flow_name
+                if not running:
+                    # skipping a flow can make its dependants skippable: loop until nothing changes
+                    if any(status is None for status in statuses.values()):
+                        continue
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    flow_name = running.pop(future)
+                    try:
+                        statuses[flow_name] = future.result()
+                    except Exception as e:
+                        logger.error(f"Flow \"{flow_name}\" failed: {e}")
+                        statuses[flow_name] = "failed"
+        self.save_state(statuses)
+        return statuses
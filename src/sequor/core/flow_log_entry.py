@@ -6,10 +6,11 @@ logger = logging.getLogger("sequor.job")
 
 
 class FlowLogEntry:
-    def __init__(self, message: str, start_time: datetime, end_time: datetime):
+    def __init__(self, message: str, start_time: datetime, end_time: datetime, details: dict = None):
         self.message = message
         self.start_time = start_time
         self.end_time = end_time
+        self.details = details # op-specific statistics (e.g. timings of http_request)
 
 
     def to_dict(self) -> dict:
@@ -17,6 +18,8 @@ class FlowLogEntry:
         d['message'] = self.message
         d['start_time'] = self.start_time
         d['end_time'] = self.end_time
+        if self.details is not None:
+            d['details'] = self.details
         return d
 
  
@@ -26,6 +26,7 @@ class Instance:
         log_dir = self.home_dir / "logs"
         log_dir.mkdir(parents=True, exist_ok=True)
         log_path = log_dir / "sequor.log"
+        self.log_dir = log_dir
         logging.basicConfig(
             level=logging.INFO,                         # default level
             format="%(asctime)s %(levelname)s [%(name)s]: %(message)s",         # format for stdout
@@ -1,5 +1,6 @@
 import logging
-from typing import Any, Dict, List
+import threading
+from typing import Any, Dict, List, Tuple
 from sequor.common.common import Common
 from sequor.core.context import Context
 from sequor.core.environment import Environment
@@ -7,6 +8,8 @@ from sequor.core.execution_stack_entry import ExecutionStackEntry
 from sequor.core.op import Op
 from sequor.core.user_error import UserError
 from sequor.project.project import Project
+from sequor.source.query_cache import QueryCache
+from sequor.source.source_cache import SourceCache
 import uuid
 
 logger = logging.getLogger("sequor.job")
@@ -17,26 +20,64 @@ class Job:
         self.env = env
         self.project = project
         self.op = op
-        self.execution_stack = []
         self.options = options
+        self.source_cache = SourceCache()
+        # results of query()/table() and lookup() indexes used by expressions: see get_query_cache()
+        self._query_caches: Dict[Tuple[str, str], QueryCache] = {}
+        self._query_caches_lock = threading.Lock()
 
+    def get_query_cache(self, source_name: str, rendered_def_key: str, query_cache_def: Any) -> QueryCache:
+        # one cache per source and rendered source definition (see Source.get_query_cache()),
+        # created on first use with the settings of the source definition at that time
+        query_cache_key = (source_name, rendered_def_key)
+        with self._query_caches_lock:
+            query_cache = self._query_caches.get(query_cache_key)
+            if query_cache is None:
+                query_cache = QueryCache.from_def(query_cache_def)
+                self._query_caches[query_cache_key] = query_cache
+        return query_cache
 
-    def get_cur_stack_entry(self) -> ExecutionStackEntry:
-        if len(self.execution_stack) == 0:
-            return None
-        return self.execution_stack[-1]
+    @classmethod
+    def for_flow(cls, env: Environment, project: Project, flow_name: str, options: dict) -> 'Job':
+        # job running a whole flow (as "sequor run <flow>" does)
+        from sequor.operations.run_flow import RunFlowOp
+        run_flow_op_def = {
+            "op": "run_flow",
+            "flow": flow_name,
+            "start_step": 0,
+            "parameters": {}
+        }
+        return cls(env, project, RunFlowOp(project, run_flow_op_def), options)
+
+    @staticmethod
+    def get_failed_stack_entry(e: Exception) -> ExecutionStackEntry:
+        # set by run_op() on the innermost op that failed
+        return getattr(e, "execution_stack_entry", None)
+
+    @staticmethod
+    def get_execution_stack(stack_entry: ExecutionStackEntry) -> List[ExecutionStackEntry]:
+        execution_stack = []
+        while stack_entry is not None:
+            execution_stack.insert(0, stack_entry)
+            stack_entry = stack_entry.parent
+        return execution_stack
 
     # logger: logging.Logger,
     def run(self, op_options: Dict[str, Any]):
         context = Context(self.env, self.project, self)
+        # project variables are read fresh by every job (the project can outlive it, e.g. in "sequor serve")
+        self.project.reload_variables(self.env)
+        status = "succeeded"
+        error_msg = None
         try:
             self.run_op(context, self.op, op_options)
         except Exception as e:
-            cur_stack_entry = self.get_cur_stack_entry()
+            status = "failed"
+            cur_stack_entry = self.get_failed_stack_entry(e)
 
             # Build job stacktrace lines
             job_stacktrace_lines = []
-            for i, entry in enumerate(self.execution_stack):
+            for i, entry in enumerate(self.get_execution_stack(cur_stack_entry)):
                 # Generate indentation based on stack depth
                 indent = " " * (i * 2)
                 location = None
@@ -69,8 +110,11 @@ class Job:
             if self.options.get("disable_flow_stacktrace") is not None and not self.options["disable_flow_stacktrace"]:
                 error_msg = error_msg + "\nStacktrace (most recent op last):\n" + "\n".join(job_stacktrace_lines)
             logger.error(error_msg)
+        finally:
+            # persist project variables set during the job (also when it failed: they describe the committed progress)
+            self.project.flush_variables(self.env)
         flow_log_dict = [entry.to_dict() for entry in context.flow_log]
-        return {"flow_log": flow_log_dict}
+        return {"status": status, "error": error_msg, "flow_log": flow_log_dict}
 
 
 
@@ -78,9 +122,16 @@ class Job:
     def run_op(self, context: Context, op: Op, op_options: Dict[str, Any]):
         prev_execution_stack_entry = context.cur_execution_stack_entry
         stack_entry = ExecutionStackEntry(op.get_title(), context.flow_type_name, context.flow_name, context.flow_step_index, context.flow_step_index_name, prev_execution_stack_entry)
-        self.execution_stack.append(stack_entry)
         context.cur_execution_stack_entry = stack_entry
-        op.run(context, op_options)
-        context.cur_execution_stack_entry = prev_execution_stack_entry
-        self.execution_stack.pop()
+        try:
+            op.run(context, op_options)
+        except Exception as e:
+            # ops can run in worker threads (e.g. parallel for_each) -> the failed op is recorded on the exception
+            # and not on a job-wide stack; entries are linked through their parent
+            if self.get_failed_stack_entry(e) is None:
+                e.execution_stack_entry = stack_entry
+            raise
+        finally:
+            # restored also on failure: the caller can continue (e.g. for_each with on_error: continue)
+            context.cur_execution_stack_entry = prev_execution_stack_entry
 
@@ -8,7 +8,11 @@ from sequor.core.user_error import UserError
 
 
 class Op:
-    """Base class for all operations"""
+    """Base class for all operations.
+
+    Ops are reused across runs and jobs (flows are cached, see Project.get_flow()) and op_def is a frozen cached
+    definition: run() renders into a local copy (e.g. render_jinja(context, self.op_def)) and keeps per-run state local.
+    """
     # # Registry to store operation types and their corresponding classes
     # _registry: ClassVar[Dict[str, Type['Op']]] = {}
     
@@ -73,7 +77,7 @@ class Op:
                 user_context = UserContext(context)
                 # params = [user_context] + extra_params
                 # must match parameters defined in user_function_params_def of executor_utils.py
-                params = [user_context, user_context.is_var_defined, user_context.var, user_context.table, user_context.query, user_context.query_scalar] + extra_params
+                params = [user_context, user_context.is_var_defined, user_context.var, user_context.table, user_context.query, user_context.query_scalar, user_context.lookup, user_context.iter_query, user_context.iter_table] + extra_params
                 if len(params) < len(user_function_params_def):
                     while len(params) < len(user_function_params_def):
                         params.append(None)
@@ -4,18 +4,19 @@ from sequor.core.op import Op
 from sequor.core.user_error import UserError
 
 from sequor.source.source import Source
-from sequor.source.sources.duckdb_source import DuckDBSource
-from sequor.source.sources.http_source import HTTPSource
-from sequor.source.sources.sql_source import SQLSource
 
 def create_source(context: 'Context', source_name: str, source_def: Dict[str, Any]) -> Any:
     source: Source = None
     source_type = source_def.get('type')
+    # source modules are imported on demand: they pull in requests, SQLAlchemy, DuckDB
     if source_type == 'http':
+        from sequor.source.sources.http_source import HTTPSource
         source = HTTPSource(context, source_name, source_def)
     elif source_type == 'postgres':
+        from sequor.source.sources.sql_source import SQLSource
         source = SQLSource(context, source_name, source_def)
     elif source_type == 'duckdb':
+        from sequor.source.sources.duckdb_source import DuckDBSource
         source = DuckDBSource(context, source_name, source_def)
     else:
         raise ValueError(f"Unknown source type: {source_type}")
@@ -53,6 +54,9 @@ def create_op(proj, op_def: Dict[str, Any]) -> 'Op':
     elif op_type == "for_each":
         from sequor.operations.for_each import ForEachOp
         op = ForEachOp(proj, op_def)
+    elif op_type == "parallel":
+        from sequor.operations.parallel import ParallelOp
+        op = ParallelOp(proj, op_def)
     elif op_type == "block":
         from sequor.operations.block import BlockOp
         op = BlockOp(proj, op_def)
@@ -3,21 +3,35 @@ from collections import namedtuple
 VariableEntry = namedtuple("VariableEntry", ["type", "value"])
 
 class VariableBindings:
-    def __init__(self):
+    """Scope of local variables. Lookups fall through to the parent scope, writes always go to this scope."""
+    def __init__(self, parent: 'VariableBindings' = None):
         self._bindings = {}
+        self.parent = parent
+
+    def child(self) -> 'VariableBindings':
+        return VariableBindings(self)
+
+    def _lookup(self, name):
+        scope = self
+        while scope is not None:
+            binding = scope._bindings.get(name)
+            if binding is not None:
+                return binding
+            scope = scope.parent
+        return None
 
     def set(self, name, value, var_type="text"):
         self._bindings[name] = VariableEntry(type=var_type, value=value)
 
     def get(self, name):
-        binding = self._bindings.get(name)
+        binding = self._lookup(name)
         if binding is None:
             return None
         else:
             return binding.value
 
     def get_type(self, name):
-        binding = self._bindings.get(name)
+        binding = self._lookup(name)
         if binding is None:
             return None
         else:
@@ -12,6 +12,7 @@ from sequor.source.table_address import TableAddress
 class BlockOp(Op):
     def __init__(self, proj, op_def: Dict[str, Any]):
         super().__init__(proj, op_def)
+        self._flow = None # compiled on the first run, see get_flow()
 
     def get_title(self) -> str:
         op_title = self.op_def.get('title')
@@ -23,15 +24,23 @@ class BlockOp(Op):
             title = op_name
         return title
 
+    def get_flow(self) -> Flow:
+        # Steps are built into ops once and reused on every run (e.g. on every iteration of an enclosing loop).
+        # Concurrent first runs may both build the flow: harmless, one of them is kept.
+        if self._flow is None:
+            steps_def = self.op_def.get('steps')
+            flow = self.proj.build_flow_from_block_def(steps_def or [])
+            op_name_alias = self.op_def.get('op_name_alias')
+            if op_name_alias is not None:
+                flow.type_name = op_name_alias
+            self._flow = flow
+        return self._flow
+
     def run(self, context: Context, op_options: Dict[str, Any]):
         logger = logging.getLogger("sequor.ops.block")
         # self.op_def = render_jinja(context, self.op_def)
         logger.info(f"Starting")
-        steps_def = self.op_def.get('steps')
-        flow = context.project.build_flow_from_block_def(steps_def)
-        op_name_alias = self.op_def.get('op_name_alias')
-        if op_name_alias is not None:
-            flow.type_name = op_name_alias
+        flow = self.get_flow()
         # new_context = context.clone()
         # new_context.set_flow_info("block", None)
         flow.run(context)
@@ -25,12 +25,12 @@ class ExecuteOp(Op):
 
     def run(self, context, op_options: Dict[str, Any]):
         logger = logging.getLogger("sequor.ops.transform")
-        self.op_def = render_jinja(context, self.op_def)
+        op_def = render_jinja(context, self.op_def)
         logger.info(f"Starting \"{self.get_title()}\"")
-        source_name = Op.get_parameter(context, self.op_def, 'source', is_required=True)
-        source_name = Op.get_parameter(context, self.op_def, 'source', is_required=True)
+        source_name = Op.get_parameter(context, op_def, 'source', is_required=True)
+        source_name = Op.get_parameter(context, op_def, 'source', is_required=True)
 
-        script = self.op_def.get('statement')
+        script = op_def.get('statement')
         if not script:
             raise UserError("The 'statement' parameter is required and cannot be empty.")
 
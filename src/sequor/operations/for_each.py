@@ -1,10 +1,16 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import contextvars
 import logging
-from typing import Any, Dict
+import threading
+from typing import Any, Callable, Dict
 
+from sequor.common.dead_letter import RowErrorPolicy
 from sequor.core.context import Context
 from sequor.core.flow import Flow
 from sequor.core.op import Op
 from sequor.core.registry import create_op
+from sequor.core.user_error import UserError
+from sequor.source.source import Source
 from sequor.source.table_address import TableAddress
 
 
@@ -12,6 +18,7 @@ from sequor.source.table_address import TableAddress
 class ForEachOp(Op):
     def __init__(self, proj, op_def: Dict[str, Any]):
         super().__init__(proj, op_def)
+        self._block_op = None # compiled on the first run, see get_block_op()
 
     def get_title(self) -> str:
         op_title = self.op_def.get('title')
@@ -21,6 +28,18 @@ class ForEachOp(Op):
             title = self.name
         return title
 
+    def get_block_op(self) -> Op:
+        # the loop body is compiled once and reused for every row and every run of this op
+        if self._block_op is None:
+            steps_def = self.op_def.get('steps')
+            block_op_def = {
+                "op": "block",
+                "op_name_alias": f"for_each_block",
+                "steps": steps_def
+            }
+            self._block_op = create_op(self.proj, block_op_def)
+        return self._block_op
+
     def run(self, context: Context, op_options: Dict[str, Any]):
         logger = logging.getLogger("sequor.ops.for_each")
         # in "control statement" type of op we cannot render the whole op_def as it contains other ops
@@ -33,28 +52,115 @@ class ForEachOp(Op):
         table_name= Op.get_parameter(context, self.op_def, 'table', is_required=True, render=3)
         table_address = TableAddress(source_name, database_name, namespace_name, table_name)
         var_name= Op.get_parameter(context, self.op_def, 'as', is_required=True, render=3)
+        parallelism = Op.get_parameter(context, self.op_def, 'parallelism', is_required=False, render=3)
+        partition_by = Op.get_parameter(context, self.op_def, 'partition_by', is_required=False, render=3)
+        try:
+            parallelism = int(parallelism) if parallelism is not None else 1
+        except (TypeError, ValueError):
+            raise UserError(f"'parallelism' must be a positive integer: {parallelism}")
+        if parallelism < 1:
+            raise UserError(f"'parallelism' must be a positive integer: {parallelism}")
 
-        steps_def = self.op_def.get('steps')
-        block_op_def = {
-            "op": "block",
-            "op_name_alias": f"for_each_block",
-            "steps": steps_def
-        }
-        block_op = create_op(context.project, block_op_def)
+        block_op = self.get_block_op()
         new_context = context.clone()
         new_context.set_flow_info("for_each", None)
         new_context.set_flow_step_info(None)
 
+        # on_error: continue -> failed rows go to the error budget and the dead-letter table instead of failing the op.
+        # Steps load and commit data on their own: what the steps loaded for the row before it failed is kept
+        # (unlike for_each of http_request, where a failed row is rolled back, see DataLoader.row_transaction())
+        row_error_policy = RowErrorPolicy.from_def(context, self.op_def)
+        def run_row(row_context, row):
+            if row_error_policy is None:
+                context.job.run_op(row_context, block_op, None)
+            else:
+                try:
+                    context.job.run_op(row_context, block_op, None)
+                except Exception as e:
+                    row_error_policy.handle(row, e)
+
+        row_count = 0
+        source = self.proj.get_source(context,source_name)
+        try:
+            if parallelism == 1:
+                with source.connect() as conn:
+                    conn.open_table_for_read(table_address)
+                    row = conn.next_row()
+                    while row is not None:
+                        row_count += 1
+                        new_context.set_variable(var_name, row)
+                        run_row(new_context, row)
+                        row = conn.next_row()
+            elif partition_by is None:
+                row_count = self._run_rows_parallel(new_context, source, table_address, var_name, run_row, parallelism)
+            else:
+                row_count = self._run_partitions_parallel(new_context, source, table_address, var_name, run_row, parallelism, partition_by)
+        finally:
+            if row_error_policy is not None:
+                row_error_policy.close()
+
+        logger.info(f"Finished. Processed {row_count} rows")
+
+    @staticmethod
+    def _raise_first_error(futures):
+        for future in futures:
+            if future.done() and not future.cancelled() and future.exception() is not None:
+                raise future.exception()
+
+    def _run_rows_parallel(self, context: Context, source: Source, table_address: TableAddress, var_name: str, run_row: Callable, parallelism: int) -> int:
+        # single reader, rows are dispatched to worker threads; at most 2 * parallelism rows are read ahead
+        def run_worker_row(row):
+            worker_context = context.clone()
+            worker_context.set_variable(var_name, row)
+            run_row(worker_context, row)
+
         row_count = 0
-        self.source = self.proj.get_source(context,source_name)
-        with self.source.connect() as conn:
-            conn.open_table_for_read(table_address)
-            row = conn.next_row()
-            while row is not None:
-                row_count += 1
-                new_context.set_variable(var_name, row)
-                context.job.run_op(new_context, block_op, None)
-                row = conn.next_row()
-
-
-        logger.info(f"Finished. Processed {row_count} rows")
\ No newline at end of file
+        pending = set()
+        with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="sequor-for_each") as executor:
+            try:
+                with source.connect() as conn:
+                    conn.open_table_for_read(table_address)
+                    row = conn.next_row()
+                    while row is not None:
+                        row_count += 1
+                        pending.add(executor.submit(contextvars.copy_context().run, run_worker_row, row))
+                        if len(pending) >= 2 * parallelism:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            self._raise_first_error(done)
+                        row = conn.next_row()
+                done, pending = wait(pending)
+                self._raise_first_error(done)
+            finally:
+                for future in pending:
+                    future.cancel()
+        return row_count
+
+    def _run_partitions_parallel(self, context: Context, source: Source, table_address: TableAddress, var_name: str, run_row: Callable, parallelism: int, partition_by: str) -> int:
+        # the table is split into hash partitions of partition_by column; each partition is read by its own connection
+        stop_event = threading.Event()
+
+        def run_partition(partition_index):
+            partition_row_count = 0
+            worker_context = context.clone()
+            query = source.get_partition_query(table_address, partition_by, parallelism, partition_index)
+            try:
+                with source.connect() as conn:
+                    conn.open_query(query)
+                    row = conn.next_row()
+                    while row is not None and not stop_event.is_set():
+                        partition_row_count += 1
+                        worker_context.set_variable(var_name, row)
+                        run_row(worker_context, row)
+                        row = conn.next_row()
+            except Exception:
+                # stop other partitions at their next row
+                stop_event.set()
+                raise
+            return partition_row_count
+
+        with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="sequor-for_each") as executor:
+            # workers run in a copy of the caller's contextvars (e.g. environment of the log stream)
+            futures = [executor.submit(contextvars.copy_context().run, run_partition, partition_index) for partition_index in range(parallelism)]
+            wait(futures)
+        self._raise_first_error(futures)
+        return sum(future.result() for future in futures)
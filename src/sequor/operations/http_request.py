@@ -1,17 +1,31 @@
 from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import contextvars
 import json
 import logging
-from typing import Any, Dict, List, NamedTuple
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Tuple
 
 import urllib.parse
+from sequor.common import json_codec
 from sequor.common.common import Common
 from sequor.core.context import Context
 from sequor.core.op import Op
 import requests
-from sequor.common.executor_utils import UserContext, UserFunction, load_user_function, render_jinja, set_variable_from_def
+from sequor.common.executor_utils import UserContext, UserFunction, has_jinja_markers, load_user_function, render_jinja, set_variable_from_def
 from sequor.common.data_loader import DataLoader
+from sequor.common.dead_letter import RowErrorPolicy
+from sequor.common.latency import LatencyTracker
+from sequor.common.request_timings import RequestTimings
+from sequor.common.retry_policy import RetryPolicy
 from sequor.core.user_error import UserError
 from sequor.source.row import Row
+from sequor.source.file_records import FILE_COMPRESSIONS, FILE_FORMATS
+from sequor.source.json_path import extract_columns
+from sequor.source.model import Model
 from sequor.source.source import Source
 from sequor.source.table_address import TableAddress
 from requests.auth import HTTPBasicAuth, HTTPDigestAuth
@@ -21,7 +35,8 @@ from authlib.integrations.requests_client import OAuth2Session
 
 
 class HTTPRequestParameters:
-    def __init__(self, auth_handler, oauth_session, url, method, parameters, headers, body_format, body, response_def): # success_status, target_table_addrs, parse_response_fun):
+    def __init__(self, auth_handler, oauth_session, url, method, parameters, headers, body_format, body, response_def,
+                 timeout=None, deadline_at=None, hedge=None, retry_policy=None, download=None, response_plan=None, timings=None, request_plan=None): # success_status, target_table_addrs, parse_response_fun):
         self.auth_handler = auth_handler
         self.oauth_session = oauth_session
         self.url = url
@@ -31,26 +46,89 @@ class HTTPRequestParameters:
         self.body = body
         self.body_format = body_format
         self.response_def = response_def
+        self.timeout = timeout # seconds or (connect, read) as accepted by requests
+        self.deadline_at = deadline_at # time.monotonic() after which no request is sent
+        self.hedge = hedge # (percentile, min_samples) or None
+        self.retry_policy = retry_policy
+        self.download = download # ResponseDownload or None
+        self.response_plan = response_plan # ResponsePlan of a static response section or None
+        self.timings = timings # RequestTimings of the op run
+        self.request_plan = request_plan # RequestPlan of the op run (see HTTPRequestOp._plan_request())
         # self.success_status = success_status
         # self.target_table_addrs = target_table_addrs
         # self.parse_response_fun = parse_response_fun
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+class ResponseDownload:
+    """response.download: the body is streamed to a local file and tables without data are bulk loaded from it"""
+    def __init__(self, file_format: str, compression: str, delimiter: str, header: bool):
+        self.file_format = file_format
+        self.compression = compression
+        self.delimiter = delimiter
+        self.header = header
+
+    @classmethod
+    def from_def(cls, context: Context, download_def: Dict[str, Any]) -> 'ResponseDownload':
+        if not isinstance(download_def, dict):
+            raise UserError(f"'download' must be an object with 'format': {download_def}")
+        file_format = Op.get_parameter(context, download_def, 'format', is_required=True, render=3, location_desc="response.download")
+        if file_format not in FILE_FORMATS:
+            raise UserError(f"Unsupported download format: {file_format}. Supported formats: {', '.join(FILE_FORMATS)}")
+        compression = Op.get_parameter(context, download_def, 'compression', is_required=False, render=3) or "none"
+        if compression not in FILE_COMPRESSIONS:
+            raise UserError(f"Unsupported download compression: {compression}. Supported compressions: {', '.join(FILE_COMPRESSIONS)}")
+        delimiter = Op.get_parameter(context, download_def, 'delimiter', is_required=False, render=3) or ","
+        header = Op.get_parameter(context, download_def, 'header', is_required=False, render=3)
+        return cls(file_format, compression, delimiter, header is not False)
+
+    def save(self, response: requests.Response) -> str:
+        # Content-Encoding (e.g. gzip transfer) is decoded by iter_content; 'compression' is about the file itself
+        suffix = "." + self.file_format + (".gz" if self.compression == "gzip" else "")
+        fd, file_path = tempfile.mkstemp(prefix="sequor_download_", suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+        except BaseException:
+            os.remove(file_path)
+            raise
+        finally:
+            response.close()
+        return file_path
+
 class UserResponse:
-    def __init__(self, response: requests.Response):
+    def __init__(self, response: requests.Response, timings: RequestTimings):
         self.response = response
+        self.timings = timings
         self.response_json_parsed = None
+        self.downloaded_file_path = None # set in download mode
 
     def status_code(self):
         return self.response.status_code
     
+    def file_path(self):
+        if self.downloaded_file_path is None:
+            raise UserError("response.file_path() is available only when 'download' is set in the response section")
+        return self.downloaded_file_path
+
     def json(self):
+        if self.downloaded_file_path is not None:
+            raise UserError("The response body was downloaded to a file: use response.file_path() instead of response.json()")
         if self.response_json_parsed is not None:
             return self.response_json_parsed
         else:
-            self.response_json_parsed = self.response.json()
+            with self.timings.phase("json_parse"):
+                try:
+                    self.response_json_parsed = json_codec.loads(self.response.content)
+                except ValueError:
+                    # not UTF-8 or not JSON: requests detects the encoding and reports the error
+                    self.response_json_parsed = self.response.json()
             return self.response_json_parsed
     
     def text(self):
+        if self.downloaded_file_path is not None:
+            raise UserError("The response body was downloaded to a file: use response.file_path() instead of response.text()")
         return self.response.text
     
     def headers(self):
@@ -93,26 +171,136 @@ class OAuth2PasswordFlowSession():
         self.username = username
         self.password = password
         self.token = None
+        # sessions are shared by op runs and jobs (see Project.get_oauth_session())
+        self._lock = threading.Lock()
             
     def ensure_active_token(self):
         """Check if token exists and is valid, fetch or refresh as needed"""
-        if self.token is None:
-            self.token = self.authlib_session.fetch_token(
-                self.token_endpoint,
-                grant_type='password',
-                username=self.username,
-                password=self.password,
-                client_id=self.client_id,
-                client_secret=self.client_secret
-            )
-        elif self.token.is_expired():
-            self.refresh_token(self.token_endpoint)
-        return self.token
+        with self._lock:
+            if self.token is None:
+                self.token = self.authlib_session.fetch_token(
+                    self.token_endpoint,
+                    grant_type='password',
+                    username=self.username,
+                    password=self.password,
+                    client_id=self.client_id,
+                    client_secret=self.client_secret
+                )
+            elif self.token.is_expired():
+                if self.token.get('refresh_token'):
+                    self.token = self.authlib_session.refresh_token(self.token_endpoint)
+                else:
+                    self.token = self.authlib_session.fetch_token(
+                        self.token_endpoint,
+                        grant_type='password',
+                        username=self.username,
+                        password=self.password,
+                        client_id=self.client_id,
+                        client_secret=self.client_secret
+                    )
+            return self.token
+
+# parts of the request in request_kwargs of requests: "params" are the query parameters, "data" is the encoded body
+REQUEST_PARTS = ["method", "url", "params", "headers", "data"]
+
+class RequestPlan:
+    """Parts of the request that are the same for every request of an op run, evaluated (the body encoded) once.
+
+    A part that is an expression or contains Jinja (e.g. references the for_each row or a pagination cursor) is not in
+    static_kwargs and is evaluated for every request.
+    """
+    def __init__(self, static_kwargs: Dict[str, Any]):
+        self.static_kwargs = static_kwargs
+
+class ResponseTablePlan:
+    """A table of response.tables: everything but its data and columns_expression, which are evaluated for every response"""
+    def __init__(self, table_addr: TableAddress, data_def: Any, columns_def: Any, load: str, records_path: str, extract_columns: list):
+        self.table_addr = table_addr
+        self.data_def = data_def # value or compiled data_expression
+        self.columns_def = columns_def # compiled columns_expression or None if the columns are in table_addr.model_def
+        self.load = load
+        self.records_path = records_path
+        self.extract_columns = extract_columns # columns for declarative extraction (records_path / column paths) or None
+
+    def get_extract_columns(self, model_def: Any, download: 'ResponseDownload') -> list:
+        if self.data_def is None and self.load != "native" and download is None and isinstance(model_def, dict):
+            table_columns = Model.from_model_def(model_def).columns
+            if self.records_path is not None or any(column.path for column in table_columns):
+                return table_columns
+        return None
+
+class ResponsePlan:
+    """The response section with templates rendered, expressions compiled and tables resolved.
+
+    A static section (no response_expression, no Jinja) is planned once per op run; otherwise it is planned for every response.
+    """
+    def __init__(self, context: Context, response_def: Dict[str, Any], download: 'ResponseDownload' = None):
+        self.success_status = Op.get_parameter(context, response_def, 'success_status', is_required=False, render=3)
+        if self.success_status is not None and not isinstance(self.success_status, list):
+            raise UserError(f"success_status must be a list of integers: {self.success_status}")
+        target_source_name = Op.get_parameter(context, response_def, 'source', is_required=False, render=3)
+        target_database_name = Op.get_parameter(context, response_def, 'database', is_required=False, render=3)
+        target_namespace_name = Op.get_parameter(context, response_def, 'namespace', is_required=False, render=3)
+        target_table_name = Op.get_parameter(context, response_def, 'table', is_required=False, render=3)
+        target_tables_def = Op.get_parameter(context, response_def, 'tables', is_required=False, render=3)
+        self.tables = None
+        if target_tables_def:
+            self.tables = []
+            for table_def in target_tables_def:
+                table_source_name = table_def.get('source')
+                table_database_name = table_def.get('database')
+                table_namespace_name = table_def.get('namespace')
+                table_table_name = table_def.get('table')
+                table_model_def = table_def.get('model')
+                columns_def = None
+                if table_model_def is None:
+                    table_columns_def = Op.get_parameter(context, table_def, 'columns', is_required=True, render=3)  # table_def.get('columns')
+                    if callable(table_columns_def):
+                        # columns_expression may use variables that are set later (e.g. by the response section): evaluated for every response
+                        columns_def = table_columns_def
+                    elif table_columns_def is not None:
+                        table_model_def = {"columns": table_columns_def}
+                data_def = Op.get_parameter(context, table_def, 'data', is_required=False, render=3) # function_params_def="context, response"
+                write_mode = table_def.get('write_mode')
+                load = table_def.get('load')
+                if load is not None and load not in ("python", "native"):
+                    raise UserError(f"'load' must be 'python' or 'native' in tables.'{table_table_name}': {load}")
+                records_path = table_def.get('records_path')
+                table_addr = TableAddress(table_source_name or target_source_name, table_database_name or target_database_name, table_namespace_name or target_namespace_name,
+                                        table_table_name or target_table_name, table_model_def, None, write_mode)
+                table_plan = ResponseTablePlan(table_addr, data_def, columns_def, load, records_path, None)
+                if columns_def is None:
+                    table_plan.extract_columns = table_plan.get_extract_columns(table_model_def, download)
+                self.tables.append(table_plan)
+        self.parser = Op.get_parameter(context, response_def, 'parser', is_required=False, render=3)
+        self.variables_def = Op.get_parameter(context, response_def, 'variables', is_required=False, render=3, location_desc="response") # , function_params_def="context, response"
+        self.while_def = Op.get_parameter(context, response_def, 'while', is_required=False, render=3, location_desc="response") # , function_params_def="context, response"
+
+class HTTPResponseError(UserError):
+    """Response with a status code that is not in success_status"""
+    def __init__(self, message: str, status_code: int, response_text: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response_text = response_text
+
+# Hedged GETs run in a pool shared by all ops
+HEDGE_MAX_WORKERS = 32
+_hedge_executor = None
+_hedge_executor_lock = threading.Lock()
+
+def get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_MAX_WORKERS, thread_name_prefix="sequor-hedge")
+        return _hedge_executor
 
 # @Op.register('http_request')
 class HTTPRequestOp(Op):
     def __init__(self, proj, op_def: Dict[str, Any]):
         super().__init__(proj, op_def)
+        # latencies of this op's requests are kept across runs: hedging needs a history to compute the percentile
+        self._latency_tracker = LatencyTracker()
     
     def get_title(self) -> str:
         request_def = self.op_def.get('request')
@@ -152,25 +340,81 @@ class HTTPRequestOp(Op):
         auth_handler = None
         if http_params.oauth_session:
             http_service = http_params.oauth_session.authlib_session
-            http_params.oauth_session.ensure_active_token()
+            with http_params.timings.phase("auth"):
+                http_params.oauth_session.ensure_active_token()
             auth_handler = None
         else:
             http_service = requests
             auth_handler = http_params.auth_handler
 
+        render_start = time.monotonic()
+        request_plan = http_params.request_plan
+        request_kwargs = {}
+        for part in REQUEST_PARTS:
+            if part in request_plan.static_kwargs:
+                request_kwargs[part] = request_plan.static_kwargs[part]
+            else:
+                request_kwargs[part] = self._eval_request_part(context, http_params, part)
+        request_kwargs["auth"] = auth_handler
+        http_params.timings.add("render", time.monotonic() - render_start)
+        if http_params.download is not None:
+            # the body is written to a file chunk by chunk instead of being read into memory
+            request_kwargs["stream"] = True
+        response = self._send_request_with_retry(http_service, request_kwargs, http_params, logger)
+        if op_options.get("debug_request_preview_trace"):
+            # http_log = dump.dump_all(response, request_prefix=b'>> ', response_prefix=b'<< ')
+            http_log = dump.dump_all(response, request_prefix=b'', response_prefix=b'')
+            http_log_st = http_log.decode("utf-8")
+            logger.info(f"HTTP request trace:\n----------------- TRACE START -----------------\n{http_log_st}\n----------------- TRACE END -----------------")
+        return response
+
+    @staticmethod
+    def _is_static_part(part_def: Any) -> bool:
+        # no expression and no Jinja: evaluates to the same value for every request
+        if callable(part_def) or has_jinja_markers(part_def):
+            return False
+        # "<name>_expression" keys of the query parameters are evaluated by Op.eval_dict()
+        return not (isinstance(part_def, dict) and any(str(key).endswith("_expression") for key in part_def))
+
+    def _plan_request(self, context: Context, http_params: HTTPRequestParameters) -> RequestPlan:
+        part_defs = {"method": http_params.method, "url": http_params.url, "params": http_params.parameters,
+                     "headers": http_params.headers, "data": http_params.body}
+        static_kwargs = {}
+        with http_params.timings.phase("render"):
+            for part in REQUEST_PARTS:
+                if HTTPRequestOp._is_static_part(part_defs[part]):
+                    static_kwargs[part] = self._eval_request_part(context, http_params, part)
+        return RequestPlan(static_kwargs)
+
+    def _eval_request_part(self, context: Context, http_params: HTTPRequestParameters, part: str) -> Any:
+        if part == "method":
+            return Op.eval_parameter(context, http_params.method, "method", render=1, location_desc="request")
+        if part == "url":
+            return Op.eval_parameter(context, http_params.url, "url", render=1, location_desc="request")
+        if part == "params":
+            parameters = Op.eval_parameter(context, http_params.parameters, "parameters", render=1, location_desc="request")
+            return Op.eval_dict(context, parameters, "parameters", location_desc="request")
+        if part == "headers":
+            return Op.eval_parameter(context, http_params.headers, "headers", render=1, location_desc="request")
+        return self._encode_body(context, http_params)
+
+    def _encode_body(self, context: Context, http_params: HTTPRequestParameters) -> Any:
         # Serialize body to body_format
         body = Op.eval_parameter(context, http_params.body, "body", render=1, null_literal=True, location_desc="request")
+        if callable(http_params.body):
+            # a static body was converted from YAML once per op run (see run()), a body returned by an expression is converted here
+            body = self._convert_yaml_to_python(body)
         request_body = None
         if http_params.body_format == "json":
             # body_dict = self._convert_yaml_to_python(body)
             # body_test = {
             #     "email_address": "test@test.com"
             # }
-            request_body = json.dumps(self._convert_yaml_to_python(body))
+            request_body = json_codec.dumps(body)
             # if "Content-Type" not in headers:
             # #     headers["Content-Type"] = "application/json"
         if http_params.body_format == "form_urlencoded":
-            body_dict = self._convert_yaml_to_python(body)
+            body_dict = body
             if not isinstance(body_dict, dict):
                 raise UserError("Request body must be dictionary for form_urlencoded body format: " + str(body_dict))
             request_body = urllib.parse.urlencode(body_dict)
@@ -210,162 +454,320 @@ class HTTPRequestOp(Op):
             # if "Content-Type" not in headers:
             #     headers["Content-Type"] = "application/octet-stream"
 
-        parameters = Op.eval_parameter(context, http_params.parameters, "parameters", render=1, location_desc="request")
-        parameters = Op.eval_dict(context, parameters, "parameters", location_desc="request")
-
-        response = http_service.request(
-            method = Op.eval_parameter(context, http_params.method, "method", render=1, location_desc="request"),  # or "POST", "PUT", "DELETE", etc.
-            url = Op.eval_parameter(context, http_params.url, "url", render=1, location_desc="request"),
-            params = parameters, # {"key": "value"},  # Query parameters
-            headers = Op.eval_parameter(context, http_params.headers, "headers", render=1, location_desc="request"), # {"Content-Type": "application/json"},
-            auth = auth_handler,
-            # json={"data": "payload"},  # JSON body
-            # data={"form": "data"},     # Form data
-            data = request_body
-            # timeout=10,
-            # verify=True,  # SSL verification
-        )
-        if op_options.get("debug_request_preview_trace"):
-            # http_log = dump.dump_all(response, request_prefix=b'>> ', response_prefix=b'<< ')
-            http_log = dump.dump_all(response, request_prefix=b'', response_prefix=b'')
-            http_log_st = http_log.decode("utf-8")
-            logger.info(f"HTTP request trace:\n----------------- TRACE START -----------------\n{http_log_st}\n----------------- TRACE END -----------------")
-        return response
-
-    def _make_request(self, context, http_params: HTTPRequestParameters, op_options: Dict[str, Any], logger: logging.Logger):
+        return request_body
+
+    @staticmethod
+    def _parse_seconds(value: Any, name: str) -> float:
+        try:
+            seconds = float(value)
+        except (TypeError, ValueError):
+            raise UserError(f"'{name}' must be a positive number of seconds: {value}")
+        if seconds <= 0:
+            raise UserError(f"'{name}' must be a positive number of seconds: {value}")
+        return seconds
+
+    @staticmethod
+    def _parse_timeout(timeout_def: Any):
+        # timeout: <seconds> or timeout: {connect: <seconds>, read: <seconds>}
+        if timeout_def is None:
+            return None
+        if isinstance(timeout_def, dict):
+            connect = timeout_def.get('connect')
+            read = timeout_def.get('read')
+            return (HTTPRequestOp._parse_seconds(connect, "timeout.connect") if connect is not None else None,
+                    HTTPRequestOp._parse_seconds(read, "timeout.read") if read is not None else None)
+        return HTTPRequestOp._parse_seconds(timeout_def, "timeout")
+
+    @staticmethod
+    def _parse_hedge(hedge_def: Any):
+        # hedge: true or hedge: {percentile: 95, min_samples: 20}
+        if hedge_def is None or hedge_def is False:
+            return None
+        if hedge_def is True:
+            hedge_def = {}
+        if not isinstance(hedge_def, dict):
+            raise UserError(f"'hedge' must be true or an object with 'percentile' and 'min_samples': {hedge_def}")
+        percentile = hedge_def.get('percentile', 95)
+        min_samples = hedge_def.get('min_samples', 20)
+        try:
+            percentile = float(percentile)
+            min_samples = int(min_samples)
+        except (TypeError, ValueError):
+            raise UserError(f"'hedge' must be true or an object with 'percentile' and 'min_samples': {hedge_def}")
+        if not 0 < percentile < 100 or min_samples < 1:
+            raise UserError(f"'hedge.percentile' must be between 0 and 100 and 'hedge.min_samples' must be positive: {hedge_def}")
+        return (percentile, min_samples)
+
+    @staticmethod
+    def _cap_timeout(timeout, remaining: float):
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(min(t, remaining) if t is not None else remaining for t in timeout)
+        return min(timeout, remaining)
+
+    def _send_request(self, http_service, request_kwargs: Dict[str, Any], http_params: HTTPRequestParameters, logger: logging.Logger) -> Tuple[requests.Response, float]:
+        # returns the response and the seconds it took (body included unless streamed)
+        timeout = http_params.timeout
+        if http_params.deadline_at is not None:
+            # the deadline is checked before every request and caps its timeouts
+            # (requests applies the read timeout per socket read, not to the whole response)
+            remaining = http_params.deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise UserError(f"Deadline of \"{self.get_title()}\" exceeded")
+            timeout = self._cap_timeout(timeout, remaining)
+        if timeout is not None:
+            request_kwargs["timeout"] = timeout
+
+        # requests are grouped by the url as written in the op (a template) and not by the rendered url (e.g. with ids in the path)
+        endpoint = RequestTimings.endpoint_key(request_kwargs["method"], http_params.url if isinstance(http_params.url, str) else request_kwargs["url"])
+        def timed_request(started: threading.Event = None, started_at: list = None):
+            start = time.monotonic()
+            if started is not None:
+                started_at.append(start)
+                started.set()
+            try:
+                response = http_service.request(**request_kwargs)
+            except Exception:
+                http_params.timings.add_request(endpoint, time.monotonic() - start, failed=True)
+                raise
+            seconds = time.monotonic() - start
+            self._latency_tracker.add(seconds)
+            http_params.timings.add_request(endpoint, seconds)
+            return response, seconds
+
+        # only idempotent GETs are hedged and only when there is enough history to compute the percentile
+        hedge = http_params.hedge
+        if hedge is None or str(request_kwargs["method"]).upper() != "GET":
+            return timed_request()
+        percentile, min_samples = hedge
+        if self._latency_tracker.count() < min_samples:
+            return timed_request()
+        hedge_after = self._latency_tracker.percentile(percentile)
+
+        executor = get_hedge_executor()
+        primary_started = threading.Event()
+        primary_started_at = []
+        primary = executor.submit(contextvars.copy_context().run, timed_request, primary_started, primary_started_at)
+        # the hedge delay counts from when the request is sent, not from when it was queued: when the pool is busy
+        # (e.g. parallel for_each), waiting for a free worker must not fire hedges for requests that were never sent
+        primary_started.wait()
+        done, _ = wait([primary], timeout=max(0.0, hedge_after - (time.monotonic() - primary_started_at[0])))
+        if done:
+            return primary.result()
+        logger.debug(f"No response after {hedge_after:.3f}s (p{percentile:g}), sending a hedged request")
+        duplicate = executor.submit(contextvars.copy_context().run, timed_request)
+        pending = {primary, duplicate}
         while True:
-            response = self._make_request_helper(context, http_params, op_options, logger)
-            response_user = UserResponse(response)
-            response_def = Op.eval_parameter(context, http_params.response_def, "response", render=0, extra_params=[response_user]) 
-            # if callable(http_params.response_def):
-            #     response_def = http_params.response_def(UserContext(context), response)
-            # else:
-            #     response_def = http_params.response_def
-            
-            success_status = Op.get_parameter(context, response_def, 'success_status', is_required=False, render=3)
-            if success_status is not None and not isinstance(success_status, list):
-                raise UserError(f"success_status must be a list of integers: {success_status}")            
-            if success_status is not None:
-                if response.status_code not in success_status:
-                    raise UserError(f"HTTP request failed with unexpected status code: {response.status_code}. Expected status codes: {success_status}. Response body: {response.text}") 
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # the losing request is left to finish in the background and its response is discarded
+                    for other in pending:
+                        other.add_done_callback(lambda f: f.exception() is None and f.result()[0].close())
+                    return future.result()
+            if not pending:
+                # both failed: report the error of the original request
+                return primary.result()
+
+    def _send_request_with_retry(self, http_service, request_kwargs: Dict[str, Any], http_params: HTTPRequestParameters, logger: logging.Logger) -> requests.Response:
+        # only the failed request is retried: responses already loaded by the DataLoader are not requested again
+        retry_policy = http_params.retry_policy
+        attempt = 1
+        while True:
+            try:
+                response, seconds = self._send_request(http_service, request_kwargs, http_params, logger)
+            except Exception as e:
+                if retry_policy is None or not retry_policy.should_retry_exception(e, attempt):
+                    raise
+                delay = retry_policy.get_delay(attempt)
+                logger.warning(f"HTTP request failed (attempt {attempt} of {retry_policy.max_attempts}), retrying in {delay:.2f}s: {e}")
+            else:
+                # requests measures elapsed until the response headers; the rest is reading the body
+                ttfb = min(response.elapsed.total_seconds(), seconds)
+                http_params.timings.add("ttfb", ttfb)
+                http_params.timings.add("download", seconds - ttfb)
+                if retry_policy is None or not retry_policy.should_retry_response(response, attempt):
+                    return response
+                delay = retry_policy.get_delay(attempt, response)
+                logger.warning(f"HTTP request returned status code {response.status_code} (attempt {attempt} of {retry_policy.max_attempts}), retrying in {delay:.2f}s")
+                response.close()
+            if http_params.deadline_at is not None:
+                # no point in waiting past the deadline: the next attempt would fail on it anyway
+                delay = min(delay, max(0.0, http_params.deadline_at - time.monotonic()))
+            time.sleep(delay)
+            http_params.timings.add("retry_wait", delay)
+            attempt += 1
+
+    def _make_request(self, context, http_params: HTTPRequestParameters, data_loader: DataLoader, op_options: Dict[str, Any], logger: logging.Logger):
+        body_file_path = None # downloaded body or body saved for native loading
+        try:
+            while True:
+                response = self._make_request_helper(context, http_params, op_options, logger)
+                response_user = UserResponse(response, http_params.timings)
+                if http_params.response_plan is not None:
+                    response_plan = http_params.response_plan
+                else:
+                    # the response section depends on the response (response_expression) or on variables: plan it for every response
+                    with http_params.timings.phase("render"):
+                        response_def = Op.eval_parameter(context, http_params.response_def, "response", render=0, extra_params=[response_user])
+                        response_plan = ResponsePlan(context, response_def, http_params.download)
+
+                if response_plan.success_status is not None:
+                    if response.status_code not in response_plan.success_status:
+                        raise HTTPResponseError(f"HTTP request failed with unexpected status code: {response.status_code}. Expected status codes: {response_plan.success_status}. Response body: {response.text}", response.status_code, response.text)
+
+                if http_params.download is not None:
+                    # the file of the previous page is not needed anymore
+                    if body_file_path is not None:
+                        os.remove(body_file_path)
+                        body_file_path = None
+                    with http_params.timings.phase("download"):
+                        body_file_path = http_params.download.save(response)
+                    response_user.downloaded_file_path = body_file_path
                 
-            target_source_name = Op.get_parameter(context, response_def, 'source', is_required=False, render=3)
-            target_database_name = Op.get_parameter(context, response_def, 'database', is_required=False, render=3)
-            target_namespace_name = Op.get_parameter(context, response_def, 'namespace', is_required=False, render=3)
-            target_table_name = Op.get_parameter(context, response_def, 'table', is_required=False, render=3)
-            target_tables_def = Op.get_parameter(context, response_def, 'tables', is_required=False, render=3)
-            target_table_addrs = None
-            if target_tables_def:
-                target_table_addrs = []
-                for table_def in target_tables_def:
-                    table_source_name = table_def.get('source')
-                    table_database_name = table_def.get('database')
-                    table_namespace_name = table_def.get('namespace')
-                    table_table_name = table_def.get('table')
-                    table_model_def = table_def.get('model')
-                    if table_model_def is None:
-                        table_columns_def = Op.get_parameter(context, table_def, 'columns', is_required=True, render=3)  # table_def.get('columns')
-                        if table_columns_def is not None:
-                            table_model_def = {"columns": Op.eval_parameter(context, table_columns_def, "columns",render=0, location_desc="tables.'{table_table_name}'")}
-                    data_def = Op.get_parameter(context, table_def, 'data', is_required=False, render=3) # function_params_def="context, response"
-                    data_def = Op.eval_parameter(context, data_def, "data", render=0, location_desc=f"tables.'{table_table_name}'", extra_params=[response_user])
-                    write_mode = table_def.get('write_mode')
-                    table_addr = TableAddress(table_source_name or target_source_name, table_database_name or target_database_name, table_namespace_name or target_namespace_name, 
-                                            table_table_name or target_table_name, table_model_def, data_def,write_mode)
-                    target_table_addrs.append(table_addr)
-
-            parser = Op.get_parameter(context, response_def, 'parser', is_required=False, render=3)
-            # # Compile parser response function code
-            # parser = response_def.get('parser')
-            # # todo: do we have any use case to allow non-expression parser?
-            # if parser:
-            #     raise UserError("parser is not supported. Use parser_expression instead")
-            # parse_response_fun = None
-            # parse_response_expression = response_def.get('parser_expression')
-            # if parse_response_expression is not None:
-            #     parse_response_expression_line = Common.get_line_number(response_def, 'parser_expression')
-            #     parse_response_fun_compiled = load_user_function(parse_response_expression, "parser_expression", parse_response_expression_line) # , function_params_def="context, response"
-            #     parse_response_fun = UserFunction(parse_response_fun_compiled, parse_response_expression_line)
+                target_table_addrs = None
+                native_table_addrs = [] # (table address, records_path) of tables with load: native
+                if response_plan.tables is not None:
+                    target_table_addrs = []
+                    for table_plan in response_plan.tables:
+                        table_name = table_plan.table_addr.table_name
+                        table_addr = table_plan.table_addr.clone()
+                        table_extract_columns = table_plan.extract_columns
+                        with http_params.timings.phase("expressions"):
+                            if table_plan.columns_def is not None:
+                                table_addr.model_def = {"columns": Op.eval_parameter(context, table_plan.columns_def, "columns", render=0, location_desc=f"tables.'{table_name}'")}
+                                table_extract_columns = table_plan.get_extract_columns(table_addr.model_def, http_params.download)
+                            data_def = Op.eval_parameter(context, table_plan.data_def, "data", render=0, location_desc=f"tables.'{table_name}'", extra_params=[response_user])
+                            if data_def is None and table_extract_columns is not None:
+                                # declarative extraction: records at records_path, columns at their paths (compiled once, applied column by column)
+                                data_def = extract_columns(response_user.json(), table_plan.records_path, table_extract_columns)
+                        table_addr.data = data_def
+                        if table_plan.load == "native":
+                            # the body is parsed by the target source (DuckDB: read_json) instead of Python
+                            if data_def is not None:
+                                raise UserError(f"'data' cannot be used with 'load: native' in tables.'{table_name}'")
+                            native_table_addrs.append((table_addr, table_plan.records_path))
+                            continue
+                        target_table_addrs.append(table_addr)
+
+                parser = response_plan.parser
+                variables_def = response_plan.variables_def
+                while_def = response_plan.while_def
+                # # Compile parser response function code
+                # parser = response_def.get('parser')
+                # # todo: do we have any use case to allow non-expression parser?
+                # if parser:
+                #     raise UserError("parser is not supported. Use parser_expression instead")
+                # parse_response_fun = None
+                # parse_response_expression = response_def.get('parser_expression')
+                # if parse_response_expression is not None:
+                #     parse_response_expression_line = Common.get_line_number(response_def, 'parser_expression')
+                #     parse_response_fun_compiled = load_user_function(parse_response_expression, "parser_expression", parse_response_expression_line) # , function_params_def="context, response"
+                #     parse_response_fun = UserFunction(parse_response_fun_compiled, parse_response_expression_line)
            
 
-            tables_to_load = []
-            if parser is not None:
-                # parse response
-                # response_parsed = parse_response_fun.apply(UserContext(context), response_user)
-                response_parsed = Op.eval_parameter(context, parser, "parser", render=0, location_desc="response", extra_params=[response_user])
-
-                # preprocess target table definitions: 
-                # target tables are created inside the loader get_connection() method, it means that they will not be created without the response parser
-                tables_def = response_parsed.get('tables')
-                if target_table_addrs is not None:
-                    if tables_def is None or not isinstance(tables_def, dict):
-                        raise UserError("Response parser must return data as a dictionary for 'tables' defined in the response.tables section of this http_request op: " + str(tables_def))
-                    # if not isinstance(tables_def, dict):
-                    #     raise UserError("Response parser must return data for 'tables' as a dictionary because tables are defined in the response.tables section of this http_request op: " + str(tables_def))
-                    # Check that all required tables have data
-                    for table_addr in target_table_addrs:
-                        if table_addr.table_name not in tables_def:
-                            raise UserError(f"Data for the target table {table_addr.table_name} not found in the result returned by the HTTP response parser.")
-                    # Check that no extra tables were returned
-                    for table_name in tables_def:
-                        if not any(table_addr.table_name == table_name for table_addr in target_table_addrs):
-                            raise UserError(f"Unexpected table '{table_name}' found in the result returned by the HTTP response parser. This table was not defined in the response.tables section of this http_request op.")
-                    # tables to load
-                    for table_addr in target_table_addrs:
-                        table_addr_clone = table_addr.clone()
-                        table_addr_clone.data = tables_def.get(table_addr.table_name)
-                        tables_to_load.append(table_addr_clone)
-                else:
-                    # response parser can still return tables as array
-                    if tables_def is not None:
-                        if not isinstance(tables_def, list):
-                            raise UserError("Response parser must return 'tables' as array if no tables are defined in the response.tables section of this http_request op: " + str(tables_def))
-                        for table_def in tables_def:
-                            table_model_def = table_def.get('model')
-                            if table_model_def is None:
-                                table_columns_def = table_def.get('columns')
-                                if table_columns_def is not None:
-                                    table_model_def = {"columns": table_columns_def}
-                            table_addr_from_def = TableAddress(table_def.get('source'), table_def.get('database'), table_def.get('namespace'), table_def.get('table'),
-                                                               table_model_def, table_def.get('data'), table_def.get('write_mode'))
-                            tables_to_load.append(table_addr_from_def)
+                tables_to_load = []
+                if parser is not None:
+                    # parse response
+                    # response_parsed = parse_response_fun.apply(UserContext(context), response_user)
+                    with http_params.timings.phase("expressions"):
+                        response_parsed = Op.eval_parameter(context, parser, "parser", render=0, location_desc="response", extra_params=[response_user])
+
+                    # preprocess target table definitions: 
+                    # target tables are created inside the loader get_connection() method, it means that they will not be created without the response parser
+                    tables_def = response_parsed.get('tables')
+                    if target_table_addrs is not None:
+                        if tables_def is None or not isinstance(tables_def, dict):
+                            raise UserError("Response parser must return data as a dictionary for 'tables' defined in the response.tables section of this http_request op: " + str(tables_def))
+                        # if not isinstance(tables_def, dict):
+                        #     raise UserError("Response parser must return data for 'tables' as a dictionary because tables are defined in the response.tables section of this http_request op: " + str(tables_def))
+                        # Check that all required tables have data
+                        for table_addr in target_table_addrs:
+                            if table_addr.table_name not in tables_def:
+                                raise UserError(f"Data for the target table {table_addr.table_name} not found in the result returned by the HTTP response parser.")
+                        # Check that no extra tables were returned
+                        for table_name in tables_def:
+                            if not any(table_addr.table_name == table_name for table_addr in target_table_addrs):
+                                raise UserError(f"Unexpected table '{table_name}' found in the result returned by the HTTP response parser. This table was not defined in the response.tables section of this http_request op.")
+                        # tables to load
+                        for table_addr in target_table_addrs:
+                            table_addr_clone = table_addr.clone()
+                            table_addr_clone.data = tables_def.get(table_addr.table_name)
+                            tables_to_load.append(table_addr_clone)
+                    else:
+                        # response parser can still return tables as array
+                        if tables_def is not None:
+                            if not isinstance(tables_def, list):
+                                raise UserError("Response parser must return 'tables' as array if no tables are defined in the response.tables section of this http_request op: " + str(tables_def))
+                            for table_def in tables_def:
+                                table_model_def = table_def.get('model')
+                                if table_model_def is None:
+                                    table_columns_def = table_def.get('columns')
+                                    if table_columns_def is not None:
+                                        table_model_def = {"columns": table_columns_def}
+                                table_addr_from_def = TableAddress(table_def.get('source'), table_def.get('database'), table_def.get('namespace'), table_def.get('table'),
+                                                                   table_model_def, table_def.get('data'), table_def.get('write_mode'))
+                                tables_to_load.append(table_addr_from_def)
                 
-                if response_parsed.get('variables') is not None:
-                    response_def["variables"] = response_parsed.get('variables')
-                if response_parsed.get('while') is not None:
-                    response_def["while"] = response_parsed.get('while')
-            elif target_table_addrs is not None:
-                tables_to_load = target_table_addrs
-
-            # load tables    
-            self.data_loader.run(context, tables_to_load)
-
-            # set returned variables
-            variables_def = Op.get_parameter(context, response_def, 'variables', is_required=False, render=3, location_desc="response") # , function_params_def="context, response"
-            variables_def = Op.eval_parameter(context, variables_def, "variables", render=0, location_desc="response", extra_params=[response_user])
-            if variables_def is None:
-                variables_def = {}
-            variables_def = Op.eval_dict(context, variables_def, "variables", location_desc="response", extra_params=[response_user])
-            for name, value_def in variables_def.items():
-                # if name.endswith("_expression"):
-                #     name_real = name[:-11]  # Remove "_expression" suffix
-                #     value_def = Op.get_parameter(context, variables_def, name_real, is_required=False, render=3)
-                #     value_def = Op.eval_parameter(context, value_def, render=0, extra_params=[response_user])
-                # else:
-                #     real_name = name
-                if isinstance(value_def, dict):
-                    value_def = Op.eval_dict(context, value_def, "values", location_desc="response.variables", extra_params=[response_user])
-                set_variable_from_def(context, name, value_def)
-
-            while_def = Op.get_parameter(context, response_def, 'while', is_required=False, render=3, location_desc="response") # , function_params_def="context, response"
-            while_def = Op.eval_parameter(context, while_def, "while", render=0, location_desc="response", extra_params=[response_user])
-            if while_def is None:
-                while_def = False
-            if not isinstance(while_def, bool):
-                raise UserError("\"while\" in the result of the response section must be a boolean: " + str(while_def))
+                    # variables and while returned by the parser replace those of the response section for this response
+                    if response_parsed.get('variables') is not None:
+                        variables_def = render_jinja(context, response_parsed.get('variables'))
+                    if response_parsed.get('while') is not None:
+                        while_def = render_jinja(context, response_parsed.get('while'))
+                elif target_table_addrs is not None:
+                    tables_to_load = target_table_addrs
+
+                with http_params.timings.phase("db_load"):
+                    if http_params.download is not None:
+                        # tables without data are bulk loaded from the downloaded file
+                        for table_addr in [table_addr for table_addr in tables_to_load if table_addr.data is None]:
+                            data_loader.load_file(context, table_addr, body_file_path, http_params.download.file_format, http_params.download.compression,
+                                                  http_params.download.delimiter, http_params.download.header)
+                        tables_to_load = [table_addr for table_addr in tables_to_load if table_addr.data is not None]
+                        for table_addr, records_path in native_table_addrs:
+                            data_loader.load_file(context, table_addr, body_file_path, http_params.download.file_format, http_params.download.compression,
+                                                  http_params.download.delimiter, http_params.download.header, records_path)
+                    elif native_table_addrs:
+                        # the body (already in memory) is handed to the loader as a file: DuckDB reads files natively
+                        if body_file_path is not None:
+                            os.remove(body_file_path)
+                            body_file_path = None
+                        body_file_path = ResponseDownload("json", "none", ",", True).save(response)
+                        for table_addr, records_path in native_table_addrs:
+                            data_loader.load_file(context, table_addr, body_file_path, "json", records_path=records_path)
+
+                    # load tables    
+                    data_loader.run(context, tables_to_load)
+
+                # set returned variables
+                with http_params.timings.phase("expressions"):
+                    variables_def = Op.eval_parameter(context, variables_def, "variables", render=0, location_desc="response", extra_params=[response_user])
+                    if variables_def is None:
+                        variables_def = {}
+                    variables_def = Op.eval_dict(context, variables_def, "variables", location_desc="response", extra_params=[response_user])
+                    for name, value_def in variables_def.items():
+                        # if name.endswith("_expression"):
+                        #     name_real = name[:-11]  # Remove "_expression" suffix
+                        #     value_def = Op.get_parameter(context, variables_def, name_real, is_required=False, render=3)
+                        #     value_def = Op.eval_parameter(context, value_def, render=0, extra_params=[response_user])
+                        # else:
+                        #     real_name = name
+                        if isinstance(value_def, dict):
+                            value_def = Op.eval_dict(context, value_def, "values", location_desc="response.variables", extra_params=[response_user])
+                        set_variable_from_def(context, name, value_def)
+
+                    while_def = Op.eval_parameter(context, while_def, "while", render=0, location_desc="response", extra_params=[response_user])
+                if while_def is None:
+                    while_def = False
+                if not isinstance(while_def, bool):
+                    raise UserError("\"while\" in the result of the response section must be a boolean: " + str(while_def))
             
-            if not while_def:
-                break
+                if not while_def:
+                    break
+        finally:
+            if body_file_path is not None:
+                os.remove(body_file_path)
 
 
 
@@ -391,7 +793,20 @@ class HTTPRequestOp(Op):
         # render http source def in the context extended with source variable 
         # because source properties can contain references to the variables
         if http_source_name:
-            http_source_def = http_source.get_rendered_def()
+            http_source_def = http_source.get_rendered_def(context)
+
+        # timeouts of the op override the timeouts of the source; deadline limits the whole op run
+        timeout_def = Op.get_parameter(context, request_def, 'timeout', is_required=False, render=3)
+        if timeout_def is None and http_source_name:
+            timeout_def = http_source_def.get('timeout')
+        timeout = HTTPRequestOp._parse_timeout(timeout_def)
+        deadline_def = Op.get_parameter(context, self.op_def, 'deadline', is_required=False, render=3)
+        deadline_at = time.monotonic() + HTTPRequestOp._parse_seconds(deadline_def, "deadline") if deadline_def is not None else None
+        hedge = HTTPRequestOp._parse_hedge(Op.get_parameter(context, request_def, 'hedge', is_required=False, render=3))
+        retry_def = Op.get_parameter(context, request_def, 'retry', is_required=False, render=3)
+        if retry_def is None and http_source_name:
+            retry_def = http_source_def.get('retry')
+        retry_policy = RetryPolicy.from_def(retry_def)
         # self.op_def = render_jinja(context, self.op_def)
 
         # Extract init def
@@ -427,6 +842,9 @@ class HTTPRequestOp(Op):
         headers = Op.get_parameter(context, request_def, 'headers', is_required=False, render=2)
         body_format = Op.get_parameter(context, request_def, 'body_format', is_required=False, render=2)
         body = Op.get_parameter(context, request_def, 'body', is_required=False, render=2)
+        if not callable(body):
+            # plain Python structures: rendering does not copy YAML nodes and the rendered body can be encoded as is
+            body = self._convert_yaml_to_python(body)
         if body is not None and body_format is None:
             raise UserError("body_format is required when request body is provided (e.g. \"json\", \"form_urlencoded\", etc)")
         
@@ -435,6 +853,13 @@ class HTTPRequestOp(Op):
         response_def = Op.get_parameter(context, self.op_def, 'response', is_required=False, render=3)  # self.op_def.get('response', {}) , function_params_def="context, response"
         if response_def == None:
             response_def = {}
+        download = None
+        if isinstance(response_def, dict) and response_def.get('download') is not None:
+            download = ResponseDownload.from_def(context, response_def.get('download'))
+        # a static response section is planned once for all responses of this run
+        response_plan = None
+        if not callable(response_def) and not has_jinja_markers(response_def):
+            response_plan = ResponsePlan(context, response_def, download)
         
         auth_handler = None
         oauth_session = None
@@ -467,12 +892,19 @@ class HTTPRequestOp(Op):
                     http_source_auth_client_secret = Source.get_parameter(context, http_source_auth_def, 'client_secret')
                     http_source_auth_username = Source.get_parameter(context, http_source_auth_def, 'username')
                     http_source_auth_password = Source.get_parameter(context, http_source_auth_def, 'password')
-                    authlib_session = OAuth2Session(http_source_auth_client_id, http_source_auth_client_secret)
-                    oauth_session = OAuth2PasswordFlowSession(authlib_session, http_source_auth_token_endpoint, http_source_auth_client_id, http_source_auth_client_secret, http_source_auth_username, http_source_auth_password)
+                    def create_oauth_session():
+                        authlib_session = OAuth2Session(http_source_auth_client_id, http_source_auth_client_secret)
+                        return OAuth2PasswordFlowSession(authlib_session, http_source_auth_token_endpoint, http_source_auth_client_id, http_source_auth_client_secret, http_source_auth_username, http_source_auth_password)
+                    oauth_session_key = ("password", http_source_auth_token_endpoint, http_source_auth_client_id, http_source_auth_client_secret, http_source_auth_username, http_source_auth_password)
+                    oauth_session = self.proj.get_oauth_session(oauth_session_key, create_oauth_session)
             else:
                 raise UserError(f"Unsupported auth type: {http_source_auth_type}")
         
-        http_req_params = HTTPRequestParameters(auth_handler, oauth_session, url, method, parameters, headers, body_format, body, response_def) # success_status, target_table_addrs, parse_response_fun)
+        # per run: printed when the op finishes and kept in the flow log (run report)
+        timings = RequestTimings()
+        http_req_params = HTTPRequestParameters(auth_handler, oauth_session, url, method, parameters, headers, body_format, body, response_def,
+                                                timeout, deadline_at, hedge, retry_policy, download, response_plan, timings) # success_status, target_table_addrs, parse_response_fun)
+        http_req_params.request_plan = self._plan_request(context, http_req_params)
 
 
         if op_options.get("debug_foreach_record") or op_options.get("debug_request_preview_trace") or op_options.get("debug_request_preview_pretty"):
@@ -489,26 +921,49 @@ class HTTPRequestOp(Op):
                 logger.info("Running in debug_request_preview_trace mode")
                 self._make_request_helper(context, http_req_params, op_options, logger)
             else:
-                self._make_request(context, http_req_params, op_options, logger)
+                data_loader = DataLoader(self.proj, context.env)
+                try:
+                    self._make_request(context, http_req_params, data_loader, op_options, logger)
+                finally:
+                    with timings.phase("db_load"): # commits the loaded data
+                        data_loader.close()
         else:
-            self.data_loader = DataLoader(self.proj)
+            # data loader is per run (not on self): the op can be reused and run concurrently
+            data_loader = DataLoader(self.proj, context.env)
             try:
                 if foreach_def is None:
-                    self._make_request(context, http_req_params, op_options, logger)
+                    self._make_request(context, http_req_params, data_loader, op_options, logger)
                 else:
                     foreach_table_addr = parse_foreach_def()
                     foreach_source = self.proj.get_source(context,foreach_table_addr.source_name)
-                    with foreach_source.connect() as conn:
-                        conn.open_table_for_read(foreach_table_addr)
-                        foreach_row_count = 0
-                        foreach_row = conn.next_row()
-                        while foreach_row is not None:
-                            foreach_row_count += 1
-                            context.set_variable(foreach_var_name, foreach_row)
-                            self._make_request(context, http_req_params, op_options, logger)
+                    # on_error: continue -> failed rows go to the error budget and the dead-letter table instead of failing the op
+                    row_error_policy = RowErrorPolicy.from_def(context, foreach_def, location_desc)
+                    try:
+                        with foreach_source.connect() as conn:
+                            conn.open_table_for_read(foreach_table_addr)
+                            foreach_row_count = 0
                             foreach_row = conn.next_row()
+                            while foreach_row is not None:
+                                foreach_row_count += 1
+                                context.set_variable(foreach_var_name, foreach_row)
+                                if row_error_policy is None:
+                                    self._make_request(context, http_req_params, data_loader, op_options, logger)
+                                else:
+                                    try:
+                                        # a failed row must not leave some of its pages in the target tables
+                                        with data_loader.row_transaction():
+                                            self._make_request(context, http_req_params, data_loader, op_options, logger)
+                                    except Exception as e:
+                                        row_error_policy.handle(foreach_row, e)
+                                foreach_row = conn.next_row()
+                    finally:
+                        if row_error_policy is not None:
+                            row_error_policy.close()
             finally:
-                self.data_loader.close()
+                with timings.phase("db_load"): # commits the loaded data
+                    data_loader.close()
 
+        for timings_line in timings.summary_lines():
+            logger.info(timings_line)
         # logger.info(f"Finished \"" + self.get_title() + "\"")
-        context.add_to_log_op_finished(logger, f"Finished \"" + self.get_title() + "\"")
+        context.add_to_log_op_finished(logger, f"Finished \"" + self.get_title() + "\"", {"timings": timings.to_dict()})
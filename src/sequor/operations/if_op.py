@@ -13,6 +13,7 @@ from sequor.core.registry import create_op
 class IfOp(Op):
     def __init__(self, proj, op_def: Dict[str, Any]):
         super().__init__(proj, op_def)
+        self._block_ops: Dict[Any, Op] = {} # compiled branches: condition index -> block op (None for else)
 
     def get_title(self) -> str:
         title = self.name
@@ -21,6 +22,29 @@ class IfOp(Op):
             title = self.name + ": " + op_id
         return title
 
+    def get_block_op(self, condition_index: int = None) -> Op:
+        # each branch is compiled once and reused on every evaluation of this op
+        block_op = self._block_ops.get(condition_index)
+        if block_op is None:
+            if condition_index is not None:
+                conditions_def = self.op_def.get('conditions')[condition_index]
+                block_op_def = {
+                    "op": "block",
+                    "op_name_alias": f"condition_block",
+                    "title": f"{conditions_def.get('condition')}",
+                    "steps": conditions_def.get('then')
+                }
+            else:
+                # flow = context.project.build_flow_from_block_def("else", None, else_steps_def)
+                block_op_def = {
+                    "op": "block",
+                    "op_name_alias": f"else_block",
+                    "steps": self.op_def.get('else')
+                }
+            block_op = create_op(self.proj, block_op_def)
+            self._block_ops[condition_index] = block_op
+        return block_op
+
     def run(self, context: Context, op_options: Dict[str, Any]):
         logger = logging.getLogger("sequor.ops.if")
         # in "control statement" type of op we cannot render the whole op_def as it contains other ops
@@ -32,31 +56,16 @@ class IfOp(Op):
         is_condition_met = False
         condition_met_index = None
         for index, conditions_def in enumerate(conditions_def):
-            condition_value_def = conditions_def.get("condition")
             condition = Op.get_parameter(context, conditions_def, 'condition', is_required=True, render=3)
             condition = Op.eval_parameter(context, condition, "condition", render=0, location_desc=None, extra_params=[])
-            then_steps_def = conditions_def.get('then')
             if str(condition).strip().lower() == "true":
-                block_op_def = {
-                    "op": "block",
-                    "op_name_alias": f"condition_block",
-                    "title": f"{condition_value_def}",
-                    "steps": then_steps_def
-                }
-                block_op = create_op(context.project, block_op_def)
+                block_op = self.get_block_op(index)
                 # flow = context.project.build_flow_from_block_def("then", None, then_block)
                 is_condition_met = True
                 condition_met_index = index
                 break
         if not is_condition_met:
-            else_steps_def = self.op_def.get('else')
-            # flow = context.project.build_flow_from_block_def("else", None, else_steps_def)
-            block_op_def = {
-                "op": "block",
-                "op_name_alias": f"else_block",
-                "steps": else_steps_def
-            }
-            block_op = create_op(context.project, block_op_def)
+            block_op = self.get_block_op(None)
         # flow.run(context)
         new_context = context.clone()
         new_context.set_flow_info("if", None)
@@ -26,16 +26,16 @@ class MigrateSchemaOp(Op):
 
     def run(self, context, op_options: Dict[str, Any]):
         logger = logging.getLogger("sequor.ops.migrate_schema")
-        self.op_def = render_jinja(context, self.op_def)
+        op_def = render_jinja(context, self.op_def)
         logger.info(f"Starting \"{self.get_title()}\"")
-        target_source_name = self.op_def.get('target_source')
-        target_database_name = self.op_def.get('target_database')
-        target_namespace_name = self.op_def.get('target_namespace')
-        target_table_name = self.op_def.get('target_table')
-        columns_source_name = self.op_def.get('columns_source')
-        columns_database_name = self.op_def.get('columns_database')
-        columns_namespace_name = self.op_def.get('columns_namespace')
-        columns_table_name = self.op_def.get('columns_table')
+        target_source_name = op_def.get('target_source')
+        target_database_name = op_def.get('target_database')
+        target_namespace_name = op_def.get('target_namespace')
+        target_table_name = op_def.get('target_table')
+        columns_source_name = op_def.get('columns_source')
+        columns_database_name = op_def.get('columns_database')
+        columns_namespace_name = op_def.get('columns_namespace')
+        columns_table_name = op_def.get('columns_table')
 
         target_table_addr = TableAddress(target_source_name, target_database_name, target_namespace_name, target_table_name)
         columns_table_addr = TableAddress(columns_source_name, columns_database_name, columns_namespace_name, columns_table_name)
@@ -0,0 +1,97 @@
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+import contextvars
+import logging
+from typing import Any, Dict, List
+
+from sequor.core.context import Context
+from sequor.core.op import Op
+from sequor.core.registry import create_op
+from sequor.core.user_error import UserError
+
+
+# @Op.register('parallel')
+class ParallelOp(Op):
+    """Runs independent branches concurrently.
+
+    Each branch is a list of steps or {"title": ..., "steps": [...]}; "max_workers" limits how many branches run at the same time.
+    """
+    def __init__(self, proj, op_def: Dict[str, Any]):
+        super().__init__(proj, op_def)
+        self._block_ops: Dict[int, Op] = {} # compiled branches: branch index -> block op
+
+    def get_title(self) -> str:
+        op_title = self.op_def.get('title')
+        op_id = self.op_def.get('id')
+        if op_id is not None:
+            title = self.name + ": " + op_id
+        elif op_title is not None:
+            title = self.name + ": " + op_title
+        else:
+            title = self.name
+        return title
+
+    def get_branches_def(self) -> List[Any]:
+        branches_def = self.op_def.get('branches')
+        if not isinstance(branches_def, list) or len(branches_def) == 0:
+            raise UserError("'branches' must be a non-empty list of branches: each branch is a list of steps or an object with 'steps'")
+        return branches_def
+
+    def get_block_op(self, branch_index: int) -> Op:
+        # each branch is compiled once and reused on every run of this op
+        block_op = self._block_ops.get(branch_index)
+        if block_op is None:
+            branch_def = self.get_branches_def()[branch_index]
+            if isinstance(branch_def, list):
+                steps_def = branch_def
+                branch_title = None
+            else:
+                steps_def = branch_def.get('steps')
+                branch_title = branch_def.get('title')
+            block_op_def = {
+                "op": "block",
+                "op_name_alias": f"parallel_branch",
+                "steps": steps_def
+            }
+            if branch_title is not None:
+                block_op_def["title"] = branch_title
+            block_op = create_op(self.proj, block_op_def)
+            self._block_ops[branch_index] = block_op
+        return block_op
+
+    def get_child_blocks(self) -> List[Dict[str, List['Op']]]:
+        return [{f"branch_{i}": self.get_block_op(i).get_flow().steps} for i in range(len(self.get_branches_def()))]
+
+    def run(self, context: Context, op_options: Dict[str, Any]):
+        logger = logging.getLogger("sequor.ops.parallel")
+        # in "control statement" type of op we cannot render the whole op_def as it contains other ops
+        # for which context is not available yet -> we will render each parameter individually
+        logger.info(f"Starting \"{self.get_title()}\"")
+        branches_def = self.get_branches_def()
+        max_workers = Op.get_parameter(context, self.op_def, 'max_workers', is_required=False, render=3)
+        try:
+            max_workers = int(max_workers) if max_workers is not None else len(branches_def)
+        except (TypeError, ValueError):
+            raise UserError(f"'max_workers' must be a positive integer: {max_workers}")
+        if max_workers < 1:
+            raise UserError(f"'max_workers' must be a positive integer: {max_workers}")
+
+        def run_branch(branch_index):
+            # every branch has its own scope and its own position in the execution stack
+            branch_context = context.clone()
+            branch_context.set_flow_info("parallel", None)
+            branch_context.set_flow_step_info(branch_index, "branch")
+            context.job.run_op(branch_context, self.get_block_op(branch_index), None)
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sequor-parallel") as executor:
+            # branches run in a copy of the caller's contextvars (e.g. environment of the log stream)
+            futures = [executor.submit(contextvars.copy_context().run, run_branch, branch_index) for branch_index in range(len(branches_def))]
+            done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+            # after a failure branches that have not started yet are not started
+            for future in not_done:
+                future.cancel()
+        for future in futures:
+            if not future.cancelled() and future.exception() is not None:
+                raise future.exception()
+
+        context.add_to_log_op_finished(
+            logger, f"Finished \"" + self.get_title() + "\"")
@@ -24,7 +24,7 @@ class PrintOp(Op):
 
     def run(self, context, op_options: Dict[str, Any]):
         logger = logging.getLogger("sequor.ops.print")
-        self.op_def = render_jinja(context, self.op_def)
-        message = self.op_def.get('message')
+        op_def = render_jinja(context, self.op_def)
+        message = op_def.get('message')
         logger.info(f"Message: {message}")
         context.add_to_log_op_finished(logger, f"Finished")
\ No newline at end of file
@@ -26,11 +26,11 @@ class RunFlowOp(Op):
 
     def run(self, context: Context, op_options: Dict[str, Any]):
         logger = logging.getLogger("sequor.ops.run_flow")
-        self.op_def = render_jinja(context, self.op_def)
-        flow_name = self.op_def.get('flow')
+        op_def = render_jinja(context, self.op_def)
+        flow_name = op_def.get('flow')
         logger.info(f"Starting flow: {flow_name}")
 
-        start_step = self.op_def.get('start_step')
+        start_step = op_def.get('start_step')
         # Safely cast start_step to int with error handling
         try:
             start_step_int = int(start_step) if start_step is not None else 0
@@ -39,7 +39,7 @@ class RunFlowOp(Op):
         except (TypeError, ValueError) as e:
             raise ValueError(f"Invalid start_step value '{start_step}'. Must be a non-negative integer: {str(e)}")
         
-        parameters_def = self.op_def.get('parameters', {})
+        parameters_def = op_def.get('parameters', {})
         # Clone the context to avoid mutating the original context
         new_context = context.clone()
         # Load parameters into a new variable bindings
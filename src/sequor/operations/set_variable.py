@@ -22,7 +22,7 @@ class SetVariableOp(Op):
 
     def run(self, context, op_options: Dict[str, Any]):
         logger = logging.getLogger("sequor.ops.set_variable")
-        self.op_def = render_jinja(context, self.op_def)
+        op_def = render_jinja(context, self.op_def)
         # var_name = Op.get_parameter(context, self.op_def, 'name', is_required=True)
         # logger.info(f"Setting variable: {var_name}")
         # var_value = Op.get_parameter(context, self.op_def, 'value', is_required=True)
@@ -32,7 +32,7 @@ class SetVariableOp(Op):
         # set_variable(context, var_name, var_value, var_scope)
         # msg = f"Finished. Variable \"{var_name}\" set in scope \"{var_scope}\" to: {var_value}"
 
-        set_def = Op.get_parameter(context, self.op_def, 'set', is_required=True, render=0, location_desc="set_variable")
+        set_def = Op.get_parameter(context, op_def, 'set', is_required=True, render=0, location_desc="set_variable")
         vars_set = []
         for var_name, var_value in set_def.items():
             var_value_set, var_scope_set = set_variable_from_def(context, var_name, var_value)
@@ -23,13 +23,13 @@ class TransformOp(Op):
 
     def run(self, context, op_options: Dict[str, Any]):
         logger = logging.getLogger("sequor.ops.transform")
-        self.op_def = render_jinja(context, self.op_def)
+        op_def = render_jinja(context, self.op_def)
         logger.info(f"Starting \"{self.get_title()}\"")
-        source_name = self.op_def.get('source')
-        query = self.op_def.get('query')
-        target_database = self.op_def.get('target_database')
-        target_namespace = self.op_def.get('target_namespace')
-        target_table = self.op_def.get('target_table')
+        source_name = op_def.get('source')
+        query = op_def.get('query')
+        target_database = op_def.get('target_database')
+        target_namespace = op_def.get('target_namespace')
+        target_table = op_def.get('target_table')
         
         # Create TableAddress object from target_table string
         target_table_addr = TableAddress(source_name, target_database, target_namespace, target_table)
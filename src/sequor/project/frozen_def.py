@@ -0,0 +1,71 @@
+import copy
+from typing import Any
+
+from ruamel.yaml.comments import CommentedMap, CommentedSeq
+
+# Parsed YAML files are cached and shared by all ops and jobs (see Project._load_yaml_file()): they are frozen
+# so that a definition cannot be changed by mistake. Copies (copy.copy, copy.deepcopy, render_jinja) are mutable.
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError("Definitions loaded from project files are read-only: change a copy (e.g. the result of render_jinja)")
+
+
+class FrozenCommentedMap(CommentedMap):
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    pop = popitem = clear = update = setdefault = insert = move_to_end = merge = add_yaml_merge = update_key_value = _read_only
+
+    def __copy__(self):
+        result = CommentedMap()
+        for key, value in self._items():
+            result[key] = value
+        self.copy_attributes(result)
+        return result
+
+    copy = __copy__
+
+    def __deepcopy__(self, memo):
+        result = CommentedMap()
+        memo[id(self)] = result
+        for key in self:
+            result[key] = copy.deepcopy(self[key], memo)
+        self.copy_attributes(result, memo=memo)
+        return result
+
+
+class FrozenCommentedSeq(CommentedSeq):
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __copy__(self):
+        result = CommentedSeq()
+        list.extend(result, self)
+        self.copy_attributes(result)
+        return result
+
+    def __deepcopy__(self, memo):
+        result = CommentedSeq()
+        memo[id(self)] = result
+        for value in self:
+            result.append(copy.deepcopy(value, memo))
+        self.copy_attributes(result, memo=memo)
+        return result
+
+
+def freeze(node: Any) -> Any:
+    """Make a parsed YAML document read-only in place (the YAML metadata such as line numbers is kept)"""
+    if isinstance(node, CommentedMap):
+        for value in node.values():
+            freeze(value)
+        if type(node) is CommentedMap:
+            node.__class__ = FrozenCommentedMap
+    elif isinstance(node, CommentedSeq):
+        for value in node:
+            freeze(value)
+        if type(node) is CommentedSeq:
+            node.__class__ = FrozenCommentedSeq
+    return node
@@ -1,33 +1,25 @@
 from enum import Enum
 import os
 from pathlib import Path
-import tempfile
+import threading
 # import yaml
 from ruamel.yaml import YAML
 
 # from sequor.core.environment import Environment
 # from sequor.core.instance import Instance
+from sequor.common import telemetry
 from sequor.core.context import Context
 from sequor.core.registry import create_op, create_source
-from sequor.operations.block import BlockOp
-from sequor.operations.execute import ExecuteOp
-from sequor.operations.for_each import ForEachOp
-from sequor.operations.http_request import HTTPRequestOp
-from sequor.operations.if_op import IfOp
-from sequor.operations.print import PrintOp
-from sequor.operations.run_flow import RunFlowOp
-from sequor.operations.set_variable import SetVariableOp
-from sequor.operations.transform import TransformOp
-from sequor.source.sources.duckdb_source import DuckDBSource
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 from sequor.core.flow import Flow
 from sequor.core.op import Op
 from sequor.core.user_error import UserError
+from sequor.project.frozen_def import freeze
 from sequor.project.specification import Specification
+from sequor.project.variable_store import VariableStore
+from sequor.source.model_cache import ModelCache
 from sequor.source.source import Source
-from sequor.source.sources.http_source import HTTPSource
-from sequor.source.sources.sql_source import SQLSource
 
 class Project:
     def __init__(self, project_dir: Path, home_dir):  # instance: Instance, env: Environment,
@@ -53,9 +45,32 @@ class Project:
             if self.project_name is None:
                 raise UserError(f"Project configuration file does not contain 'name' field: {project_def_file}")
             # self.project_version = project_def.get('version')
+            # "yaml" (default) or "sqlite" for projects with many variables
+            variables_backend = project_def.get('variables_backend')
+            # "telemetry: false" turns off anonymous usage events for runs of this project
+            if project_def.get('telemetry') is False:
+                telemetry.disable()
+            # cron schedules of flows run by "sequor serve"
+            self.schedules_def = project_def.get('schedules') or []
      
         self.project_state_dir = self.home_dir / "project_state" / self.project_name
-        self.project_vars_file = os.path.join(self.project_state_dir, "variables.yaml")
+        self.variables_backend = variables_backend
+        self.variable_store = VariableStore.create(variables_backend, self.project_state_dir)
+        self._env_variable_stores: Dict[str, VariableStore] = {}
+
+        # parsed YAML files and flows built from them: see _load_yaml_file() and get_flow()
+        self._file_cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+        self._file_cache_lock = threading.Lock()
+        self._flow_cache: Dict[str, Tuple[Any, Flow]] = {} # guarded by _file_cache_lock
+
+        # reflected table models per (source, environment): see get_model_cache()
+        self._model_caches: Dict[Tuple[str, str], ModelCache] = {}
+        self._model_caches_lock = threading.Lock()
+
+        # SQLAlchemy engines (connection pools) and OAuth sessions (tokens) shared by all jobs: see get_engine()
+        self._engines: Dict[Any, Any] = {}
+        self._oauth_sessions: Dict[Any, Any] = {}
+        self._shared_lock = threading.Lock()
         
     def get_source(self, context: Context, source_name: str) -> Any:
         # Construct flow file path
@@ -67,11 +82,72 @@ class Project:
                 f"Source \"{source_name}\" not found: file does not exist: {source_file}")
 
         # Load and parse the flow
-        with open(source_file, 'r') as f:
-            source_def = self.yaml.load(f)
+        source_def = self._load_yaml_file(source_file)
+        source_cache = context.job.source_cache if context.job is not None else None
+        if source_cache is not None:
+            source = source_cache.get(context, source_name, source_def)
+            if source is not None:
+                return source
         source = create_source(context, source_name, source_def)
+        if source_cache is not None:
+            source_cache.put(source_name, source_def, source)
         return source
+
+    def _load_yaml_file(self, file_path: str) -> Any:
+        # Parsed files are cached until the file changes (mtime or size).
+        # Cached definitions are shared by all callers: they are frozen (see frozen_def.py).
+        file_stat = os.stat(file_path)
+        file_stamp = (file_stat.st_mtime_ns, file_stat.st_size)
+        with self._file_cache_lock: # also serializes self.yaml which is not thread-safe
+            cached = self._file_cache.get(file_path)
+            if cached is not None and cached[0] == file_stamp:
+                return cached[1]
+            with open(file_path, 'r') as f:
+                file_def = freeze(self.yaml.load(f))
+            self._file_cache[file_path] = (file_stamp, file_def)
+            return file_def
     
+    def get_model_cache(self, source_name: str, ttl: float = None, env_name: str = None) -> ModelCache:
+        # Model caches outlive Source objects (a new Source is created on every get_source() call).
+        # Kept per environment: jobs of different environments (sequor serve, run --envs) share the project
+        # and the same source can point to different databases in each of them.
+        model_cache_key = (source_name, env_name)
+        with self._model_caches_lock:
+            model_cache = self._model_caches.get(model_cache_key)
+            if model_cache is None:
+                model_cache = ModelCache(ttl)
+                self._model_caches[model_cache_key] = model_cache
+            else:
+                model_cache.ttl = ttl
+        return model_cache
+
+    def get_engine(self, conn_str: str, connect_args: Dict[str, Any]):
+        # One engine per connection target: its pool keeps connections open between connect() calls and jobs
+        engine_key = (conn_str, tuple(sorted(connect_args.items())))
+        with self._shared_lock:
+            engine = self._engines.get(engine_key)
+            if engine is None:
+                from sqlalchemy import create_engine
+                engine = create_engine(conn_str, connect_args=connect_args)
+                self._engines[engine_key] = engine
+        return engine
+
+    def get_oauth_session(self, session_key: Any, create_session):
+        # Tokens are fetched once per credentials and refreshed when expired instead of on every op run
+        with self._shared_lock:
+            oauth_session = self._oauth_sessions.get(session_key)
+            if oauth_session is None:
+                oauth_session = create_session()
+                self._oauth_sessions[session_key] = oauth_session
+        return oauth_session
+
+    def close(self):
+        with self._shared_lock:
+            for engine in self._engines.values():
+                engine.dispose()
+            self._engines = {}
+            self._oauth_sessions = {}
+
     # @classmethod
     # def create(cls, proj, op_def: Dict[str, Any]) -> 'Op':
 
@@ -89,10 +165,15 @@ class Project:
         
         # Load and parse the flow
         try:
-            with open(flow_file, 'r') as f:
-                flow_def = self.yaml.load(f)
+            flow_def = self._load_yaml_file(flow_file)
         except Exception as e:
             raise UserError(f"Error loading flow definition: {e}")
+
+        # Reuse the flow built from the same (cached) definition: ops do not keep state between runs
+        with self._file_cache_lock:
+            cached = self._flow_cache.get(flow_file)
+        if cached is not None and cached[0] is flow_def:
+            return cached[1]
         
         # Parse the flow definition into a Flow object
         description = flow_def.get('description', '')
@@ -102,8 +183,24 @@ class Project:
             op = create_op(self, op_def)
             flow.add_step(op)
 
+        with self._file_cache_lock:
+            # a flow built concurrently from the same definition is equivalent: the first one stored is kept
+            cached = self._flow_cache.get(flow_file)
+            if cached is not None and cached[0] is flow_def:
+                return cached[1]
+            self._flow_cache[flow_file] = (flow_def, flow)
         return flow
     
+    def get_flow_dependencies(self, flow_name: str) -> List[str]:
+        # "depends_on" of a flow file: flows that must succeed before this flow runs (see FlowDAG)
+        flow_file = os.path.join(self.flows_dir, f"{flow_name}.yaml")
+        if not os.path.exists(flow_file):
+            raise UserError(f"Flow \"{flow_name}\" not found: file does not exist: {flow_file}")
+        depends_on = self._load_yaml_file(flow_file).get('depends_on') or []
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        return [str(dependency) for dependency in depends_on]
+
     def build_flow_from_block_def(self, block_def: List[Dict[str, Any]]) -> Flow:
         flow = Flow("block", name = None, description = None)
         for op_def in block_def:
@@ -134,47 +231,35 @@ class Project:
             raise UserError(f"Specification \"{spec_name}\" not found: file does not exist: {spec_file}")
         
         # Load and parse the flow
-        with open(spec_file, 'r') as f:
-            spec_def = self.yaml.load(f)
+        spec_def = self._load_yaml_file(spec_file)
         
         return spec_def
     
-    def set_variable(self, var_name: str, var_value: Any):
-        # Read current data
-        try:
-            with open(self.project_vars_file, 'r') as f:
-                vars = self.yaml.load(f) or {}
-        except (FileNotFoundError):  
-            # Ensure the directory for the variables file exists. We will create the file later when we write the variable
-            project_vars_dir = os.path.dirname(self.project_vars_file)
-            os.makedirs(project_vars_dir, exist_ok=True)
-            vars = {}
-        
-        # Update variable
-        vars[var_name] = var_value
-        
-        # Write to temp file and replace
-        dir_path = os.path.dirname(self.project_vars_file)
-        fd, temp_path = tempfile.mkstemp(dir=dir_path or '.')
-        try:
-            with os.fdopen(fd, 'w') as f:
-                self.yaml.dump(vars, f)
-            os.replace(temp_path, self.project_vars_file)
-        except Exception:
-            # Clean up the temp file if something goes wrong
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-            raise
-    
-    def get_variable_value(self, var_name: str):
-        # Try to read the variables file
-        try:
-            with open(self.project_vars_file, 'r') as f:
-                vars = self.yaml.load(f) or {}
-                
-            # Return the variable value if it exists, otherwise return default_value
-            return vars.get(var_name) # None if the variable is not set
-        except FileNotFoundError:
-            # File doesn't exist, means that the variable is not set
-            return None
+    def get_project_state_dir(self, env: 'Environment' = None) -> Path:
+        if env is not None and env.isolated_state:
+            return self.project_state_dir / "envs" / env.env_name
+        return self.project_state_dir
+
+    def get_variable_store(self, env: 'Environment' = None) -> VariableStore:
+        if env is None or not env.isolated_state:
+            return self.variable_store
+        with self._shared_lock:
+            variable_store = self._env_variable_stores.get(env.env_name)
+            if variable_store is None:
+                variable_store = VariableStore.create(self.variables_backend, self.get_project_state_dir(env))
+                self._env_variable_stores[env.env_name] = variable_store
+        return variable_store
+
+    def set_variable(self, var_name: str, var_value: Any, env: 'Environment' = None):
+        # kept in memory until the next flush_variables()
+        self.get_variable_store(env).set(var_name, var_value)
     
+    def get_variable_value(self, var_name: str, env: 'Environment' = None):
+        return self.get_variable_store(env).get(var_name) # None if the variable is not set
+
+    def reload_variables(self, env: 'Environment' = None):
+        self.get_variable_store(env).reload()
+
+    def flush_variables(self, env: 'Environment' = None):
+        # commit point: persist variables changed since the last flush
+        self.get_variable_store(env).flush()
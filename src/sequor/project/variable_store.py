@@ -0,0 +1,136 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import Any, Dict
+
+from ruamel.yaml import YAML
+
+from sequor.core.user_error import UserError
+
+
+class YAMLVariableBackend:
+    """Project variables in variables.yaml of the project state directory"""
+    def __init__(self, vars_file: str):
+        self.vars_file = vars_file
+        self.yaml = YAML()
+        self.yaml.preserve_quotes = True
+        self._vars = None
+
+    def _read_file(self) -> Dict[str, Any]:
+        try:
+            with open(self.vars_file, 'r') as f:
+                return self.yaml.load(f) or {}
+        except FileNotFoundError:
+            # File doesn't exist, means that no variable is set
+            return {}
+
+    def load(self, var_name: str):
+        if self._vars is None:
+            self._vars = self._read_file()
+        return self._vars.get(var_name)
+
+    def reload(self):
+        self._vars = None
+
+    def save(self, changes: Dict[str, Any]):
+        # Re-read the file so that variables changed by other processes since we loaded it are preserved
+        vars = self._read_file()
+        vars.update(changes)
+
+        # Ensure the directory for the variables file exists
+        dir_path = os.path.dirname(self.vars_file)
+        os.makedirs(dir_path, exist_ok=True)
+
+        # Write to temp file and replace
+        fd, temp_path = tempfile.mkstemp(dir=dir_path or '.')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                self.yaml.dump(vars, f)
+            os.replace(temp_path, self.vars_file)
+        except Exception:
+            # Clean up the temp file if something goes wrong
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+
+class SQLiteVariableBackend:
+    """Project variables in a SQLite database: for projects with many variables, loads and writes only what is used"""
+    def __init__(self, vars_file: str):
+        self.vars_file = vars_file
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.vars_file), exist_ok=True)
+        conn = sqlite3.connect(self.vars_file)
+        conn.execute("CREATE TABLE IF NOT EXISTS variables (name TEXT PRIMARY KEY, value TEXT)")
+        return conn
+
+    def load(self, var_name: str):
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM variables WHERE name = ?", (var_name,)).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row is not None else None
+
+    def reload(self):
+        pass # nothing is cached: every load() reads the database
+
+    def save(self, changes: Dict[str, Any]):
+        conn = self._connect()
+        try:
+            with conn: # single transaction
+                conn.executemany("INSERT OR REPLACE INTO variables (name, value) VALUES (?, ?)",
+                                 [(name, json.dumps(value, default=str)) for name, value in changes.items()])
+        finally:
+            conn.close()
+
+
+class VariableStore:
+    """In-memory store of project variables.
+
+    Variables are read from the backend once per job (see reload()), changes are kept in memory and written back by flush()
+    at commit points (end of a job, commit of loaded data).
+    """
+    def __init__(self, backend):
+        self._backend = backend
+        self._values: Dict[str, Any] = {}
+        self._changes: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def create(cls, backend_name: str, project_state_dir: str) -> 'VariableStore':
+        if backend_name is None or backend_name == "yaml":
+            backend = YAMLVariableBackend(os.path.join(project_state_dir, "variables.yaml"))
+        elif backend_name == "sqlite":
+            backend = SQLiteVariableBackend(os.path.join(project_state_dir, "variables.sqlite"))
+        else:
+            raise UserError(f"Unknown variables backend: {backend_name}. Supported backends: yaml, sqlite")
+        return cls(backend)
+
+    def get(self, var_name: str):
+        with self._lock:
+            if var_name not in self._values:
+                self._values[var_name] = self._backend.load(var_name)
+            return self._values[var_name] # None if the variable is not set
+
+    def set(self, var_name: str, var_value: Any):
+        with self._lock:
+            self._values[var_name] = var_value
+            self._changes[var_name] = var_value
+
+    def reload(self):
+        # start of a job: values read before (e.g. by the previous job of "sequor serve") are read again from the backend
+        # to pick up changes made outside of this process; changes not flushed yet (a job running concurrently) are kept
+        with self._lock:
+            self._backend.reload()
+            self._values = dict(self._changes)
+
+    def flush(self):
+        with self._lock:
+            if not self._changes:
+                return
+            self._backend.save(self._changes)
+            self._changes = {}
@@ -3,9 +3,10 @@ from sequor.source.data_type import DataType
 
 class ColumnSchema:
     # do we need to add position: int
-    def __init__(self, name: str, type: DataType):
+    def __init__(self, name: str, type: DataType, path: str = None):
         self.name = name
         self.type = type
+        self.path = path # where the value is found in a JSON record (see json_path.py); None -> the key equal to name
 
     
     
@@ -0,0 +1,47 @@
+from typing import Any, Dict, Iterator, List
+
+# pyarrow and pandas are optional: objects are recognized by their type so that neither has to be imported
+
+
+def is_arrow_table(data: Any) -> bool:
+    return type(data).__module__.startswith("pyarrow") and hasattr(data, "to_batches")
+
+
+def is_pandas_dataframe(data: Any) -> bool:
+    return type(data).__module__.startswith("pandas") and hasattr(data, "iloc")
+
+
+def is_dataframe(data: Any) -> bool:
+    return is_arrow_table(data) or is_pandas_dataframe(data)
+
+
+def get_dataframe_column_names(data: Any) -> List[str]:
+    if is_arrow_table(data):
+        return list(data.column_names)
+    return [str(name) for name in data.columns]
+
+
+def iter_dataframe_column_batches(data: Any, column_names: List[str], batch_size: int) -> Iterator[Dict[str, list]]:
+    """Batches of a pyarrow Table or pandas DataFrame as {column: values}; columns missing in the data are left out"""
+    available_names = set(get_dataframe_column_names(data))
+    names = [name for name in column_names if name in available_names]
+    if is_arrow_table(data):
+        for batch in data.select(names).to_batches(max_chunksize=batch_size):
+            yield batch.to_pydict()
+    else:
+        for start in range(0, len(data), batch_size):
+            chunk = data.iloc[start:start + batch_size]
+            # None instead of NaN/NaT/NA for missing values
+            yield {name: chunk[name].astype(object).where(chunk[name].notna(), None).tolist() for name in names}
+
+
+def value_to_str(value: Any) -> Any:
+    # values are inserted as strings because they can be of any type returned by the source
+    return str(value) if value is not None else None
+
+
+def column_batch_to_tuples(columns: Dict[str, list], column_names: List[str]) -> List[tuple]:
+    """{column: values} -> one tuple of values per row (in the order of column_names) for executemany; columns that are not given are None"""
+    row_count = len(next(iter(columns.values()))) if columns else 0
+    values = [[value_to_str(value) for value in columns[name]] if name in columns else [None] * row_count for name in column_names]
+    return list(zip(*values))
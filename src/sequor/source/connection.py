@@ -1,9 +1,14 @@
-from typing import Union
+from typing import Any, Dict, List, Union
+from sequor.source.column import Column
+from sequor.source.columnar import column_batch_to_tuples, iter_dataframe_column_batches
 from sequor.source.data_type import DataType
+from sequor.source.file_records import iter_file_records
+from sequor.source.json_path import compile_path
 from sequor.source.model import Model
 from sequor.source.row import Row
 from sequor.source.source import Source
 from sequor.source.table_address import TableAddress
+from sequor.core.user_error import UserError
 
 class Connection:
     """Class representing a source connection"""
@@ -30,12 +35,43 @@ class Connection:
         raise NotImplementedError("Subclasses must implement open_table_for_insert()")
     def insert_row(self, row: Row):
         raise NotImplementedError("Subclasses must implement insert_record()")
+    def insert_rows(self, rows: List[tuple]):
+        # rows: values in the order of the model columns; SQL connections insert them with a single executemany
+        column_names = [c.name for c in self.model.columns]
+        for row_values in rows:
+            self.insert_row(Row.from_dict(dict(zip(column_names, row_values))))
+    def insert_dataframe(self, data: Any, batch_size: int = 1000):
+        # pyarrow Table or pandas DataFrame; sources that can scan them natively override this
+        column_names = [c.name for c in self.model.columns]
+        for columns in iter_dataframe_column_batches(data, column_names, batch_size):
+            self.insert_rows(column_batch_to_tuples(columns, column_names))
     def close_table_for_insert(self):
         raise NotImplementedError("Subclasses must implement close_table_for_insert()")
+    def commit(self):
+        raise NotImplementedError("Subclasses must implement commit()")
+    def rollback(self):
+        raise NotImplementedError("Subclasses must implement rollback()")
+    def bulk_load_file(self, file_path: str, file_format: str, compression: Union[str, None] = None, delimiter: str = ",", header: bool = True,
+                       records_path: Union[str, None] = None):
+        """Load a csv, ndjson or json file into the table opened for insert.
+
+        Sources with a native bulk loader override this; the default reads the file in Python and inserts row by row.
+        """
+        column_names = [c.name for c in self.model.columns]
+        extractors = [compile_path(c.path or c.name) for c in self.model.columns]
+        for record_def in iter_file_records(file_path, file_format, compression, delimiter, header, column_names, records_path):
+            if not isinstance(record_def, dict):
+                raise UserError(f"Records of the downloaded file must be objects. Type '{type(record_def).__name__}' found: {str(record_def)}")
+            record = Row()
+            for column_name, extractor in zip(column_names, extractors):
+                # csv records are flat: column paths apply to JSON
+                column_value = record_def.get(column_name) if file_format == "csv" else extractor(record_def)
+                record.add_column(Column(column_name, str(column_value) if column_value is not None else None))
+            self.insert_row(record)
     
-    def open_table_for_read(self, table_addr: TableAddress):
+    def open_table_for_read(self, table_addr: TableAddress, fetch_size: int = None):
         raise NotImplementedError("Subclasses must implement open_table_for_read()")
-    def open_query(self, table_addr: TableAddress, query: str):
+    def open_query(self, query: str, fetch_size: int = None):
         raise NotImplementedError("Subclasses must implement open_query()")
     def next_row(self):
         raise NotImplementedError("Subclasses must implement next_row()")
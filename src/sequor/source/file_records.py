@@ -0,0 +1,54 @@
+import csv
+import gzip
+from typing import Any, Dict, Iterator, List, Union
+
+from sequor.common import json_codec
+from sequor.core.user_error import UserError
+from sequor.source.json_path import get_records_at_path
+
+FILE_FORMATS = ["csv", "ndjson", "json"]
+FILE_COMPRESSIONS = ["none", "gzip"]
+
+
+def open_text_file(file_path: str, compression: Union[str, None]):
+    if compression == "gzip":
+        return gzip.open(file_path, "rt", encoding="utf-8", newline="")
+    return open(file_path, "r", encoding="utf-8", newline="")
+
+
+def iter_file_records(file_path: str, file_format: str, compression: Union[str, None] = None,
+                      delimiter: str = ",", header: bool = True, column_names: List[str] = None,
+                      records_path: Union[str, None] = None) -> Iterator[Dict[str, Any]]:
+    """Records of a csv, ndjson or json file as dicts.
+
+    Used by connections that have no native bulk loader. A csv file without header is mapped to column_names by position.
+    With records_path every JSON document (ndjson: every line) holds an array of records at that path.
+    """
+    with open_text_file(file_path, compression) as f:
+        if file_format == "csv":
+            if header:
+                yield from csv.DictReader(f, delimiter=delimiter)
+            else:
+                for values in csv.reader(f, delimiter=delimiter):
+                    yield dict(zip(column_names, values))
+        elif file_format == "ndjson":
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    document = json_codec.loads(line)
+                except ValueError as e:
+                    raise UserError(f"Cannot parse line {line_number} of downloaded ndjson file as JSON: {e}")
+                if records_path:
+                    yield from get_records_at_path(document, records_path)
+                else:
+                    yield document
+        elif file_format == "json":
+            # the whole document is parsed: use ndjson or a native loader for large files
+            try:
+                document = json_codec.loads(f.read())
+            except ValueError as e:
+                raise UserError(f"Cannot parse downloaded json file: {e}")
+            yield from get_records_at_path(document, records_path)
+        else:
+            raise UserError(f"Unsupported file format: {file_format}. Supported formats: {', '.join(FILE_FORMATS)}")
@@ -0,0 +1,77 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+from sequor.core.user_error import UserError
+
+# Paths are dot separated keys into parsed JSON, integers index arrays: "customer.email", "items.0.id".
+# They are compiled once into extractor functions and the compiled functions are cached.
+
+
+def parse_path(path: str) -> List[Union[str, int]]:
+    keys = []
+    for key in str(path).split("."):
+        if key == "":
+            raise UserError(f"Invalid path (empty key): {path}")
+        keys.append(int(key) if key.lstrip("-").isdigit() else key)
+    return keys
+
+
+@lru_cache(maxsize=1024)
+def compile_path(path: str) -> Callable[[Any], Any]:
+    """Function returning the value at path or None when any part of the path is missing"""
+    keys = parse_path(path)
+    if len(keys) == 1 and isinstance(keys[0], str):
+        key = keys[0]
+        return lambda value: value.get(key) if isinstance(value, dict) else None
+
+    def extract(value):
+        for key in keys:
+            if isinstance(key, int):
+                if not isinstance(value, list) or not -len(value) <= key < len(value):
+                    return None
+                value = value[key]
+            elif isinstance(value, dict):
+                value = value.get(key)
+            else:
+                return None
+            if value is None:
+                return None
+        return value
+    return extract
+
+
+@lru_cache(maxsize=256)
+def compile_columns_extractor(column_paths: Tuple[Tuple[str, str], ...]) -> Callable[[List[Any]], Dict[str, list]]:
+    """Function turning a list of records into columns {name: [values]} (no dict is built per record)"""
+    extractors = [(name, compile_path(path)) for name, path in column_paths]
+
+    def extract(records):
+        return {name: [extractor(record) for record in records] for name, extractor in extractors}
+    return extract
+
+
+def get_records_at_path(document: Any, records_path: Union[str, None]) -> List[Any]:
+    # records_path: path of the record array in a JSON document (e.g. "data.items")
+    records = document
+    if records_path:
+        records = compile_path(records_path)(document)
+        if records is None:
+            return []
+    if not isinstance(records, list):
+        raise UserError(f"Records at '{records_path or '$'}' must be an array of objects. Type '{type(records).__name__}' found")
+    return records
+
+
+def to_json_path(path: Union[str, None]) -> str:
+    """Path -> JSONPath understood by databases (e.g. DuckDB json_extract): customer.email -> $."customer"."email" """
+    json_path = "$"
+    if path:
+        for key in parse_path(path):
+            json_path += f"[{key}]" if isinstance(key, int) else '."' + key.replace('"', '\\"') + '"'
+    return json_path
+
+
+def extract_columns(document: Any, records_path: Union[str, None], columns: List['ColumnSchema']) -> Dict[str, list]:
+    """Columnar data of the records at records_path, every column taken from its path (or the key equal to its name)"""
+    records = get_records_at_path(document, records_path)
+    return compile_columns_extractor(tuple((c.name, c.path or c.name) for c in columns))(records)
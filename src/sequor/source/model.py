@@ -1,4 +1,5 @@
 from typing import Any, Dict, List
+from sequor.core.user_error import UserError
 from sequor.source.column_schema import ColumnSchema
 from sequor.source.data_type import DataType
 
@@ -20,8 +21,9 @@ class Model:
         columns_def_list = None
         if isinstance(columns_def, dict):
             # Convert compact object notation
+            # name: type or name: {type: ..., path: ...}
             columns_def_list = [
-                {"name": name, "type": type_def}
+                {"name": name, **type_def} if isinstance(type_def, dict) and ("type" in type_def or "path" in type_def) else {"name": name, "type": type_def}
                 for name, type_def in columns_def.items()
             ]
         else:
@@ -31,8 +33,10 @@ class Model:
         columns = []
         for col_def in columns_def_list:
             name = col_def.get("name")
+            if col_def.get("type") is None:
+                raise UserError(f"Column '{name}' has no type: {col_def}")
             type = DataType.from_column_def(col_def)
-            columns.append(ColumnSchema(name, type))
+            columns.append(ColumnSchema(name, type, col_def.get("path")))
 
         return Model.from_columns(columns)
     
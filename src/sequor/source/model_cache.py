@@ -0,0 +1,48 @@
+import threading
+import time
+from typing import Dict, Tuple, Union
+
+from sequor.source.model import Model
+from sequor.source.table_address import TableAddress
+
+
+class ModelCache:
+    """Catalog cache of reflected table models of a single source.
+
+    Entries are dropped when Sequor itself changes a table (see the DDL methods of SQLConnection)
+    and, if ttl is set, after ttl seconds to pick up schema changes made outside of Sequor.
+    """
+    def __init__(self, ttl: Union[float, None] = None):
+        self.ttl = ttl
+        self._models: Dict[Tuple[str, str, str], Tuple[Model, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(table_addr: TableAddress):
+        return (table_addr.database_name, table_addr.namespace_name, table_addr.table_name)
+
+    def get(self, table_addr: TableAddress) -> Union[Model, None]:
+        key = self._key(table_addr)
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                return None
+            model, loaded_at = entry
+            if self.ttl is not None and time.monotonic() - loaded_at > self.ttl:
+                del self._models[key]
+                return None
+            return model
+
+    def put(self, table_addr: TableAddress, model: Model):
+        with self._lock:
+            self._models[self._key(table_addr)] = (model, time.monotonic())
+
+    def invalidate(self, table_addr: TableAddress):
+        # drop the table under any namespace: callers do not always fill in the default namespace
+        with self._lock:
+            for key in [k for k in self._models if k[2] == table_addr.table_name]:
+                del self._models[key]
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
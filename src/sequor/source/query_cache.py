@@ -0,0 +1,83 @@
+from collections import OrderedDict
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple, Union
+
+from sequor.core.user_error import UserError
+
+
+class QueryCache:
+    """Job-scoped cache of query results and lookup indexes of a single source.
+
+    Entries expire after ttl seconds (if set) and the least recently used entries are dropped
+    when the estimated size of the cached values exceeds max_bytes.
+    Cached rows are shared by all callers and must not be modified.
+    """
+    default_max_bytes = 64 * 1024 * 1024
+
+    def __init__(self, ttl: Union[float, None] = None, max_bytes: Union[int, None] = None):
+        self.ttl = ttl
+        self.max_bytes = max_bytes or self.default_max_bytes
+        self._entries: 'OrderedDict[Any, Tuple[Any, float, int]]' = OrderedDict() # key -> (value, loaded_at, size)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_def(cls, query_cache_def: Any) -> 'QueryCache':
+        # "query_cache: true" or {ttl: <seconds>, max_mb: <megabytes>}
+        if query_cache_def is True:
+            return cls()
+        if not isinstance(query_cache_def, dict):
+            raise UserError(f"query_cache must be true or a dictionary with 'ttl' and 'max_mb': {query_cache_def}")
+        max_mb = query_cache_def.get('max_mb')
+        return cls(query_cache_def.get('ttl'), int(float(max_mb) * 1024 * 1024) if max_mb is not None else None)
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, loaded_at, size = entry
+            if self.ttl is not None and time.monotonic() - loaded_at > float(self.ttl):
+                del self._entries[key]
+                self._size -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Any, value: Any, size: int):
+        if size > self.max_bytes:
+            return # would evict everything else and still not fit
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[2]
+            self._entries[key] = (value, time.monotonic(), size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def get_or_load(self, key: Any, load: Callable[[], Tuple[Any, int]]) -> Any:
+        # load() returns (value, estimated size); concurrent misses of the same key may load it more than once
+        value = self.get(key)
+        if value is None:
+            value, size = load()
+            self.put(key, value, size)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+def estimate_rows_size(rows: list) -> int:
+    # rough estimate: the values and a fixed overhead per row and column (Row and Column objects)
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += 64
+        for column in row.columns:
+            size += 64 + sys.getsizeof(column.value)
+    return size
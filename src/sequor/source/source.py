@@ -1,22 +1,90 @@
-from typing import Any, Dict
+import json
+import threading
+from typing import Any, Dict, List, Tuple, Union
 
 from sequor.common.executor_utils import render_jinja
 from sequor.core.context import Context
+from sequor.core.user_error import UserError
+from sequor.source.model_cache import ModelCache
+from sequor.source.query_cache import QueryCache
 from sequor.source.table_address import TableAddress
 
 class Source:
+    # rendered definitions kept per source (e.g. one per for_each row when the definition references the row)
+    max_rendered_defs = 8
+
     def __init__(self, context: 'Context', name: str, source_def: Dict[str, Any]):
         self.context = context
         self.name = name 
         self.source_def = source_def
-        self.source_rendered_def = None
+        # rendered definitions memoized by the values of the variables they reference: [(referenced_vars, rendered_def)],
+        # least recently used first
+        self._rendered_defs: List[Tuple[Dict[str, Any], Any]] = []
+        self._rendered_defs_lock = threading.Lock() # cached sources are shared by parallel branches
+        # variables referenced by properties fixed at creation (see render_def_at_init()):
+        # a cached Source object is reused only while they keep their values
+        self.referenced_vars: Dict[str, Any] = {}
+
+    @staticmethod
+    def _vars_match(context: 'Context', referenced_vars: Dict[str, Any]) -> bool:
+        for var_name, var_value in referenced_vars.items():
+            if context.get_variable_value(var_name) != var_value:
+                return False
+        return True
+
+    def is_valid_in(self, context: 'Context') -> bool:
+        return self._vars_match(context, self.referenced_vars)
+
+    def _get_rendered_entry(self, context: 'Context') -> Tuple[Dict[str, Any], Any]:
+        with self._rendered_defs_lock:
+            for i, entry in enumerate(self._rendered_defs):
+                if self._vars_match(context, entry[0]):
+                    if i != len(self._rendered_defs) - 1:
+                        self._rendered_defs.append(self._rendered_defs.pop(i))
+                    return entry
+        referenced_vars = {}
+        rendered_def = render_jinja(context, self.source_def, referenced_vars=referenced_vars)
+        entry = (referenced_vars, rendered_def)
+        with self._rendered_defs_lock:
+            self._rendered_defs.append(entry)
+            # the least recently used variant is dropped
+            del self._rendered_defs[:-self.max_rendered_defs]
+        return entry
 
-    def get_rendered_def(self):
-        if self.source_rendered_def is None:
-            # if context is None:
-            #     context = Context.from_project(self.project)
-            self.source_rendered_def = render_jinja(self.context, self.source_def)
-        return self.source_rendered_def
+    def get_rendered_def(self, context: 'Context' = None):
+        # context differs from self.context when a cached source is used (e.g. extended with source variables in http_request)
+        if context is None:
+            context = self.context
+        return self._get_rendered_entry(context)[1]
+
+    def render_def_at_init(self):
+        # for sources that read their properties (e.g. connection string) once in __init__
+        self.referenced_vars, rendered_def = self._get_rendered_entry(self.context)
+        return rendered_def
+
+    def get_model_cache(self) -> ModelCache:
+        # optional "model_cache_ttl" (seconds) expires reflected models to pick up schema changes made outside of Sequor
+        model_cache_ttl = self.get_rendered_def().get('model_cache_ttl')
+        if model_cache_ttl is not None:
+            try:
+                model_cache_ttl = float(model_cache_ttl)
+            except (TypeError, ValueError):
+                raise UserError(f"'model_cache_ttl' of source '{self.name}' must be a non-negative number of seconds: {model_cache_ttl}")
+            if model_cache_ttl < 0:
+                raise UserError(f"'model_cache_ttl' of source '{self.name}' must be a non-negative number of seconds: {model_cache_ttl}")
+        return self.context.project.get_model_cache(self.name, model_cache_ttl, self.context.env.env_name)
+
+    def get_query_cache(self, required: bool = False) -> Union[QueryCache, None]:
+        # optional "query_cache" (true or {ttl: <seconds>, max_mb: <megabytes>}) keeps results of query()/table() in expressions
+        # for the rest of the job; required: a cache with default settings if the source has none (lookup indexes)
+        rendered_def = self.get_rendered_def()
+        query_cache_def = rendered_def.get('query_cache')
+        if self.context.job is None or (not query_cache_def and not required):
+            return None
+        # a definition that references variables (e.g. database: "{{ var('tenant_db') }}") may connect elsewhere for other values:
+        # results are cached per rendered definition
+        rendered_def_key = json.dumps(rendered_def, sort_keys=True, default=str)
+        return self.context.job.get_query_cache(self.name, rendered_def_key, query_cache_def or True)
 
     def connect(self):
         raise NotImplementedError("Subclasses must implement connect()")
@@ -30,6 +98,9 @@ class Source:
     def quote_name(self, name: str):
         raise NotImplementedError("Subclasses must implement quote_name()")
 
+    def get_partition_query(self, table_addr: TableAddress, partition_by: str, partition_count: int, partition_index: int) -> str:
+        raise NotImplementedError("Subclasses must implement get_partition_query()")
+
     @staticmethod
     def get_parameter(context, source_def: Dict[str, Any], name: str, is_required: bool = False, render: bool = False) -> Any:
         param_value = source_def.get(name)
@@ -0,0 +1,33 @@
+import threading
+from typing import Any, Dict, List, Tuple, Union
+
+from sequor.source.source import Source
+
+
+class SourceCache:
+    """Job-scoped cache of Source objects.
+
+    An entry is reused while its source file is unchanged (the parsed definition is the same object, see
+    Project._load_yaml_file()) and the variables referenced by its definition keep their values.
+    """
+    # distinct variable fingerprints kept per source
+    max_variants = 8
+
+    def __init__(self):
+        self._sources: Dict[str, List[Tuple[Any, Source]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, context: 'Context', source_name: str, source_def: Any) -> Union[Source, None]:
+        with self._lock:
+            entries = list(self._sources.get(source_name, []))
+        for entry_def, source in entries:
+            if entry_def is source_def and source.is_valid_in(context):
+                return source
+        return None
+
+    def put(self, source_name: str, source_def: Any, source: Source):
+        with self._lock:
+            # entries of a previous version of the source file are dropped
+            entries = [entry for entry in self._sources.get(source_name, []) if entry[0] is source_def]
+            entries.append((source_def, source))
+            self._sources[source_name] = entries[-self.max_variants:]
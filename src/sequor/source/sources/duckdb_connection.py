@@ -1,8 +1,10 @@
-from typing import Union
-from sqlalchemy import MetaData, Table, create_engine, text
+from typing import Any, Dict, List, Union
+from sqlalchemy import MetaData, Table, text
 
 from sequor.source.column import Column
 from sequor.source.column_schema import ColumnSchema
+from sequor.source.columnar import get_dataframe_column_names
+from sequor.source.json_path import to_json_path
 from sequor.source.data_type import DataType
 from sequor.source.model import Model
 from sequor.source.row import Row
@@ -13,15 +15,10 @@ from sequor.source.table_address import TableAddress
 
 class DuckDBConnection(SQLConnection):
     def __init__(self, source: Source):
-        super().__init__(source)
-        self.open()
+        super().__init__(source) # opens the connection
 
     def open(self):
-        self.engine = create_engine(
-            self.source.connStr,
-            connect_args={
-            }
-        )
+        self.engine = self.source.context.project.get_engine(self.source.connStr, {})
         self.conn = self.engine.connect()
 
     def close(self):
@@ -29,32 +26,27 @@ class DuckDBConnection(SQLConnection):
             self.conn.close()
 
     def __enter__(self):
-        self.open()
+        # the connection is opened by __init__
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
-    def get_model(self, table_addr: TableAddress):
-        metadata = MetaData()
-        if table_addr.namespace_name is None:
-            users_table = Table(table_addr.table_name, metadata, autoload_with=self.engine)
-        else:
-            users_table = Table(table_addr.table_name, metadata, schema=table_addr.namespace_name, autoload_with=self.engine)
-        column_schemas = [ColumnSchema(c.name, DataType(c.type)) for c in users_table.columns]
-        return Model.from_columns(column_schemas)
-
     def drop_table(self, table_addr: TableAddress, only_if_exists: bool = True):
+        self.source.get_model_cache().invalidate(table_addr)
         table_qualified_name = self.source.get_qualified_name(table_addr)
         self.conn.execute(text(f"DROP TABLE {'IF EXISTS' if only_if_exists else ''} {table_qualified_name}"))
     
     def create_table(self, table_addr: TableAddress, model: Model):
+        self.source.get_model_cache().invalidate(table_addr)
         table_qualified_name = self.source.get_qualified_name(table_addr)
         self.conn.execute(text(f"CREATE TABLE {table_qualified_name} ({', '.join([c.name + ' ' + c.type.name for c in model.columns])})"))
     
     def execute_update(self, query: str):
         self.conn.execute(text(query))
         self.conn.commit()
+        # arbitrary statements (e.g. in execute op) can change any table
+        self.source.get_model_cache().clear()
 
     def open_table_for_insert(self, table_addr: TableAddress, model: Union[Model, None] = None, autocommit: bool = False):
         self.open_table_for_insert_table_addr = table_addr
@@ -70,6 +62,7 @@ class DuckDBConnection(SQLConnection):
         sql = f"INSERT INTO {table_qualified_name}(" + ", ".join(columns_sql) + ") VALUES (" + ", ".join(placeholders_sql) + ")"
         
         self.open_table_for_insert_stmt = text(sql);
+        self.open_table_for_insert_driver_sql = self._get_positional_insert_sql(table_qualified_name, columns_sql)
         self.conn.autocommit = autocommit
         self.open_table_for_insert_autocommit = autocommit
 
@@ -77,21 +70,86 @@ class DuckDBConnection(SQLConnection):
         row_dict = row.to_dict()
         self.conn.execute(self.open_table_for_insert_stmt, row_dict )
 
+    def insert_dataframe(self, data: Any, batch_size: int = 1000):
+        # DuckDB scans pyarrow tables and pandas data frames directly: no Python object per value
+        column_names = [c.name for c in self.open_table_for_insert_model.columns]
+        available_names = set(get_dataframe_column_names(data))
+        columns_sql = ", ".join([self.source.quote_name(name) for name in column_names])
+        values_sql = ", ".join([self.source.quote_name(name) if name in available_names else "NULL" for name in column_names])
+        table_qualified_name = self.source.get_qualified_name(self.open_table_for_insert_table_addr)
+        view_name = f"sequor_insert_{id(data)}"
+        # the scan runs on the DBAPI connection: make sure it is part of the transaction committed by close_table_for_insert()
+        if not self.conn.in_transaction():
+            self.conn.begin()
+        dbapi_conn = self.conn.connection.dbapi_connection
+        dbapi_conn.register(view_name, data)
+        try:
+            self.conn.exec_driver_sql(f"INSERT INTO {table_qualified_name} ({columns_sql}) SELECT {values_sql} FROM {view_name}")
+        finally:
+            dbapi_conn.unregister(view_name)
+
     def close_table_for_insert(self):
         if not self.open_table_for_insert_autocommit:
             self.conn.commit()
         self.open_table_for_insert_stmt = None
+        self.open_table_for_insert_driver_sql = None
         self.open_table_for_insert_model = None
         self.open_table_for_insert_table_addr = None
 
-    def open_table_for_read(self, table_addr: TableAddress):
+    def bulk_load_file(self, file_path: str, file_format: str, compression: Union[str, None] = None, delimiter: str = ",", header: bool = True,
+                       records_path: Union[str, None] = None):
+        # DuckDB reads the file natively; file columns are matched to the table columns by name
+        # (csv without header: by position)
+        column_names = [c.name for c in self.open_table_for_insert_model.columns]
+        columns_sql = ", ".join([self.source.quote_name(name) for name in column_names])
+        table_qualified_name = self.source.get_qualified_name(self.open_table_for_insert_table_addr)
+        path_sql = self._quote_literal(file_path)
+        if file_format == "csv":
+            reader_sql = f"read_csv({path_sql}, header={'true' if header else 'false'}, delim={self._quote_literal(delimiter)}, all_varchar=true, compression='{compression or 'none'}'"
+            if not header:
+                reader_sql += ", names=[" + ", ".join([self._quote_literal(name) for name in column_names]) + "]"
+            reader_sql += ")"
+            select_sql = f"SELECT {columns_sql} FROM {reader_sql}"
+        elif file_format in ("ndjson", "json"):
+            compression_sql = f"compression='{'gzip' if compression == 'gzip' else 'uncompressed'}'"
+            column_paths = [c.path for c in self.open_table_for_insert_model.columns]
+            if records_path or any(column_paths):
+                # records are extracted by DuckDB's JSON reader (the record array at records_path is unnested from every
+                # document) and the declared columns are taken from their paths (nested values are kept as JSON text)
+                if records_path:
+                    documents_format = "newline_delimited" if file_format == "ndjson" else "unstructured"
+                    records_sql = f"SELECT unnest(CAST(json_extract(json, {self._quote_literal(to_json_path(records_path))}) AS JSON[])) AS record"
+                else:
+                    documents_format = "newline_delimited" if file_format == "ndjson" else "array"
+                    records_sql = "SELECT json AS record"
+                records_sql += f" FROM read_json_objects({path_sql}, format='{documents_format}', {compression_sql})"
+                values_sql = ", ".join(["json_extract_string(record, " + self._quote_literal(to_json_path(c.path or c.name)) + ")"
+                                        for c in self.open_table_for_insert_model.columns])
+                select_sql = f"SELECT {values_sql} FROM ({records_sql})"
+            else:
+                json_format = "newline_delimited" if file_format == "ndjson" else "array"
+                select_sql = f"SELECT {columns_sql} FROM read_json({path_sql}, format='{json_format}', {compression_sql})"
+        else:
+            return super().bulk_load_file(file_path, file_format, compression, delimiter, header, records_path)
+        # exec_driver_sql: the statement has no bind parameters (a ':' in the path must not be taken for one)
+        self.conn.exec_driver_sql(f"INSERT INTO {table_qualified_name} ({columns_sql}) {select_sql}")
+
+    @staticmethod
+    def _quote_literal(value: str) -> str:
+        return "'" + value.replace("'", "''") + "'"
+
+    def open_table_for_read(self, table_addr: TableAddress, fetch_size: int = None):
         query = f"SELECT * FROM {self.source.get_qualified_name(table_addr)}"
-        self.open_query(query)
+        self.open_query(query, fetch_size)
 
  
-    def open_query(self, query_str: str):
+    def open_query(self, query_str: str, fetch_size: int = None):
         query = text(query_str)
-        self.conn.execution_options(stream_results=True)
+        if fetch_size:
+            # rows are fetched in batches of fetch_size (server-side cursor where the driver supports it)
+            self.conn.execution_options(yield_per=fetch_size)
+        else:
+            self.conn.execution_options(stream_results=True)
         self.open_table_for_read_result = self.conn.execute(query)
         # to get precision and scale use:
         # for col in self.open_table_for_read_result.cursor.description
@@ -11,7 +11,7 @@ class DuckDBSource(SQLSource):
     """Class representing a SQL data source"""
     def __init__(self, context: 'Context', name: str,  source_def: Dict[str, Any]):
         super().__init__(context, name, source_def)
-        source_rendered_def = self.get_rendered_def()
+        source_rendered_def = self.render_def_at_init()
         self.connStr = source_rendered_def.get('conn_str')
     
     def connect(self):
@@ -23,6 +23,9 @@ class DuckDBSource(SQLSource):
     def get_qualified_name(self, table_addr: TableAddress):
         return f"{table_addr.namespace_name}.{table_addr.table_name}" if table_addr.namespace_name else table_addr.table_name
 
+    def get_partition_query(self, table_addr: TableAddress, partition_by: str, partition_count: int, partition_index: int) -> str:
+        return f"SELECT * FROM {self.get_qualified_name(table_addr)} WHERE hash({self.quote_name(partition_by)}) % {partition_count} = {partition_index}"
+
     def get_create_table_sql(self, query: str, table_addr: TableAddress) -> str:
         target_table_qualified = self.get_qualified_name(table_addr)
         query = f"CREATE TABLE {target_table_qualified} AS {query}"
@@ -1,5 +1,6 @@
-from typing import Union
-from sqlalchemy import MetaData, Table, create_engine, text
+import gzip
+from typing import Any, Dict, List, Union
+from sqlalchemy import MetaData, Table, text
 
 from sequor.source.column import Column
 from sequor.source.column_schema import ColumnSchema
@@ -10,15 +11,17 @@ from sequor.source.source import Source
 from sequor.source.connection import Connection
 from sequor.source.table_address import TableAddress
 
+COPY_CHUNK_SIZE = 1024 * 1024
+
 class SQLConnection(Connection):
     def __init__(self, source: Source):
         super().__init__(source)
         self.open()
 
     def open(self):
-        self.engine = create_engine(
+        self.engine = self.source.context.project.get_engine(
             self.source.connStr,
-            connect_args={
+            {
                 'user': self.source.username,
                 'password': self.source.password
             },
@@ -30,13 +33,22 @@ class SQLConnection(Connection):
             self.conn.close()
 
     def __enter__(self):
-        self.open()
+        # the connection is opened by __init__
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
     def get_model(self, table_addr: TableAddress):
+        # reflection is slow (hundreds of ms on Postgres with many schemas) -> serve it from the source catalog cache
+        model_cache = self.source.get_model_cache()
+        model = model_cache.get(table_addr)
+        if model is None:
+            model = self._reflect_model(table_addr)
+            model_cache.put(table_addr, model)
+        return model
+
+    def _reflect_model(self, table_addr: TableAddress):
         metadata = MetaData()
         if table_addr.namespace_name is None:
             users_table = Table(table_addr.table_name, metadata, autoload_with=self.engine)
@@ -46,25 +58,31 @@ class SQLConnection(Connection):
         return Model.from_columns(column_schemas)
 
     def drop_table(self, table_addr: TableAddress, only_if_exists: bool = True):
+        self.source.get_model_cache().invalidate(table_addr)
         table_qualified_name = self.source.get_qualified_name(table_addr)
         self.conn.execute(text(f"DROP TABLE {'IF EXISTS' if only_if_exists else ''} {table_qualified_name}"))
     
     def create_table(self, table_addr: TableAddress, model: Model):
+        self.source.get_model_cache().invalidate(table_addr)
         table_qualified_name = self.source.get_qualified_name(table_addr)
         query = f"CREATE TABLE {table_qualified_name} ({', '.join([self.source.quote_name(c.name) + ' ' + c.type.name for c in model.columns])})"
         self.conn.execute(text(query))
     
     def add_column(self, table_addr: TableAddress, column_name: str, column_type: DataType):
+        self.source.get_model_cache().invalidate(table_addr)
         table_qualified_name = self.source.get_qualified_name(table_addr)
         self.conn.execute(text(f"ALTER TABLE {table_qualified_name} ADD COLUMN {column_name} {column_type.name}"))
 
     def drop_column(self, table_addr: TableAddress, column_name: str):
+        self.source.get_model_cache().invalidate(table_addr)
         table_qualified_name = self.source.get_qualified_name(table_addr)
         self.conn.execute(text(f"ALTER TABLE {table_qualified_name} DROP COLUMN {column_name}"))
 
     def execute_update(self, query: str):
         self.conn.execute(text(query))
         self.conn.commit()
+        # arbitrary statements (e.g. in execute op) can change any table
+        self.source.get_model_cache().clear()
 
     def open_table_for_insert(self, table_addr: TableAddress, model: Union[Model, None] = None, autocommit: bool = False):
         self.open_table_for_insert_table_addr = table_addr
@@ -80,28 +98,102 @@ class SQLConnection(Connection):
         sql = f"INSERT INTO {table_qualified_name}(" + ", ".join(columns_sql) + ") VALUES (" + ", ".join(placeholders_sql) + ")"
         
         self.open_table_for_insert_stmt = text(sql);
+        self.open_table_for_insert_driver_sql = self._get_positional_insert_sql(table_qualified_name, columns_sql)
         self.conn.autocommit = autocommit
         self.open_table_for_insert_autocommit = autocommit
 
+    def _get_positional_insert_sql(self, table_qualified_name: str, columns_sql: List[str]) -> Union[str, None]:
+        # INSERT with the placeholders of the driver for executemany with value tuples (see insert_rows());
+        # None if the driver only takes named parameters
+        paramstyle = self.engine.dialect.paramstyle
+        count = len(columns_sql)
+        if paramstyle == "qmark":
+            placeholders_sql = ["?"] * count
+        elif paramstyle in ("format", "pyformat"):
+            placeholders_sql = ["%s"] * count
+        elif paramstyle == "numeric":
+            placeholders_sql = [f":{i}" for i in range(1, count + 1)]
+        elif paramstyle == "numeric_dollar":
+            placeholders_sql = [f"${i}" for i in range(1, count + 1)]
+        else:
+            return None
+        into_sql = f"INSERT INTO {table_qualified_name}(" + ", ".join(columns_sql) + ")"
+        if paramstyle in ("format", "pyformat"):
+            into_sql = into_sql.replace("%", "%%")
+        return into_sql + " VALUES (" + ", ".join(placeholders_sql) + ")"
+
     def insert_row(self, row: Row):
         row_dict = row.to_dict()
         self.conn.execute(self.open_table_for_insert_stmt, row_dict )
 
+    def insert_rows(self, rows: List[tuple]):
+        if not rows:
+            return
+        if self.open_table_for_insert_driver_sql is not None:
+            # the tuples go to the executemany of the driver as they are: no parameter dict per row
+            self.conn.exec_driver_sql(self.open_table_for_insert_driver_sql, rows)
+        else:
+            column_names = [c.name for c in self.open_table_for_insert_model.columns]
+            self.conn.execute(self.open_table_for_insert_stmt, [dict(zip(column_names, row)) for row in rows])
+
     def close_table_for_insert(self):
         if not self.open_table_for_insert_autocommit:
             self.conn.commit()
         self.open_table_for_insert_stmt = None
+        self.open_table_for_insert_driver_sql = None
         self.open_table_for_insert_model = None
         self.open_table_for_insert_table_addr = None
 
-    def open_table_for_read(self, table_addr: TableAddress):
+    def commit(self):
+        # the next statement starts a new transaction (the table stays open for insert)
+        self.conn.commit()
+
+    def rollback(self):
+        # also makes the connection usable again after a failed statement (e.g. an aborted Postgres transaction)
+        self.conn.rollback()
+
+    def bulk_load_file(self, file_path: str, file_format: str, compression: Union[str, None] = None, delimiter: str = ",", header: bool = True,
+                       records_path: Union[str, None] = None):
+        # Postgres loads csv with COPY (file columns are matched to the table columns by position);
+        # other formats and databases go through the row by row loader
+        if file_format != "csv" or self.engine.dialect.name != "postgresql":
+            return super().bulk_load_file(file_path, file_format, compression, delimiter, header, records_path)
+        table_qualified_name = self.source.get_qualified_name(self.open_table_for_insert_table_addr)
+        columns_sql = ", ".join([self.source.quote_name(c.name) for c in self.open_table_for_insert_model.columns])
+        delimiter_sql = delimiter.replace("'", "''")
+        copy_sql = f"COPY {table_qualified_name} ({columns_sql}) FROM STDIN WITH (FORMAT csv, HEADER {'true' if header else 'false'}, DELIMITER '{delimiter_sql}')"
+        # COPY runs on the DBAPI connection: make sure it is part of the transaction committed by close_table_for_insert()
+        if not self.conn.in_transaction():
+            self.conn.begin()
+        cursor = self.conn.connection.dbapi_connection.cursor()
+        try:
+            with (gzip.open(file_path, "rb") if compression == "gzip" else open(file_path, "rb")) as f:
+                if hasattr(cursor, "copy_expert"):
+                    # psycopg2
+                    cursor.copy_expert(copy_sql, f)
+                else:
+                    # psycopg 3
+                    with cursor.copy(copy_sql) as copy:
+                        while True:
+                            data = f.read(COPY_CHUNK_SIZE)
+                            if not data:
+                                break
+                            copy.write(data)
+        finally:
+            cursor.close()
+
+    def open_table_for_read(self, table_addr: TableAddress, fetch_size: int = None):
         query = f"SELECT * FROM {self.source.get_qualified_name(table_addr)}"
-        self.open_query(query)
+        self.open_query(query, fetch_size)
 
  
-    def open_query(self, query_str: str):
+    def open_query(self, query_str: str, fetch_size: int = None):
         query = text(query_str)
-        self.conn.execution_options(stream_results=True)
+        if fetch_size:
+            # rows are fetched in batches of fetch_size (server-side cursor where the driver supports it)
+            self.conn.execution_options(yield_per=fetch_size)
+        else:
+            self.conn.execution_options(stream_results=True)
         self.open_table_for_read_result = self.conn.execute(query)
         # to get precision and scale use:
         # for col in self.open_table_for_read_result.cursor.description
@@ -9,7 +9,7 @@ class SQLSource(Source):
     """Class representing a SQL data source"""
     def __init__(self, context: 'Context', name: str,  source_def: Dict[str, Any]):
         super().__init__(context, name, source_def)
-        source_rendered_def = self.get_rendered_def()
+        source_rendered_def = self.render_def_at_init()
         self.username = source_rendered_def.get('username')
         self.password = source_rendered_def.get('password')
         self.connStr = source_rendered_def.get('conn_str')
@@ -26,6 +26,11 @@ class SQLSource(Source):
     def quote_name(self, name: str):
         return f'"{name}"'
 
+    def get_partition_query(self, table_addr: TableAddress, partition_by: str, partition_count: int, partition_index: int) -> str:
+        # hash partitioning: rows with NULL key must also fall into exactly one partition
+        key_sql = f"COALESCE(CAST({self.quote_name(partition_by)} AS text), '')"
+        return f"SELECT * FROM {self.get_qualified_name(table_addr)} WHERE abs(hashtext({key_sql})::bigint) % {partition_count} = {partition_index}"
+
     def get_create_table_sql(self, query: str, table_addr: TableAddress) -> str:
         target_table_qualified = self.get_qualified_name(table_addr)
         query = f"CREATE TABLE {target_table_qualified} AS {query}"
@@ -0,0 +1,58 @@
+from pathlib import Path
+import textwrap
+
+import pytest
+
+
+class ProjectFixture:
+    """A project in a temporary directory with a DuckDB source "db"; flows are added as YAML text and run as jobs"""
+    def __init__(self, tmp_path: Path):
+        self.home_dir = tmp_path / "home"
+        self.project_dir = tmp_path / "project"
+        self.db_path = tmp_path / "test.duckdb"
+        for dir_path in [self.home_dir / "envs", self.project_dir / "flows", self.project_dir / "sources"]:
+            dir_path.mkdir(parents=True)
+        (self.home_dir / "envs" / "dev.yaml").write_text("variables: {}\n")
+        (self.project_dir / "project.yaml").write_text("name: test\ntelemetry: false\n")
+        self.add_source("db", f"type: duckdb\nconn_str: \"duckdb:///{self.db_path}\"\n")
+        self._project = None
+
+    @property
+    def project(self):
+        if self._project is None:
+            from sequor.project.project import Project
+            self._project = Project(self.project_dir, self.home_dir)
+        return self._project
+
+    def add_source(self, name: str, source_yaml: str):
+        (self.project_dir / "sources" / f"{name}.yaml").write_text(textwrap.dedent(source_yaml))
+
+    def add_flow(self, name: str, flow_yaml: str):
+        (self.project_dir / "flows" / f"{name}.yaml").write_text(textwrap.dedent(flow_yaml))
+
+    def run(self, flow_name: str) -> dict:
+        from sequor.core.environment import Environment
+        from sequor.core.job import Job
+        env = Environment("dev", self.home_dir)
+        env.load()
+        return Job.for_flow(env, self.project, flow_name, {}).run({})
+
+    def query(self, sql: str) -> list:
+        # through the engine of the project: DuckDB does not open a file twice with different settings
+        from sqlalchemy import text
+        with self.project.get_engine(f"duckdb:///{self.db_path}", {}).connect() as conn:
+            result = conn.execute(text(sql))
+            rows = result.fetchall() if result.returns_rows else []
+            conn.commit()
+        return rows
+
+    def close(self):
+        if self._project is not None:
+            self._project.close()
+
+
+@pytest.fixture
+def project_fixture(tmp_path):
+    project_fixture = ProjectFixture(tmp_path)
+    yield project_fixture
+    project_fixture.close()
@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import pytest
+
+from sequor.common.cron import CronSchedule
+from sequor.core.user_error import UserError
+
+
+def test_ranges_lists_and_steps():
+    schedule = CronSchedule("0-10/5,30 9-17/4 1,15 * *")
+    assert schedule.minutes == {0, 5, 10, 30}
+    assert schedule.hours == {9, 13, 17}
+    assert schedule.days == {1, 15}
+    assert schedule.months == set(range(1, 13))
+
+
+def test_step_from_a_single_value_runs_to_the_end_of_the_range():
+    assert CronSchedule("50/5 * * * *").minutes == {50, 55}
+
+
+def test_aliases():
+    assert CronSchedule("@hourly").minutes == {0}
+    assert CronSchedule("@daily").hours == {0}
+
+
+def test_next_after():
+    schedule = CronSchedule("*/15 * * * *")
+    assert schedule.next_after(datetime(2024, 3, 1, 10, 0, 30)) == datetime(2024, 3, 1, 10, 15)
+    assert schedule.next_after(datetime(2024, 3, 1, 23, 50)) == datetime(2024, 3, 2, 0, 0)
+
+
+def test_day_of_week():
+    # 2024-03-01 is a Friday; 0 and 7 are both Sunday
+    assert CronSchedule("0 8 * * 1-5").next_after(datetime(2024, 3, 1, 9, 0)) == datetime(2024, 3, 4, 8, 0)
+    assert CronSchedule("0 8 * * 7").next_after(datetime(2024, 3, 1, 9, 0)) == datetime(2024, 3, 3, 8, 0)
+    assert CronSchedule("0 8 * * 0").weekdays == {0}
+
+
+def test_day_of_month_or_day_of_week():
+    # both restricted: either of them matches (the 10th or a Sunday)
+    schedule = CronSchedule("0 0 10 * 0")
+    assert schedule.next_after(datetime(2024, 3, 1)) == datetime(2024, 3, 3)
+    assert schedule.next_after(datetime(2024, 3, 9, 12)) == datetime(2024, 3, 10)
+    assert schedule.matches(datetime(2024, 3, 10)) and schedule.matches(datetime(2024, 3, 17))
+    assert not schedule.matches(datetime(2024, 3, 11))
+
+
+def test_leap_day():
+    assert CronSchedule("0 0 29 2 *").next_after(datetime(2024, 3, 1)) == datetime(2028, 2, 29)
+
+
+@pytest.mark.parametrize("expression", [
+    "* * * *", "* * * * * *", "60 * * * *", "* 24 * * *", "* * 0 * *", "* * * 13 *", "* * * * 8",
+    "5-1 * * * *", "*/0 * * * *", "a * * * *", "1-x * * * *", "*/x * * * *", "",
+])
+def test_invalid_expressions(expression):
+    with pytest.raises(UserError):
+        CronSchedule(expression)
+
+
+def test_expression_that_never_matches():
+    with pytest.raises(UserError, match="never matches"):
+        CronSchedule("0 0 31 2 *").next_after(datetime(2024, 1, 1))
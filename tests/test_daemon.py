@@ -0,0 +1,89 @@
+from http.server import ThreadingHTTPServer
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from sequor.core.daemon import Daemon, _make_request_handler
+
+
+class ProjectStub:
+    def __init__(self, flows_dir):
+        self.flows_dir = str(flows_dir)
+
+
+class DaemonStub:
+    default_env_name = None
+
+    def __init__(self, tmp_path):
+        # flows and environments next to other YAML files that requests must not reach
+        self.home_dir = tmp_path / "home"
+        self.project = ProjectStub(tmp_path / "project" / "flows")
+        (self.home_dir / "envs").mkdir(parents=True)
+        (tmp_path / "project" / "flows").mkdir(parents=True)
+        (self.home_dir / "envs" / "dev.yaml").write_text("variables: {}\n")
+        (tmp_path / "project" / "flows" / "load.yaml").write_text("steps: []\n")
+        (tmp_path / "outside.yaml").write_text("steps: []\n")
+        self.submitted = []
+
+    def submit(self, flow_name, env_name, trigger):
+        self.submitted.append((flow_name, env_name))
+        return {"id": "1", "flow": flow_name, "env": env_name, "status": "queued"}
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    return DaemonStub(tmp_path)
+
+
+@pytest.fixture
+def server_url(daemon):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_request_handler(daemon))
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def post(url, body: bytes):
+    request = urllib.request.Request(url + "/run", data=body, method="POST")
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.mark.parametrize("body", [
+    b"[]", b'"x"', b"1", b"null", b"{", b'{"env": "dev"}', b'{"flow": "missing"}', b'{"flow": 1}',
+    # flows and environments outside of their directories
+    b'{"flow": "../../outside"}', b'{"flow": "../flows/../../outside"}', b'{"flow": "load", "env": "../../../outside"}',
+    # environments that are not strings or do not exist
+    b'{"flow": "load", "env": 1}', b'{"flow": "load", "env": ["dev"]}', b'{"flow": "load", "env": "missing"}',
+])
+def test_invalid_run_request_is_rejected(server_url, daemon, body):
+    status, response = post(server_url, body)
+    assert status == 400
+    assert "error" in response
+    assert daemon.submitted == []
+
+
+def test_run_request_is_submitted(server_url, daemon):
+    status, response = post(server_url, b'{"flow": "load", "env": "dev"}')
+    assert status == 202
+    assert daemon.submitted == [("load", "dev")]
+
+
+def test_get_env_rejects_paths_outside_envs_dir(tmp_path):
+    from sequor.core.user_error import UserError
+    daemon = Daemon.__new__(Daemon)
+    daemon.home_dir = DaemonStub(tmp_path).home_dir
+    daemon._envs = {}
+    daemon._envs_lock = threading.Lock()
+    assert daemon.get_env("dev").env_name == "dev"
+    for env_name in ["../../outside", "missing", 1]:
+        with pytest.raises(UserError):
+            daemon.get_env(env_name)
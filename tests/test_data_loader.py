@@ -0,0 +1,116 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from sequor.common.data_loader import DataLoader
+from sequor.source.columnar import column_batch_to_tuples
+from sequor.source.model_cache import ModelCache
+from sequor.source.sources.duckdb_source import DuckDBSource
+from sequor.source.table_address import TableAddress
+
+MODEL_DEF = {"columns": [{"name": "id", "type": "integer"}]}
+
+
+class EnvStub:
+    env_name = "test"
+
+
+class ProjectStub:
+    # the part of Project used by DataLoader and DuckDB connections
+    def __init__(self, conn_str):
+        self.context = ContextStub(self)
+        self.source = DuckDBSource(self.context, "db", {"conn_str": conn_str})
+        self.engine = create_engine(conn_str)
+        self.model_cache = ModelCache()
+
+    def get_source(self, context, source_name):
+        return self.source
+
+    def get_engine(self, conn_str, connect_args):
+        return self.engine
+
+    def get_model_cache(self, source_name, ttl, env_name):
+        return self.model_cache
+
+    def flush_variables(self, env=None):
+        pass
+
+
+class ContextStub:
+    def __init__(self, project):
+        self.project = project
+        self.env = EnvStub()
+        self.job = None
+
+    def get_variable_value(self, name):
+        return None
+
+
+@pytest.fixture
+def project(tmp_path):
+    project = ProjectStub(f"duckdb:///{tmp_path / 'test.duckdb'}")
+    yield project
+    project.engine.dispose()
+
+
+def load(data_loader, project, ids, write_mode="append"):
+    data_loader.run(project.context, [TableAddress("db", None, None, "t", MODEL_DEF, [{"id": i} for i in ids], write_mode)])
+
+
+def table_ids(project):
+    with project.engine.connect() as conn:
+        return [row[0] for row in conn.execute(text("SELECT id FROM t ORDER BY id"))]
+
+
+def test_failed_row_is_rolled_back(project):
+    data_loader = DataLoader(project)
+    with data_loader.row_transaction():
+        load(data_loader, project, [1, 2], write_mode="create")
+    with pytest.raises(RuntimeError):
+        with data_loader.row_transaction():
+            load(data_loader, project, [3, 4])
+            raise RuntimeError("second page failed")
+    with data_loader.row_transaction():
+        load(data_loader, project, [5])
+    data_loader.close()
+    assert table_ids(project) == [1, 2, 5]
+
+
+def test_connection_is_usable_after_failed_statement(project):
+    data_loader = DataLoader(project)
+    with data_loader.row_transaction():
+        load(data_loader, project, [1], write_mode="create")
+    with pytest.raises(Exception):
+        with data_loader.row_transaction():
+            load(data_loader, project, ["not a number"])
+    with data_loader.row_transaction():
+        load(data_loader, project, [2])
+    data_loader.close()
+    assert table_ids(project) == [1, 2]
+
+
+def test_table_created_by_failed_row_is_created_again(project):
+    data_loader = DataLoader(project)
+    with pytest.raises(RuntimeError):
+        with data_loader.row_transaction():
+            load(data_loader, project, [1], write_mode="create")
+            raise RuntimeError("row failed")
+    with data_loader.row_transaction():
+        load(data_loader, project, [2], write_mode="create")
+    data_loader.close()
+    assert table_ids(project) == [2]
+
+
+def test_records_and_columns_are_inserted_by_position(project):
+    model_def = {"columns": [{"name": "id", "type": "integer"}, {"name": "name", "type": "text"}]}
+    data_loader = DataLoader(project)
+    data_loader.batch_size = 2
+    data_loader.run(project.context, [TableAddress("db", None, None, "t", model_def, [{"name": "a", "id": 1}, {"id": 2}, {"id": 3, "extra": "x"}], "create")])
+    data_loader.run(project.context, [TableAddress("db", None, None, "t", model_def, {"name": ["d", "e", None], "id": [4, 5, 6]}, "append")])
+    data_loader.close()
+    with project.engine.connect() as conn:
+        rows = conn.execute(text("SELECT id, name FROM t ORDER BY id")).fetchall()
+    assert [tuple(row) for row in rows] == [(1, "a"), (2, None), (3, None), (4, "d"), (5, "e"), (6, None)]
+
+
+def test_column_batch_to_tuples():
+    assert column_batch_to_tuples({"b": [1, None], "a": ["x", "y"]}, ["a", "b", "c"]) == [("x", "1", None), ("y", None, None)]
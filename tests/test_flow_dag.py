@@ -0,0 +1,95 @@
+import json
+import threading
+
+import pytest
+
+from sequor.core.flow_dag import FlowDAG
+from sequor.core.user_error import UserError
+
+
+class ProjectStub:
+    def __init__(self, tmp_path, dependencies):
+        self.project_state_dir = str(tmp_path / "state")
+        self.dependencies = dependencies
+
+    def get_flow_dependencies(self, flow_name):
+        return self.dependencies.get(flow_name, [])
+
+
+class FlowRunner:
+    """run_flow stub: flows in failing fail, the others succeed; records the order of the runs"""
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.ran = []
+        self._lock = threading.Lock()
+
+    def __call__(self, flow_name):
+        with self._lock:
+            self.ran.append(flow_name)
+        if flow_name == "raises":
+            raise RuntimeError("flow crashed")
+        return "failed" if flow_name in self.failing else "succeeded"
+
+
+# extract -> transform -> report, extract -> export; audit is independent
+DEPENDENCIES = {"transform": ["extract"], "report": ["transform"], "export": ["extract"]}
+FLOWS = ["audit", "export", "extract", "report", "transform"]
+
+
+def test_flows_run_after_their_dependencies(tmp_path):
+    run_flow = FlowRunner()
+    statuses = FlowDAG(ProjectStub(tmp_path, DEPENDENCIES), ["report", "export", "audit"]).run(run_flow, workers=3)
+    assert statuses == {flow_name: "succeeded" for flow_name in FLOWS}
+    assert run_flow.ran.index("extract") < run_flow.ran.index("transform") < run_flow.ran.index("report")
+    assert run_flow.ran.index("extract") < run_flow.ran.index("export")
+
+
+@pytest.mark.parametrize("dependencies, message", [
+    ({"a": ["a"]}, "a -> a"),
+    ({"a": ["b"], "b": ["c"], "c": ["a"]}, "a -> b -> c -> a"),
+    ({"a": ["b"], "b": ["c"], "c": ["b"]}, "b -> c -> b"),
+])
+def test_cycles_are_reported(tmp_path, dependencies, message):
+    with pytest.raises(UserError, match=f"Circular flow dependency: {message}$"):
+        FlowDAG(ProjectStub(tmp_path, dependencies), ["a"])
+
+
+@pytest.mark.parametrize("failing_flow", ["extract", "raises"])
+def test_failure_skips_transitive_dependants(tmp_path, failing_flow):
+    dependencies = {flow_name: [failing_flow if dependency == "extract" else dependency for dependency in flow_dependencies]
+                    for flow_name, flow_dependencies in DEPENDENCIES.items()}
+    run_flow = FlowRunner(failing=[failing_flow])
+    statuses = FlowDAG(ProjectStub(tmp_path, dependencies), ["report", "export", "audit"]).run(run_flow, workers=2)
+    assert statuses == {"audit": "succeeded", failing_flow: "failed", "transform": "skipped", "report": "skipped", "export": "skipped"}
+    assert sorted(run_flow.ran) == sorted(["audit", failing_flow])
+
+
+def test_state_is_saved(tmp_path):
+    dag = FlowDAG(ProjectStub(tmp_path, DEPENDENCIES), ["report", "audit"])
+    statuses = dag.run(FlowRunner(failing=["transform"]), workers=2)
+    with open(dag.get_state_file()) as f:
+        state = json.load(f)
+    assert state["targets"] == ["audit", "report"]
+    assert state["flows"] == statuses == {"audit": "succeeded", "extract": "succeeded", "transform": "failed", "report": "skipped"}
+    assert "finished_at" in state
+
+
+def test_rerun_failed_runs_only_failed_and_skipped_flows(tmp_path):
+    project = ProjectStub(tmp_path, DEPENDENCIES)
+    FlowDAG(project, ["report", "audit"]).run(FlowRunner(failing=["transform"]), workers=2)
+    run_flow = FlowRunner()
+    statuses = FlowDAG(project, ["report", "audit"]).run(run_flow, workers=2, rerun_failed=True)
+    assert run_flow.ran == ["transform", "report"]
+    assert statuses == {"audit": "succeeded", "extract": "succeeded", "transform": "succeeded", "report": "succeeded"}
+
+
+def test_rerun_failed_rejects_different_targets(tmp_path):
+    project = ProjectStub(tmp_path, DEPENDENCIES)
+    FlowDAG(project, ["report"]).run(FlowRunner(failing=["report"]), workers=1)
+    with pytest.raises(UserError, match="different target flows"):
+        FlowDAG(project, ["report", "audit"]).run(FlowRunner(), workers=1, rerun_failed=True)
+
+
+def test_rerun_failed_without_previous_run(tmp_path):
+    with pytest.raises(UserError, match="no previous DAG run"):
+        FlowDAG(ProjectStub(tmp_path, DEPENDENCIES), ["report"]).run(FlowRunner(), workers=1, rerun_failed=True)
@@ -0,0 +1,143 @@
+# 40 items; grp is NULL for every 5th item so that partitions also get NULL keys
+ITEMS_QUERY = "SELECT range AS id, CASE WHEN range % 5 = 0 THEN NULL ELSE range % 3 END AS grp FROM range(40)"
+
+FLOW_TEMPLATE = """
+steps:
+  - op: transform
+    source: db
+    target_table: items
+    query: "{items_query}"
+  - op: execute
+    id: create_runs
+    source: db
+    statement: |
+      CREATE OR REPLACE TABLE runs (id INTEGER, seen INTEGER)
+      go
+  - op: for_each
+    source: db
+    table: items
+    as: row
+{for_each_options}
+    steps:
+      - op: if
+        conditions:
+          - condition_expression: "return is_var_defined('seen')"
+            then:
+              - op: execute
+                id: record_seen
+                source: db
+                statement: |
+                  INSERT INTO runs VALUES ({{{{ var('row')['id'] }}}}, {{{{ var('seen') }}}})
+                  go
+        else:
+          - op: execute
+            id: record
+            source: db
+            statement: |
+              INSERT INTO runs VALUES ({{{{ var('row')['id'] }}}}, NULL)
+              go
+      - op: set_variable
+        set:
+          seen:
+            value: "{{{{ var('row')['id'] }}}}"
+            scope: local
+"""
+
+
+def add_for_each_flow(project_fixture, for_each_options: str, items_query: str = ITEMS_QUERY):
+    project_fixture.add_flow("loop", FLOW_TEMPLATE.format(items_query=items_query, for_each_options=for_each_options))
+
+
+def partition_of(project_fixture, partitions: int) -> dict:
+    # the same hash as DuckDBSource.get_partition_query()
+    rows = project_fixture.query(f"SELECT id, hash(grp) % {partitions} FROM items")
+    return {row_id: partition for row_id, partition in rows}
+
+
+def test_parallel_rows_run_once(project_fixture):
+    add_for_each_flow(project_fixture, "    parallelism: 4")
+    assert project_fixture.run("loop")["status"] == "succeeded"
+    runs = project_fixture.query("SELECT id, seen FROM runs ORDER BY id")
+    assert [row_id for row_id, _ in runs] == list(range(40))
+    # every row runs in a scope of its own: a variable set by another row is not visible
+    assert all(seen is None for _, seen in runs)
+
+
+def test_partitioned_rows_run_once(project_fixture):
+    add_for_each_flow(project_fixture, "    parallelism: 3\n    partition_by: grp")
+    assert project_fixture.run("loop")["status"] == "succeeded"
+    runs = project_fixture.query("SELECT id, seen FROM runs ORDER BY id")
+    # rows with NULL keys (0, 5, 10, ...) are run as well
+    assert [row_id for row_id, _ in runs] == list(range(40))
+    # a variable set by a row is seen only by the next rows of the same partition (worker)
+    partitions = partition_of(project_fixture, 3)
+    assert any(seen is not None for _, seen in runs)
+    for row_id, seen in runs:
+        if seen is not None:
+            assert partitions[seen] == partitions[row_id]
+
+
+def test_first_partition_error_stops_other_partitions(project_fixture):
+    # row 0 fails at once; the other rows are slow, so most of them have not run when the error stops the partitions
+    project_fixture.add_flow("loop", f"""
+    steps:
+      - op: transform
+        source: db
+        target_table: items
+        query: "{ITEMS_QUERY.replace('range(40)', 'range(400)')}"
+      - op: for_each
+        source: db
+        table: items
+        as: row
+        parallelism: 4
+        partition_by: grp
+        steps:
+          - op: if
+            conditions:
+              - condition_expression: "return int(var('row')['id']) == 0"
+                then:
+                  - op: print
+                    message: "{{{{ var('undefined_variable') }}}}"
+            else:
+              - op: if
+                conditions:
+                  - condition_expression: "__import__('time').sleep(0.01); return False"
+                    then: []
+                else:
+                  - op: execute
+                    id: record
+                    source: db
+                    statement: |
+                      INSERT INTO runs VALUES ({{{{ var('row')['id'] }}}})
+                      go
+    """)
+    project_fixture.query("CREATE TABLE runs (id INTEGER)")
+    result = project_fixture.run("loop")
+    assert result["status"] == "failed"
+    assert "undefined_variable" in result["error"]
+    assert project_fixture.query("SELECT count(*) FROM runs")[0][0] < 200
+
+
+def test_worker_error_fails_the_op(project_fixture):
+    project_fixture.add_flow("loop", f"""
+    steps:
+      - op: transform
+        source: db
+        target_table: items
+        query: "{ITEMS_QUERY}"
+      - op: for_each
+        source: db
+        table: items
+        as: row
+        parallelism: 4
+        steps:
+          - op: if
+            conditions:
+              - condition_expression: "return int(var('row')['id']) == 17"
+                then:
+                  - op: print
+                    message: "{{{{ var('undefined_variable') }}}}"
+    """)
+    result = project_fixture.run("loop")
+    assert result["status"] == "failed"
+    assert "undefined_variable" in result["error"]
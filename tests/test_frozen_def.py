@@ -0,0 +1,36 @@
+import copy
+
+import pytest
+from ruamel.yaml import YAML
+
+from sequor.project.frozen_def import freeze
+
+
+def load_frozen(text):
+    return freeze(YAML().load(text))
+
+
+def test_frozen_definition_cannot_be_changed():
+    op_def = load_frozen("op: print\nmessage: hi\nsteps:\n  - op: print\n")
+    with pytest.raises(TypeError):
+        op_def["message"] = "changed"
+    with pytest.raises(TypeError):
+        op_def.pop("message")
+    with pytest.raises(TypeError):
+        op_def["steps"].append({"op": "print"})
+    with pytest.raises(TypeError):
+        op_def["steps"][0]["op"] = "execute"
+    assert op_def["message"] == "hi"
+
+
+def test_copies_are_mutable_and_keep_line_numbers():
+    op_def = load_frozen("op: print\nsteps:\n  - op: print\n    message: hi\n")
+    shallow = copy.copy(op_def)
+    shallow["message"] = "changed"
+    deep = copy.deepcopy(op_def)
+    deep["steps"][0]["message"] = "changed"
+    deep["steps"].append({"op": "print"})
+    assert "message" not in op_def
+    assert op_def["steps"][0]["message"] == "hi"
+    assert len(op_def["steps"]) == 1
+    assert deep["steps"][0].lc.line == op_def["steps"][0].lc.line == 2
@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+
+import pytest
+
+from sequor.common.latency import LatencyTracker
+from sequor.common.request_timings import RequestTimings
+from sequor.operations import http_request
+from sequor.operations.http_request import HTTPRequestOp, HTTPRequestParameters
+
+
+def test_percentile_is_nearest_rank():
+    latency_tracker = LatencyTracker()
+    assert latency_tracker.percentile(50) is None
+    for seconds in [0.5, 0.1, 0.4, 0.2, 0.3]:
+        latency_tracker.add(seconds)
+    assert latency_tracker.percentile(50) == 0.3
+    assert latency_tracker.percentile(80) == 0.4
+    assert latency_tracker.percentile(81) == 0.5
+    assert latency_tracker.percentile(100) == 0.5
+    assert latency_tracker.percentile(0) == 0.1
+
+
+def test_only_recent_samples_are_kept():
+    latency_tracker = LatencyTracker(max_samples=3)
+    for seconds in [9.0, 1.0, 2.0, 3.0]:
+        latency_tracker.add(seconds)
+    assert latency_tracker.count() == 3
+    assert latency_tracker.percentile(100) == 3.0
+
+
+class Response:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class HTTPServiceStub:
+    """Serves the n-th request with the n-th behaviour: (seconds, name of the response or an exception)"""
+    def __init__(self, behaviours):
+        self.behaviours = behaviours
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def request(self, **kwargs):
+        with self._lock:
+            seconds, result = self.behaviours[self.calls]
+            self.calls += 1
+        time.sleep(seconds)
+        if isinstance(result, Exception):
+            raise result
+        return Response(result)
+
+
+def send(behaviours, hedge_after=0.05):
+    op = HTTPRequestOp(None, {"op": "http_request"})
+    # enough history for a 0.05s p50
+    for _ in range(10):
+        op._latency_tracker.add(hedge_after)
+    http_params = HTTPRequestParameters(None, None, "http://host/items", "GET", None, None, None, None, {},
+                                        hedge=(50, 5), timings=RequestTimings())
+    http_service = HTTPServiceStub(behaviours)
+    response, _ = op._send_request(http_service, {"method": "GET", "url": "http://host/items"}, http_params, logging.getLogger("test"))
+    return response, http_service
+
+
+def test_fast_request_is_not_hedged():
+    response, http_service = send([(0.0, "primary")])
+    assert response.name == "primary"
+    assert http_service.calls == 1
+
+
+def test_hedged_request_wins():
+    response, http_service = send([(0.5, "primary"), (0.0, "duplicate")])
+    assert response.name == "duplicate"
+    assert http_service.calls == 2
+
+
+def test_error_of_the_original_request_is_raised_when_both_fail():
+    with pytest.raises(ValueError, match="primary failed"):
+        send([(0.2, ValueError("primary failed")), (0.0, ValueError("duplicate failed"))])
+
+
+def test_failed_hedge_does_not_hide_the_original_response():
+    response, _ = send([(0.2, "primary"), (0.0, ValueError("duplicate failed"))])
+    assert response.name == "primary"
+
+
+def test_time_in_the_queue_does_not_fire_hedges(monkeypatch):
+    # a single busy worker: the request waits in the queue for longer than the hedge delay but is fast once sent
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(http_request, "get_hedge_executor", lambda: executor)
+    executor.submit(time.sleep, 0.3)
+    response, http_service = send([(0.0, "primary"), (0.0, "duplicate")])
+    executor.shutdown(wait=True)
+    assert response.name == "primary"
+    assert http_service.calls == 1
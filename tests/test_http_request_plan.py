@@ -0,0 +1,66 @@
+from sequor.common.request_timings import RequestTimings
+from sequor.core.context import Context
+from sequor.core.environment import Environment
+from sequor.core.job import Job
+from sequor.core.op import Op
+from sequor.operations.http_request import HTTPRequestOp, HTTPRequestParameters, ResponsePlan
+
+
+def test_static_parts():
+    assert HTTPRequestOp._is_static_part("https://host/v1/items")
+    assert HTTPRequestOp._is_static_part({"Accept": "application/json"})
+    assert HTTPRequestOp._is_static_part({"limit": 100, "fields": ["a", "b"]})
+    assert HTTPRequestOp._is_static_part(None)
+
+
+def test_dynamic_parts():
+    assert not HTTPRequestOp._is_static_part("https://host/v1/items/{{ var('row')['id'] }}")
+    assert not HTTPRequestOp._is_static_part({"cursor": "{{ var('cursor') }}"})
+    assert not HTTPRequestOp._is_static_part({"since_expression": "return var('since')"})
+    assert not HTTPRequestOp._is_static_part(lambda *args: {"a": 1})
+
+
+def test_only_static_parts_are_planned(monkeypatch):
+    evaluated = []
+    def eval_request_part(self, context, http_params, part):
+        evaluated.append(part)
+        return part
+    monkeypatch.setattr(HTTPRequestOp, "_eval_request_part", eval_request_part)
+    op = HTTPRequestOp.__new__(HTTPRequestOp)
+    http_params = HTTPRequestParameters(None, None, "https://host/items/{{ var('id') }}", "GET", {"page": "{{ var('page') }}"},
+                                        {"Accept": "application/json"}, "json", {"a": 1}, {}, timings=RequestTimings())
+    request_plan = op._plan_request(None, http_params)
+    assert evaluated == ["method", "headers", "data"]
+    assert request_plan.static_kwargs == {"method": "method", "headers": "headers", "data": "data"}
+
+
+class ProjectStub:
+    def get_variable_value(self, name, env=None):
+        return None
+
+
+def test_columns_expression_is_evaluated_for_every_response():
+    job = Job(Environment.create_empty(), ProjectStub(), None, {})
+    context = Context(job.env, job.project, job)
+    response_def = {"tables": [{"source": "db", "table": "items",
+                                "columns_expression": "return {var('column'): 'text'}"}]}
+    # the variable is not defined yet when the response section is planned
+    response_plan = ResponsePlan(context, response_def)
+    table_plan = response_plan.tables[0]
+    assert table_plan.table_addr.model_def is None
+    columns = []
+    for column in ["id", "name"]:
+        context.set_variable("column", column)
+        columns.append(Op.eval_parameter(context, table_plan.columns_def, "columns"))
+    assert columns == [{"id": "text"}, {"name": "text"}]
+
+
+def test_static_columns_are_planned_once():
+    job = Job(Environment.create_empty(), ProjectStub(), None, {})
+    context = Context(job.env, job.project, job)
+    response_def = {"tables": [{"source": "db", "table": "items", "records_path": "$.items",
+                                "columns": {"id": "text"}}]}
+    table_plan = ResponsePlan(context, response_def).tables[0]
+    assert table_plan.columns_def is None
+    assert table_plan.table_addr.model_def == {"columns": {"id": "text"}}
+    assert [column.name for column in table_plan.extract_columns] == ["id"]
@@ -0,0 +1,41 @@
+import importlib
+import json
+
+import pytest
+
+from sequor.common import json_codec
+
+
+@pytest.fixture(params=["orjson", "msgspec", "json"])
+def backend(request, monkeypatch):
+    # every backend is tested with the others turned off
+    orjson_module = None
+    msgspec_module = None
+    if request.param == "orjson":
+        orjson_module = pytest.importorskip("orjson")
+    elif request.param == "msgspec":
+        pytest.importorskip("msgspec")
+        msgspec_module = importlib.import_module("msgspec")
+        importlib.import_module("msgspec.json")
+    monkeypatch.setattr(json_codec, "orjson", orjson_module)
+    monkeypatch.setattr(json_codec, "msgspec", msgspec_module)
+    return request.param
+
+
+def test_round_trip(backend):
+    obj = {"a": [1, 2.5, None, True], "b": {"c": "ü"}}
+    data = json_codec.dumps(obj)
+    assert isinstance(data, bytes)
+    assert json.loads(data) == obj
+    assert json_codec.loads(data) == obj
+    assert json_codec.loads(data.decode("utf-8")) == obj
+
+
+def test_big_integers(backend):
+    assert json.loads(json_codec.dumps({"n": 2 ** 70})) == {"n": 2 ** 70}
+
+
+@pytest.mark.parametrize("data", [b"{", b"not json", b"\xff\xfe"])
+def test_invalid_input_raises_value_error(backend, data):
+    with pytest.raises(ValueError):
+        json_codec.loads(data)
@@ -0,0 +1,54 @@
+import pytest
+
+from sequor.core.user_error import UserError
+from sequor.source.json_path import compile_path, extract_columns, get_records_at_path, to_json_path
+from sequor.source.model import Model
+
+DOCUMENT = {
+    "data": {
+        "items": [
+            {"id": 1, "customer": {"email": "a@example.com"}, "tags": ["x", "y"]},
+            {"id": 2, "customer": None, "tags": []},
+        ]
+    }
+}
+
+
+def test_compile_path():
+    assert compile_path("data.items.0.customer.email")(DOCUMENT) == "a@example.com"
+    assert compile_path("data.items.-1.id")(DOCUMENT) == 2
+    assert compile_path("data.items.5.id")(DOCUMENT) is None
+    assert compile_path("data.missing.id")(DOCUMENT) is None
+
+
+def test_records_path():
+    assert [record["id"] for record in get_records_at_path(DOCUMENT, "data.items")] == [1, 2]
+    assert get_records_at_path(DOCUMENT, "data.missing") == []
+    with pytest.raises(UserError):
+        get_records_at_path(DOCUMENT, "data")
+
+
+def test_extract_columns_with_paths():
+    model = Model.from_model_def({"columns": {
+        "id": "int",
+        "email": {"type": "text", "path": "customer.email"},
+        "first_tag": {"type": "text", "path": "tags.0"},
+    }})
+    assert extract_columns(DOCUMENT, "data.items", model.columns) == {
+        "id": [1, 2],
+        "email": ["a@example.com", None],
+        "first_tag": ["x", None],
+    }
+
+
+def test_to_json_path():
+    assert to_json_path(None) == "$"
+    assert to_json_path("customer.email") == '$."customer"."email"'
+    assert to_json_path("tags.0") == '$."tags"[0]'
+
+
+def test_column_path_requires_type():
+    with pytest.raises(UserError, match="no type"):
+        Model.from_model_def({"columns": {"a": {"path": "x.y"}}})
+    with pytest.raises(UserError, match="no type"):
+        Model.from_model_def({"columns": [{"name": "a"}]})
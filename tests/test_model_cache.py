@@ -0,0 +1,76 @@
+import pytest
+
+from sequor.core.context import Context
+from sequor.core.environment import Environment
+from sequor.core.user_error import UserError
+from sequor.source import model_cache as model_cache_module
+from sequor.source.model import Model
+from sequor.source.model_cache import ModelCache
+from sequor.source.table_address import TableAddress
+
+
+def table(name, namespace=None):
+    return TableAddress("db", None, namespace, name)
+
+
+def test_invalidate_drops_table_under_any_namespace():
+    model_cache = ModelCache()
+    model = Model.from_model_def({"columns": [{"name": "id", "type": "integer"}]})
+    model_cache.put(table("t", "main"), model)
+    model_cache.put(table("t"), model)
+    model_cache.put(table("other", "main"), model)
+    model_cache.invalidate(table("t"))
+    assert model_cache.get(table("t", "main")) is None
+    assert model_cache.get(table("t")) is None
+    assert model_cache.get(table("other", "main")) is model
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(model_cache_module.time, "monotonic", lambda: now[0])
+    model_cache = ModelCache(ttl=60.0)
+    model = Model.from_model_def({"columns": [{"name": "id", "type": "integer"}]})
+    model_cache.put(table("t"), model)
+    now[0] += 60
+    assert model_cache.get(table("t")) is model
+    now[0] += 1
+    assert model_cache.get(table("t")) is None
+
+
+def get_source(project_fixture, source_name="db"):
+    env = Environment("dev", project_fixture.home_dir)
+    env.load()
+    return project_fixture.project.get_source(Context(env, project_fixture.project, None), source_name)
+
+
+def test_model_is_reflected_again_after_execute_update(project_fixture, monkeypatch):
+    from sequor.source.sources.sql_connection import SQLConnection
+    reflected = []
+    def reflect_model(self, table_addr):
+        reflected.append(table_addr.table_name)
+        return Model.from_model_def({"columns": [{"name": "id", "type": "integer"}]})
+    monkeypatch.setattr(SQLConnection, "_reflect_model", reflect_model)
+    source = get_source(project_fixture)
+    with source.connect() as conn:
+        conn.execute_update("CREATE TABLE t (id INTEGER)")
+        conn.get_model(table("t", "main"))
+        conn.get_model(table("t", "main"))
+        assert reflected == ["t"]
+        conn.execute_update("ALTER TABLE t ADD COLUMN name VARCHAR")
+        conn.get_model(table("t", "main"))
+        assert reflected == ["t", "t"]
+
+
+@pytest.mark.parametrize("ttl_def, ttl", [("60", 60.0), (30, 30.0), ("0.5", 0.5)])
+def test_model_cache_ttl_is_converted(project_fixture, ttl_def, ttl):
+    project_fixture.add_source("ttl_db", f"type: duckdb\nconn_str: \"duckdb:///{project_fixture.db_path}\"\nmodel_cache_ttl: {ttl_def!r}\n")
+    model_cache = get_source(project_fixture, "ttl_db").get_model_cache()
+    assert model_cache.ttl == ttl
+    assert model_cache.get(table("t")) is None
+
+
+@pytest.mark.parametrize("ttl_def", ["soon", "-1"])
+def test_invalid_model_cache_ttl_is_rejected(project_fixture, ttl_def):
+    project_fixture.add_source("ttl_db", f"type: duckdb\nconn_str: \"duckdb:///{project_fixture.db_path}\"\nmodel_cache_ttl: {ttl_def!r}\n")
+    with pytest.raises(UserError, match="model_cache_ttl"):
+        get_source(project_fixture, "ttl_db").get_model_cache()
@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from sequor.core.context import Context
+from sequor.core.environment import Environment
+from sequor.core.job import Job
+from sequor.operations.parallel import ParallelOp
+
+
+class ProjectStub:
+    def get_variable_value(self, name, env=None):
+        return None
+
+
+class BranchOp:
+    """Stands in for the block op of a branch"""
+    def __init__(self, run):
+        self._run = run
+
+    def get_title(self):
+        return "branch"
+
+    def run(self, context, op_options):
+        self._run(context)
+
+
+def run_parallel(branch_runs, max_workers=None, context=None):
+    op_def = {"op": "parallel", "branches": [[] for _ in branch_runs]}
+    if max_workers is not None:
+        op_def["max_workers"] = max_workers
+    op = ParallelOp(None, op_def)
+    op._block_ops = {i: BranchOp(branch_run) for i, branch_run in enumerate(branch_runs)}
+    job = Job(Environment.create_empty(), ProjectStub(), op, {})
+    if context is None:
+        context = Context(job.env, job.project, job)
+    job.run_op(context, op, None)
+
+
+def test_branches_run_concurrently():
+    # each branch waits until all of them have started
+    barrier = threading.Barrier(4, timeout=5)
+    run_parallel([lambda context: barrier.wait()] * 4)
+
+
+def test_max_workers_limits_concurrent_branches():
+    lock = threading.Lock()
+    active = [0]
+    max_active = [0]
+    def branch_run(context):
+        with lock:
+            active[0] += 1
+            max_active[0] = max(max_active[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+    run_parallel([branch_run] * 6, max_workers=2)
+    assert max_active[0] == 2
+
+
+def test_failed_branch_is_raised_and_pending_branches_are_cancelled():
+    ran = []
+    def fail(context):
+        raise ValueError("branch failed")
+    def slow(index):
+        def branch_run(context):
+            ran.append(index)
+            time.sleep(0.2)
+        return branch_run
+    with pytest.raises(ValueError, match="branch failed"):
+        run_parallel([fail, slow(1), slow(2), slow(3)], max_workers=1)
+    # the worker may pick up the next branch before the others are cancelled, but not more
+    assert ran in ([], [1])
+
+
+def test_branch_variables_do_not_leak():
+    seen = {}
+    def branch(index):
+        def branch_run(context):
+            context.set_variable("branch", index)
+            time.sleep(0.05) # the other branches set theirs in the meantime
+            seen[index] = context.get_variable_value("branch")
+        return branch_run
+    job = Job(Environment.create_empty(), ProjectStub(), None, {})
+    context = Context(job.env, job.project, job)
+    context.set_variable("parent", "p")
+    run_parallel([branch(i) for i in range(3)], context=context)
+    assert seen == {0: 0, 1: 1, 2: 2}
+    assert context.get_variable_value("branch") is None
+    assert context.get_variable_value("parent") == "p"
@@ -0,0 +1,95 @@
+import duckdb
+import pytest
+
+from sequor.common.executor_utils import UserContext
+from sequor.core.context import Context
+from sequor.core.environment import Environment
+from sequor.core.job import Job
+from sequor.core.user_error import UserError
+from sequor.source import query_cache as query_cache_module
+from sequor.source.query_cache import QueryCache
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_cache_module.time, "monotonic", lambda: now[0])
+    query_cache = QueryCache.from_def({"ttl": 60})
+    query_cache.put("q", ["row"], 10)
+    now[0] += 60
+    assert query_cache.get("q") == ["row"]
+    now[0] += 1
+    assert query_cache.get("q") is None
+    # the expired entry does not count towards the size anymore
+    assert query_cache._size == 0
+
+
+def test_least_recently_used_entries_are_evicted():
+    query_cache = QueryCache(max_bytes=100)
+    query_cache.put("a", "A", 40)
+    query_cache.put("b", "B", 40)
+    assert query_cache.get("a") == "A" # "b" is now the least recently used
+    query_cache.put("c", "C", 40)
+    assert query_cache.get("b") is None
+    assert query_cache.get("a") == "A"
+    assert query_cache.get("c") == "C"
+    # replacing an entry does not count its previous size
+    query_cache.put("c", "C2", 50)
+    assert query_cache.get("a") == "A"
+    assert query_cache.get("c") == "C2"
+
+
+def test_oversized_entries_are_not_cached():
+    query_cache = QueryCache.from_def({"max_mb": 1})
+    query_cache.put("small", "S", 1024)
+    query_cache.put("big", "B", 2 * 1024 * 1024)
+    assert query_cache.get("big") is None
+    assert query_cache.get("small") == "S"
+    loads = []
+    def load():
+        loads.append(1)
+        return "B", 2 * 1024 * 1024
+    assert query_cache.get_or_load("big", load) == "B"
+    assert query_cache.get_or_load("big", load) == "B"
+    assert len(loads) == 2
+
+
+def test_invalid_definition():
+    with pytest.raises(UserError, match="query_cache must be true or a dictionary"):
+        QueryCache.from_def("yes")
+
+
+def user_context(project_fixture, job=None, **variables):
+    env = Environment("dev", project_fixture.home_dir)
+    env.load()
+    if job is None:
+        job = Job(env, project_fixture.project, None, {})
+    context = Context(env, project_fixture.project, job)
+    for name, value in variables.items():
+        context.set_variable(name, value)
+    return UserContext(context), job
+
+
+def test_results_are_cached_per_rendered_source_definition(project_fixture, tmp_path):
+    for tenant in ["a", "b"]:
+        with duckdb.connect(str(tmp_path / f"{tenant}.duckdb")) as conn:
+            conn.execute(f"CREATE TABLE t AS SELECT 1 AS id, '{tenant}' AS tenant")
+    project_fixture.add_source("tenant", """
+    type: duckdb
+    conn_str: "duckdb:///{{ var('tenant_db') }}"
+    query_cache: true
+    """)
+    user_context_a, job = user_context(project_fixture, tenant_db=str(tmp_path / "a.duckdb"))
+    user_context_b, _ = user_context(project_fixture, job, tenant_db=str(tmp_path / "b.duckdb"))
+    for _ in range(2):
+        assert user_context_a.query("tenant", "SELECT tenant FROM t")[0]["tenant"] == "a"
+        assert user_context_b.query("tenant", "SELECT tenant FROM t")[0]["tenant"] == "b"
+        assert user_context_a.lookup("tenant", "t", "id")[1]["tenant"] == "a"
+        assert user_context_b.lookup("tenant", "t", "id")[1]["tenant"] == "b"
+
+
+def test_lookup_rejects_duplicate_keys(project_fixture):
+    project_fixture.query("CREATE TABLE t AS SELECT * FROM (VALUES (1, 'x'), (2, 'y'), (1, 'z')) v(id, name)")
+    user_context_db, _ = user_context(project_fixture)
+    with pytest.raises(UserError, match="duplicate value of key column 'id' in table 't': 1"):
+        user_context_db.lookup("db", "t", "id")
+    assert user_context_db.lookup("db", "t", "name")["y"]["id"] == 2
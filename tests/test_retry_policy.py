@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+
+from sequor.common.retry_policy import DEFAULT_STATUS_CODES, RetryPolicy
+from sequor.core.user_error import UserError
+
+
+class Response:
+    def __init__(self, status_code=503, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_defaults():
+    retry_policy = RetryPolicy.from_def(True)
+    assert retry_policy.max_attempts == 3
+    assert retry_policy.status_codes == set(DEFAULT_STATUS_CODES)
+    assert retry_policy.exceptions == (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.ChunkedEncodingError)
+    assert RetryPolicy.from_def(None) is None
+    assert RetryPolicy.from_def(False) is None
+
+
+@pytest.mark.parametrize("retry_def, message", [
+    ({"exceptions": ["NoSuchError"]}, "Unknown exception"),
+    ({"exceptions": ["RequestException", "codes"]}, "Unknown exception"),
+    ({"exceptions": "Timeout"}, "list of exception names"),
+    ({"status_codes": 503}, "list of integers"),
+    ({"status_codes": ["x"]}, "status_codes"),
+    ({"max_attempts": 0}, "max_attempts"),
+    ({"max_attempts": -1}, "max_attempts"),
+    ({"backoff": {"base": "fast"}}, "backoff.base"),
+    ({"retry_after_max": -5}, "retry_after_max"),
+    ("always", "true or an object"),
+])
+def test_invalid_definitions(retry_def, message):
+    with pytest.raises(UserError, match=message):
+        RetryPolicy.from_def(retry_def)
+
+
+def test_retry_after_seconds():
+    retry_policy = RetryPolicy.from_def({"retry_after_max": 60})
+    assert retry_policy.get_delay(1, Response(headers={"Retry-After": "7"})) == 7.0
+    assert retry_policy.get_delay(1, Response(headers={"Retry-After": "-3"})) == 0.0
+
+
+def test_retry_after_http_date():
+    retry_policy = RetryPolicy.from_def({"retry_after_max": 60})
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    delay = retry_policy.get_delay(1, Response(headers={"Retry-After": format_datetime(retry_at, usegmt=True)}))
+    assert 28 <= delay <= 30
+    past = datetime.now(timezone.utc) - timedelta(seconds=30)
+    assert retry_policy.get_delay(1, Response(headers={"Retry-After": format_datetime(past, usegmt=True)})) == 0.0
+
+
+def test_invalid_retry_after_falls_back_to_backoff():
+    retry_policy = RetryPolicy.from_def({"backoff": {"base": 1, "max": 30}})
+    for _ in range(20):
+        assert 0 <= retry_policy.get_delay(1, Response(headers={"Retry-After": "soon"})) <= 1
+
+
+def test_retry_after_is_capped():
+    retry_policy = RetryPolicy.from_def({"retry_after_max": 10})
+    assert retry_policy.get_delay(1, Response(headers={"Retry-After": "3600"})) == 10
+
+
+@pytest.mark.parametrize("attempt", [1, 2, 3, 6, 10])
+def test_jitter_stays_within_the_backoff(attempt):
+    retry_policy = RetryPolicy.from_def({"backoff": {"base": 0.5, "max": 4}})
+    upper = min(4, 0.5 * 2 ** (attempt - 1))
+    delays = [retry_policy.get_delay(attempt) for _ in range(200)]
+    assert all(0 <= delay <= upper for delay in delays)
+    # full jitter: the delays spread over the whole range
+    assert max(delays) > upper / 2
+
+
+def test_no_retry_at_the_last_attempt():
+    retry_policy = RetryPolicy.from_def({"max_attempts": 3})
+    assert retry_policy.should_retry_response(Response(503), 2)
+    assert not retry_policy.should_retry_response(Response(503), 3)
+    assert not retry_policy.should_retry_response(Response(404), 1)
+    assert retry_policy.should_retry_exception(requests.exceptions.ConnectTimeout(), 2)
+    assert not retry_policy.should_retry_exception(requests.exceptions.ConnectTimeout(), 3)
+    assert not retry_policy.should_retry_exception(ValueError(), 1)
+
+
+def test_single_attempt_is_never_retried():
+    retry_policy = RetryPolicy.from_def({"max_attempts": 1})
+    assert not retry_policy.should_retry_response(Response(503), 1)
+    assert not retry_policy.should_retry_exception(requests.exceptions.Timeout(), 1)
@@ -0,0 +1,38 @@
+from sequor.source.source import Source
+
+
+class VariablesContext:
+    # the part of Context used to render source definitions
+    def __init__(self, variables):
+        self.variables = variables
+
+    def get_variable_value(self, name):
+        return self.variables.get(name)
+
+
+def test_rendered_def_is_memoized_by_referenced_variables():
+    context = VariablesContext({"host": "a"})
+    source = Source(context, "api", {"url": "https://{{ var('host') }}/v1"})
+    rendered_def = source.get_rendered_def()
+    assert rendered_def == {"url": "https://a/v1"}
+    assert source.get_rendered_def() is rendered_def
+    assert source.get_rendered_def(VariablesContext({"host": "b"})) == {"url": "https://b/v1"}
+    assert source.get_rendered_def() is rendered_def
+
+
+def test_rendered_defs_are_bounded():
+    source = Source(VariablesContext({}), "api", {"url": "https://host/{{ var('id') }}"})
+    for i in range(100):
+        assert source.get_rendered_def(VariablesContext({"id": i})) == {"url": f"https://host/{i}"}
+    assert len(source._rendered_defs) == Source.max_rendered_defs
+    # the most recently used variants are kept
+    assert [entry[0] for entry in source._rendered_defs][-1] == {"id": 99}
+
+
+def test_recently_used_rendered_def_is_kept():
+    source = Source(VariablesContext({}), "api", {"url": "https://host/{{ var('id') }}"})
+    first = source.get_rendered_def(VariablesContext({"id": 0}))
+    for i in range(1, 100):
+        source.get_rendered_def(VariablesContext({"id": i}))
+        # reusing the first variant keeps it from being dropped
+        assert source.get_rendered_def(VariablesContext({"id": 0})) is first
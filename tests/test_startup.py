@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+
+# heavy dependencies are imported by the operations and sources that need them, not when the CLI starts
+LAZY_MODULES = ["sqlalchemy", "requests", "duckdb", "authlib", "posthog"]
+
+
+def test_cli_import_does_not_load_heavy_dependencies():
+    src_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    code = (
+        "import sys\n"
+        "import sequor.cli\n"
+        f"print(','.join(name for name in {LAZY_MODULES!r} if name in sys.modules))\n"
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = src_dir + os.pathsep + env.get("PYTHONPATH", "")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    assert result.stdout.strip() == ""
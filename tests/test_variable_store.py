@@ -0,0 +1,40 @@
+import pytest
+
+from sequor.project.variable_store import VariableStore
+
+
+@pytest.fixture(params=["yaml", "sqlite"])
+def backend_name(request):
+    return request.param
+
+
+def test_changes_are_written_on_flush(tmp_path, backend_name):
+    store = VariableStore.create(backend_name, str(tmp_path))
+    store.set("cursor", "a")
+    assert store.get("cursor") == "a"
+    assert VariableStore.create(backend_name, str(tmp_path)).get("cursor") is None
+    store.flush()
+    assert VariableStore.create(backend_name, str(tmp_path)).get("cursor") == "a"
+
+
+def test_reload_reads_changes_of_other_processes(tmp_path, backend_name):
+    store = VariableStore.create(backend_name, str(tmp_path))
+    other = VariableStore.create(backend_name, str(tmp_path))
+    other.set("counter", 1)
+    other.flush()
+    assert store.get("counter") == 1
+    other.set("counter", 2)
+    other.flush()
+    # values are read once per job
+    assert store.get("counter") == 1
+    store.reload()
+    assert store.get("counter") == 2
+
+
+def test_reload_keeps_changes_not_flushed(tmp_path, backend_name):
+    store = VariableStore.create(backend_name, str(tmp_path))
+    store.set("cursor", "b")
+    store.reload()
+    assert store.get("cursor") == "b"
+    store.flush()
+    assert VariableStore.create(backend_name, str(tmp_path)).get("cursor") == "b"